@@ -0,0 +1,117 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import ClaimsUser, User
+
+AUTH_STATE_KEY = 'auth:user:%s'
+# Nofaol yoki o'chirilgan foydalanuvchi holati
+REVOKED = ''
+
+
+class UserCache:
+    """Process-local LRU of full User rows with a TTL, for deferred fields."""
+
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(user_id)
+                return entry[1]
+
+        user = User.objects.filter(pk=user_id).first()
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        with self.lock:
+            self.entries[user_id] = (now + self.ttl, user)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return user
+
+    def discard(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class AuthStates:
+    """
+    Per-user auth state, one key per user in the shared cache: the role
+    of an active user, or REVOKED for a deactivated or deleted one.
+    Signals overwrite a user's key on every save or delete; a missing key
+    (never seen, expired or evicted) is read back from the database, so a
+    revocation never depends on the cache keeping it. Keys expire after
+    AUTH_REVOCATION_TTL seconds, which bounds how stale a per-process
+    cache backend can be.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+    @property
+    def cache(self):
+        return caches[settings.API_CACHE_ALIAS]
+
+    def get(self, user_id):
+        key = AUTH_STATE_KEY % user_id
+        state = self.cache.get(key)
+        if state is None:
+            row = User.objects.filter(pk=user_id).values_list('is_active', 'role').first()
+            state = row[1] if row and row[0] else REVOKED
+            # add(): shu orada signal yozgan yangiroq holatni bosib ketmaydi
+            self.cache.add(key, state, self.ttl)
+        return state
+
+    def update(self, user_id, state):
+        self.cache.set(AUTH_STATE_KEY % user_id, state, self.ttl)
+
+    def discard(self, user_id):
+        self.cache.delete(AUTH_STATE_KEY % user_id)
+
+
+user_cache = UserCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
+auth_states = AuthStates(settings.AUTH_REVOCATION_TTL)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without the per-request User SELECT: the user is a
+    ClaimsUser built from the token's user_id and role claims, checked
+    against the user's auth state. A token whose role claim no longer
+    matches (the role changed after it was issued) is rejected; tokens
+    without a role claim take the current role.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        state = auth_states.get(user_id)
+        if state == REVOKED:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        role = validated_token.get('role', state)
+        if role != state:
+            raise AuthenticationFailed(_('User role has changed'), code='role_changed')
+        return ClaimsUser.from_claims(user_id, role)
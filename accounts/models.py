@@ -34,3 +34,27 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.phone
+
+
+class ClaimsUser(User):
+    """
+    User built from JWT claims (id, role) without a query. Other fields
+    are deferred and filled from accounts.authentication.user_cache on
+    first access.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, role):
+        claims = {'id': user_id, 'role': role, 'is_active': True}
+        names = [f.attname for f in cls._meta.concrete_fields if f.attname in claims]
+        return cls.from_db('default', names, [claims[name] for name in names])
+
+    def refresh_from_db(self, using=None, fields=None):
+        from .authentication import user_cache
+
+        full = user_cache.get(self.pk)
+        for name in self.get_deferred_fields():
+            setattr(self, name, getattr(full, name))
@@ -1,8 +1,32 @@
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
+
+def normalize_phone(phone):
+    # telefonni normallashtiramiz: faqat raqamlar, 9 xonali bo'lsa 998 qo'shiladi
+    phone = ''.join(filter(str.isdigit, phone or ''))
+    if len(phone) == 9:
+        phone = '998' + phone
+    return phone
+
+
 class MyTokenSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
         token['role'] = user.role
         return token
+
+    def to_internal_value(self, data):
+        data = data.copy()
+        data[self.username_field] = normalize_phone(data.get(self.username_field))
+        return super().to_internal_value(data)
+
+    def validate(self, attrs):
+        # Parol authenticate() orqali hash bilan tekshiriladi
+        data = super().validate(attrs)
+        data.update({
+            'role': self.user.role,
+            'name': self.user.full_name or self.user.phone,
+            'user_id': self.user.id,
+        })
+        return data
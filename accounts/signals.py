@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import REVOKED, auth_states, user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    user_cache.discard(instance.pk)
+    if raw:
+        auth_states.discard(instance.pk)
+    else:
+        # Rol o'zgarsa eski token'lardagi role claim mos kelmay qoladi
+        auth_states.update(instance.pk, instance.role if instance.is_active else REVOKED)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    user_cache.discard(instance.pk)
+    auth_states.update(instance.pk, REVOKED)
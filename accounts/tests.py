@@ -1,3 +1,167 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from .authentication import REVOKED, ClaimsJWTAuthentication, auth_states, user_cache
+from .models import User
+
+
+class TokenFlowTests(TestCase):
+    def setUp(self):
+        self.student = User.objects.create_user('998901234567', 'secret123', role='STUDENT')
+        self.client = APIClient()
+
+    def login(self, phone='901234567', password='secret123'):
+        return self.client.post('/api/auth/login/', {'phone': phone, 'password': password}, format='json')
+
+    def test_login_checks_hashed_password(self):
+        self.assertNotEqual(self.student.password, 'secret123')
+
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role'], 'STUDENT')
+        self.assertEqual(response.data['user_id'], self.student.id)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'STUDENT')
+
+        # Hash'ning o'zi parol sifatida ishlamaydi
+        self.assertEqual(self.login(password=self.student.password).status_code, 401)
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+
+    def test_no_session_is_used(self):
+        tokens = self.login().data
+        self.assertNotIn('sessionid', self.client.cookies)
+        self.assertFalse(Session.objects.exists())
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + tokens['access'])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/homework/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in ctx.captured_queries if 'django_session' in q['sql']])
+
+    def test_verify(self):
+        tokens = self.login().data
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 401)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + tokens['access'])
+        response = self.client.get('/api/auth/verify/')
+        self.assertEqual(response.data, {'user_id': self.student.id, 'role': 'STUDENT'})
+
+        self.client.credentials()
+        response = self.client.post('/api/auth/verify/', {'token': tokens['access']}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/auth/verify/', {'token': 'bogus'}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_refresh_rotates_and_blacklist_revokes(self):
+        refresh = self.login().data['refresh']
+
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 200)
+        rotated = response.data['refresh']
+        self.assertNotEqual(rotated, refresh)
+
+        # Eski refresh token endi ishlamaydi
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+        response = self.client.post('/api/auth/token/blacklist/', {'refresh': rotated}, format='json')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': rotated}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.student = User.objects.create_user('998901234567', 'secret123', role='STUDENT')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % AccessToken.for_user(self.student))
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in ctx.captured_queries if 'FROM "accounts_user"' in q['sql']]
+
+    def test_no_user_query_per_request(self):
+        # Birinchi so'rov auth holatini keshga yuklaydi
+        self.user_queries('/api/auth/verify/')
+        self.assertEqual(self.user_queries('/api/auth/verify/'), [])
+        self.assertEqual(self.user_queries('/api/homework/stats/'), [])
+
+    def test_claims_user_works_in_queries(self):
+        user = ClaimsJWTAuthentication().get_user(AccessToken.for_user(self.student))
+        self.assertIsInstance(user, User)
+        self.assertEqual(user.role, 'STUDENT')
+        # Model instance sifatida FK filtrlarda ishlatiladi
+        self.assertFalse(user.student_groups.exists())
+        self.assertTrue(User.objects.filter(pk=user.pk, role=user.role).exists())
+
+    def test_deferred_fields_come_from_cache(self):
+        token = AccessToken.for_user(self.student)
+        auth_states.get(self.student.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(ClaimsJWTAuthentication().get_user(token).phone, '998901234567')
+        with self.assertNumQueries(0):
+            self.assertEqual(ClaimsJWTAuthentication().get_user(token).phone, '998901234567')
+
+        self.student.full_name = 'Ali'
+        self.student.save()
+        self.assertEqual(ClaimsJWTAuthentication().get_user(token).full_name, 'Ali')
+
+    def test_deactivated_user_is_rejected(self):
+        self.user_queries('/api/auth/verify/')
+
+        self.student.is_active = False
+        self.student.save()
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 401)
+
+        self.student.is_active = True
+        self.student.save()
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 200)
+
+    def test_revocation_is_shared_through_cache(self):
+        User.objects.filter(id=self.student.id).update(is_active=False)
+        # Kalit muddati o'tgach yoki keshdan chiqarilgach holat bazadan o'qiladi
+        auth_states.discard(self.student.id)
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 401)
+
+    def test_deleted_user_stays_rejected_after_eviction(self):
+        self.user_queries('/api/auth/verify/')
+        self.student.delete()
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 401)
+
+        auth_states.discard(self.student.id)
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 401)
+        self.assertEqual(auth_states.get(self.student.id), REVOKED)
+
+    def test_role_change_rejects_old_tokens(self):
+        old = AccessToken.for_user(self.student)
+        old['role'] = 'STUDENT'
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % old)
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 200)
+
+        self.student.role = 'TEACHER'
+        self.student.save()
+        self.assertEqual(self.client.get('/api/auth/verify/').status_code, 401)
+
+        new = AccessToken.for_user(self.student)
+        new['role'] = 'TEACHER'
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer %s' % new)
+        self.assertEqual(self.client.get('/api/auth/verify/').data['role'], 'TEACHER')
+
+    def test_updates_are_per_user(self):
+        other = User.objects.create_user('998901234568', 'secret123', role='STUDENT')
+        auth_states.get(self.student.id)
+        other.is_active = False
+        other.save()
+        self.student.is_active = False
+        self.student.save()
+        # Bir foydalanuvchining yozuvi boshqasinikini bosib ketmaydi
+        self.assertEqual(cache.get_many(['auth:user:%s' % other.id, 'auth:user:%s' % self.student.id]),
+                         {'auth:user:%s' % other.id: REVOKED, 'auth:user:%s' % self.student.id: REVOKED})
@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import LoginAPIView, redirect_by_role
+from .views import LoginAPIView, LogoutAPIView, RefreshAPIView, VerifyAPIView, redirect_by_role
 
 urlpatterns = [
     path('api/auth/login/', LoginAPIView.as_view(), name='api_login'),
+    path('api/auth/token/refresh/', RefreshAPIView.as_view(), name='token_refresh'),
+    path('api/auth/verify/', VerifyAPIView.as_view(), name='token_verify'),
+    path('api/auth/token/blacklist/', LogoutAPIView.as_view(), name='token_blacklist'),
     path('profile/', redirect_by_role, name='profile'),
-]
\ No newline at end of file
+]
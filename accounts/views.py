@@ -1,35 +1,41 @@
-from rest_framework.views import APIView
-from rest_framework.permissions import AllowAny
+from rest_framework.exceptions import NotAuthenticated
 from rest_framework.response import Response
-from django.views.decorators.csrf import csrf_exempt
-from django.utils.decorators import method_decorator
+from rest_framework_simplejwt.views import (
+    TokenBlacklistView,
+    TokenObtainPairView,
+    TokenRefreshView,
+    TokenVerifyView
+)
 from django.shortcuts import redirect, render
-from .models import User
-from django.contrib.auth import authenticate, login
+from .authentication import ClaimsJWTAuthentication
+from .serializers import MyTokenSerializer
 
-@method_decorator(csrf_exempt, name='dispatch')
-class LoginAPIView(APIView):
-    permission_classes = [AllowAny]
 
-    def post(self, request):
-        phone = request.data.get('phone', '')
-        password = request.data.get('password', '')
+class LoginAPIView(TokenObtainPairView):
+    """Telefon + parol -> access/refresh token. Session yaratilmaydi."""
+    serializer_class = MyTokenSerializer
 
-        # telefonni normallashtiramiz
-        phone = ''.join(filter(str.isdigit, phone))
-        if len(phone) == 9:
-            phone = '998' + phone
 
-        user = User.objects.filter(phone=phone, password=password).first()
+class RefreshAPIView(TokenRefreshView):
+    pass
 
-        if not user:
-            return Response({"detail": "Invalid credentials"}, status=401)
-        login(request, user)
-        # SESSION
-        # request.session['user_id'] = user.id
-        # request.session['user_role'] = user.role
 
-        return Response({"status": "ok"})
+class VerifyAPIView(TokenVerifyView):
+    """
+    GET: Authorization sarlavhasidagi access token tekshiriladi.
+    POST {"token": ...}: istalgan token tekshiriladi.
+    """
+    authentication_classes = [ClaimsJWTAuthentication]
+
+    def get(self, request):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        return Response({'user_id': request.user.id, 'role': request.user.role})
+
+
+class LogoutAPIView(TokenBlacklistView):
+    """Refresh tokenni qora ro'yxatga qo'shadi."""
+    pass
 
 
 def redirect_by_role(request):
@@ -49,4 +55,3 @@ def redirect_by_role(request):
         return redirect('/admin/')
 
     return redirect('/login/')
-
@@ -0,0 +1,111 @@
+import asyncio
+import hashlib
+import time
+from collections import Counter
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+GLOBAL_VERSION_KEY = 'apicache:v:global'
+
+# (endpoint, 'hit' | 'miss') -> count, per process
+stats = Counter()
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def user_version_key(user_id):
+    return 'apicache:v:user:%s' % user_id
+
+
+def new_version():
+    return str(time.time_ns())
+
+
+def user_namespace(user):
+    """
+    Key prefix for everything cached on behalf of `user`.
+
+    It embeds the user's current version token, so bumping the token
+    (invalidate_users) orphans all of their entries at once. Admin views
+    read across every group, so admins also depend on the global token.
+    """
+    cache = get_cache()
+    keys = [user_version_key(user.id)]
+    if user.role == 'ADMIN':
+        keys.append(GLOBAL_VERSION_KEY)
+
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+
+    return 'apicache:%s:%s' % (user.id, '.'.join(versions[key] for key in keys))
+
+
+def response_key(namespace, endpoint, params=''):
+    digest = hashlib.md5(params.encode('utf-8')).hexdigest()
+    return '%s:%s:%s' % (namespace, endpoint, digest)
+
+
+def invalidate_users(user_ids):
+    token = new_version()
+    keys = {user_version_key(user_id): token for user_id in set(user_ids) if user_id}
+    keys[GLOBAL_VERSION_KEY] = token
+    get_cache().set_many(keys, None)
+
+
+def record(endpoint, hit):
+    stats[endpoint, 'hit' if hit else 'miss'] += 1
+
+
+def cached_response(endpoint, timeout=None, vary=None):
+    """
+    Cache a successful APIView GET response per user, endpoint and full
+    path (query string included). Works on sync and async handlers.
+    `vary(request)` adds what the response depends on that the path does
+    not show, such as a default date range.
+    """
+    def decorator(method):
+        def lookup(request):
+            params = request.get_full_path()
+            if vary is not None:
+                params = '%s|%s' % (params, vary(request))
+            key = response_key(user_namespace(request.user), endpoint, params)
+            data = get_cache().get(key)
+            record(endpoint, data is not None)
+            return key, data
+
+        def store(key, response):
+            if response.status_code == 200:
+                get_cache().set(key, response.data, timeout or settings.API_CACHE_TIMEOUT)
+
+        if asyncio.iscoroutinefunction(method):
+            @wraps(method)
+            async def async_wrapper(self, request, *args, **kwargs):
+                key, data = await sync_to_async(lookup)(request)
+                if data is not None:
+                    return Response(data)
+
+                response = await method(self, request, *args, **kwargs)
+                await sync_to_async(store)(key, response)
+                return response
+            return async_wrapper
+
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            key, data = lookup(request)
+            if data is not None:
+                return Response(data)
+
+            response = method(self, request, *args, **kwargs)
+            store(key, response)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core import checks
+
+# Har jarayonning o'z xotirasi: bir worker'dagi o'zgarish boshqasiga ko'rinmaydi
+PROCESS_LOCAL_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache',)
+
+
+def process_local(alias):
+    return settings.CACHES[alias]['BACKEND'] in PROCESS_LOCAL_BACKENDS
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Version tokens (API cache invalidation) and replica read pins live in
+    the cache; with a per-process backend the other workers never see them.
+    """
+    errors = []
+    timeout = max(settings.API_CACHE_TIMEOUT, settings.DASHBOARD_CACHE_TIMEOUT)
+    if timeout > 0 and process_local(settings.API_CACHE_ALIAS):
+        errors.append(checks.Error(
+            'The API response cache is on but uses a per-process cache backend.',
+            hint='Invalidation would only reach the worker that made the change. Set CACHE_BACKEND to a '
+                 'shared backend (Redis, Memcached, file-based) or API_CACHE_TIMEOUT and '
+                 'DASHBOARD_CACHE_TIMEOUT to 0.',
+            id='apicache.E001',
+        ))
+    if settings.DB_REPLICA_ALIAS and settings.DB_STICKY_SECONDS > 0 and process_local('default'):
+        errors.append(checks.Warning(
+            'Read-your-writes pins for the replica are kept in a per-process cache backend.',
+            hint='Other workers may read from the replica right after a user writes. '
+                 'Set CACHE_BACKEND to a shared backend.',
+            id='apicache.W001',
+        ))
+    return errors
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from ratings.models import Rating
+from schedules.models import Schedule, ScheduleException, ScheduleRule
+from .cache import invalidate_users
+
+Membership = Group.students.through
+
+
+def group_audience(group_ids):
+    """Teachers and students of the given groups."""
+    students = Membership.objects.filter(group_id__in=group_ids).values_list('user_id', flat=True)
+    teachers = Group.objects.filter(id__in=group_ids).values_list('teacher_id', flat=True)
+    return list(students) + list(teachers)
+
+
+def invalidate(user_ids):
+    # Darhol va commit'dan keyin: commit oldidan eski ma'lumotni
+    # keshga yozib qo'ygan parallel so'rov ham tozalanadi
+    invalidate_users(user_ids)
+    transaction.on_commit(lambda: invalidate_users(user_ids))
+
+
+@receiver(post_save, sender=Homework)
+@receiver(post_delete, sender=Homework)
+@receiver(post_save, sender=Schedule)
+@receiver(post_delete, sender=Schedule)
+@receiver(post_save, sender=ScheduleRule)
+@receiver(post_delete, sender=ScheduleRule)
+def group_content_changed(sender, instance, **kwargs):
+    invalidate(group_audience([instance.group_id]))
+
+
+@receiver(post_save, sender=ScheduleException)
+@receiver(post_delete, sender=ScheduleException)
+def schedule_exception_changed(sender, instance, **kwargs):
+    group = ScheduleRule.objects.filter(id=instance.rule_id).values_list('group_id', flat=True)
+    invalidate(group_audience(list(group)))
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def rating_changed(sender, instance, **kwargs):
+    teacher = Group.objects.filter(id=instance.group_id).values_list('teacher_id', flat=True)
+    invalidate([instance.student_id, *teacher])
+
+
+@receiver(post_save, sender=HomeworkSubmission)
+@receiver(post_delete, sender=HomeworkSubmission)
+def submission_changed(sender, instance, **kwargs):
+    teacher = Group.objects.filter(homework=instance.homework_id).values_list('teacher_id', flat=True)
+    invalidate([instance.student_id, *teacher])
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    invalidate(group_audience([instance.id]) + [instance.teacher_id])
+
+
+@receiver(post_save, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    groups = Group.objects.filter(course=instance).values_list('id', flat=True)
+    invalidate(group_audience(list(groups)))
+
+
+@receiver(m2m_changed, sender=Membership)
+def membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if reverse:
+        group_ids = list(pk_set) if pk_set else list(instance.student_groups.values_list('id', flat=True))
+        user_ids = [instance.pk] + list(
+            Group.objects.filter(id__in=group_ids).values_list('teacher_id', flat=True)
+        )
+    else:
+        user_ids = list(pk_set) if pk_set else list(instance.students.values_list('id', flat=True))
+        user_ids.append(instance.teacher_id)
+    invalidate(user_ids)
@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from ratings.models import Rating
+from .cache import stats
+from .checks import check_shared_cache
+
+# ConditionalGetMixin: homework list fingerprints homework and submissions
+FINGERPRINT_QUERIES = 2
+
+
+# Testlar bitta jarayonda: LocMem yetarli
+@override_settings(API_CACHE_TIMEOUT=300)
+class ApiCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        stats.clear()
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.alice = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        self.bob = User.objects.create_user('998900000003', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        self.other = Group.objects.create(name='P-2', course=course, teacher=self.teacher)
+        self.group.students.add(self.alice)
+        self.other.students.add(self.bob)
+        self.homework = Homework.objects.create(group=self.group, title='HW 1')
+
+        self.client = APIClient()
+
+    def get(self, user, url):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(ctx.captured_queries)
+
+    def test_second_request_is_served_from_cache(self):
+        _, first = self.get(self.alice, '/api/homework/')
+        data, second = self.get(self.alice, '/api/homework/')
+
+        self.assertGreater(first, FINGERPRINT_QUERIES)
+        self.assertEqual(second, FINGERPRINT_QUERIES)
+        self.assertEqual(len(data['results']), 1)
+        self.assertEqual(stats['homework_list', 'hit'], 1)
+        self.assertEqual(stats['homework_list', 'miss'], 1)
+
+    def test_query_string_is_part_of_the_key(self):
+        self.get(self.alice, '/api/homework/')
+        _, queries = self.get(self.alice, '/api/homework/?limit=1')
+        self.assertGreater(queries, FINGERPRINT_QUERIES)
+
+    def test_new_homework_invalidates_group_members_only(self):
+        self.get(self.alice, '/api/homework/')
+        self.get(self.bob, '/api/homework/')
+
+        Homework.objects.create(group=self.group, title='HW 2')
+
+        data, queries = self.get(self.alice, '/api/homework/')
+        self.assertGreater(queries, FINGERPRINT_QUERIES)
+        self.assertEqual(len(data['results']), 2)
+
+        _, queries = self.get(self.bob, '/api/homework/')
+        self.assertEqual(queries, FINGERPRINT_QUERIES)
+
+    def test_submission_invalidates_detail(self):
+        url = '/api/homework/%d/' % self.homework.id
+        self.assertEqual(self.get(self.alice, url)[0]['status'], 'PENDING')
+
+        HomeworkSubmission.objects.create(homework=self.homework, student=self.alice, file='a.pdf')
+        self.assertEqual(self.get(self.alice, url)[0]['status'], 'SUBMITTED')
+
+    def test_admin_sees_every_change(self):
+        self.assertEqual(self.get(self.admin, '/api/ratings/my-ratings/')[0]['results'], [])
+
+        Rating.objects.create(student=self.bob, group=self.other, score=5)
+        self.assertEqual(len(self.get(self.admin, '/api/ratings/my-ratings/')[0]['results']), 1)
+
+    def test_membership_change(self):
+        self.get(self.bob, '/api/homework/')
+        self.group.students.add(self.bob)
+        self.assertEqual(len(self.get(self.bob, '/api/homework/')[0]['results']), 1)
+
+    def test_stats_endpoint(self):
+        self.get(self.alice, '/api/homework/')
+        self.get(self.alice, '/api/homework/')
+        data, _ = self.get(self.admin, '/api/cache/stats/')
+        self.assertEqual(data, [{'endpoint': 'homework_list', 'hits': 1, 'misses': 1, 'hit_ratio': 0.5}])
+
+
+class SharedCacheCheckTests(TestCase):
+    def test_per_process_backend_is_rejected_while_caching(self):
+        with self.settings(API_CACHE_TIMEOUT=300, DASHBOARD_CACHE_TIMEOUT=0):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['apicache.E001'])
+        with self.settings(API_CACHE_TIMEOUT=0, DASHBOARD_CACHE_TIMEOUT=0):
+            self.assertEqual(check_shared_cache(None), [])
+
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                              'LOCATION': '/tmp/edu-api-cache'}}
+        with self.settings(CACHES=shared, API_CACHE_TIMEOUT=300):
+            self.assertEqual(check_shared_cache(None), [])
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import CacheStats
+
+urlpatterns = [
+    path('stats/', CacheStats.as_view(), name='cache_stats'),
+]
@@ -0,0 +1,26 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from .cache import stats
+
+
+class CacheStats(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role != 'ADMIN':
+            return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        endpoints = sorted({endpoint for endpoint, _ in stats})
+        data = []
+        for endpoint in endpoints:
+            hits, misses = stats[endpoint, 'hit'], stats[endpoint, 'miss']
+            data.append({
+                "endpoint": endpoint,
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 3) if hits + misses else 0
+            })
+
+        return Response(data)
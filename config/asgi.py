@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Django sozlangandan keyin import qilinadi
+from events.stream import route_events  # noqa: E402
+
+# SSE oqimi Django so'rov siklidan tashqarida: ulanish boshiga thread yo'q
+application = route_events(django_application)
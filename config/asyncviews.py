@@ -0,0 +1,45 @@
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView whose handlers are `async def`.
+
+    Under config.asgi the handler runs on the event loop and reads through
+    the async ORM, so a slow client or query does not hold a worker thread.
+    Authentication, permissions, throttling and ConditionalGetMixin checks
+    are the sync APIView.initial(), run in one sync_to_async hop; with
+    ClaimsJWTAuthentication that is a token decode and a cache read.
+    Under WSGI Django runs the same view through async_to_sync.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Django 4.2 csrf_exempt oddiy funksiya qaytaradi: Django view'ni await qilishi uchun
+        return markcoroutinefunction(view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return super().options(request, *args, **kwargs)
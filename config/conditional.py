@@ -0,0 +1,90 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class NotModified(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for APIView GET handlers.
+
+    Views return the querysets their response depends on from
+    get_conditional_querysets(). Each one is reduced to (max(updated_at),
+    count) in a single aggregate query; an item may also be a (queryset,
+    {name: aggregate}) pair whose extra aggregates go into the same query,
+    for state that changes without a write (e.g. deadlines passing).
+    If-None-Match is
+    answered with 304 before the handler runs, so nothing is evaluated or
+    serialized for an unchanged resource.
+
+    Last-Modified / If-Modified-Since are off unless `last_modified` is
+    set: max(updated_at) misses deleted rows and removed memberships, so
+    only a resource whose rows are never removed may use it.
+    """
+    conditional_field = 'updated_at'
+    last_modified = False
+
+    def get_conditional_querysets(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_fingerprint_parts(self, request, *args, **kwargs):
+        """What identifies the response besides its data; extend it with defaults the path does not show."""
+        return [str(request.user.id), request.get_full_path()]
+
+    def get_fingerprint(self, request, *args, **kwargs):
+        parts = list(self.get_fingerprint_parts(request, *args, **kwargs))
+        last_modified = None
+
+        for item in self.get_conditional_querysets(request, *args, **kwargs):
+            queryset, extra = item if isinstance(item, tuple) else (item, {})
+            state = queryset.order_by().aggregate(
+                last=Max(self.conditional_field),
+                count=Count('pk'),
+                **extra
+            )
+            parts.append('/'.join(str(state[name]) for name in ['last', 'count', *sorted(extra)]))
+            if state['last'] and (last_modified is None or state['last'] > last_modified):
+                last_modified = state['last']
+
+        etag = quote_etag(hashlib.md5('|'.join(parts).encode('utf-8')).hexdigest())
+        return etag, last_modified
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.conditional_headers = None
+
+        if request.method not in ('GET', 'HEAD'):
+            return
+
+        etag, last_modified = self.get_fingerprint(request, *args, **kwargs)
+        timestamp = int(last_modified.timestamp()) if last_modified and self.last_modified else None
+        self.conditional_headers = (etag, timestamp)
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            raise NotModified(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        headers = getattr(self, 'conditional_headers', None)
+        if headers and (response.status_code == 304 or 200 <= response.status_code < 300):
+            etag, timestamp = headers
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            # Javob foydalanuvchiga xos: faqat brauzer keshi, har safar tekshiriladi
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ['Authorization'])
+        return response
@@ -0,0 +1,43 @@
+from django.db.backends.postgresql import base, creation
+
+from .pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    # Bo'sh turgan ulanishlar bazani o'chirish/nusxalashga to'sqinlik qiladi
+    def _destroy_test_db(self, test_database_name, verbosity):
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        close_pools()
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    The psycopg2 backend with connections borrowed from a per-process pool
+    (config.dbpool.pool) instead of opened per request. Django still
+    "closes" the connection at the end of each request; that returns it
+    to the pool. Pool settings come from the database's POOL dict:
+    MIN_SIZE, MAX_SIZE, MAX_LIFETIME, TIMEOUT and CHECK_AFTER (seconds).
+    """
+    creation_class = DatabaseCreation
+
+    def pool(self, conn_params):
+        key = (self.alias, tuple(sorted((name, str(value)) for name, value in conn_params.items())))
+        return get_pool(key, self.settings_dict.get('POOL', {}))
+
+    def get_new_connection(self, conn_params):
+        self.pooled_by = self.pool(conn_params)
+        return self.pooled_by.acquire(lambda: super(DatabaseWrapper, self).get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django bu ulanishni atomic blok tugaguncha ushlab turadi: qaytarib bo'lmaydi
+                self.pooled_by.discard(self.connection)
+            else:
+                self.pooled_by.release(self.connection)
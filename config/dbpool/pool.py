@@ -0,0 +1,225 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_UNKNOWN
+
+logger = logging.getLogger('config.dbpool')
+
+
+class PoolTimeout(psycopg2.OperationalError):
+    """No connection became free within the pool's wait timeout."""
+
+
+class Pool:
+    """
+    Thread-safe pool of psycopg2 connections for one database in one process.
+
+    acquire() hands out an idle connection (most recently returned first,
+    so extras age out under max_lifetime), opens a new one while fewer
+    than `max_size` exist, or waits up to `timeout` seconds for one to be
+    released. A connection idle for longer than `check_after` seconds is
+    pinged before it is handed out; broken ones are replaced.
+    """
+
+    def __init__(self, min_size=0, max_size=10, max_lifetime=1800, timeout=10, check_after=5):
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.check_after = check_after
+        self.lock = threading.Condition()
+        # (ulanish, bo'shagan vaqt); ochilgan vaqti opened_at da
+        self.idle = deque()
+        self.opened_at = {}
+        self.size = 0
+        self.waiting = 0
+        self.counters = dict.fromkeys(
+            ('created', 'closed', 'checkouts', 'timeouts', 'failed_checks'), 0)
+        self.max_checkout = 0.0
+
+    def acquire(self, connect):
+        """Return a connection; `connect()` opens a new one when the pool may grow."""
+        started = time.monotonic()
+        self.fill(connect)
+        while True:
+            with self.lock:
+                conn, idle_since = self.take(started)
+            if conn is None:
+                conn = self.open(connect)
+            elif not self.healthy(conn, idle_since):
+                self.discard(conn, failed=True)
+                continue
+            elapsed = time.monotonic() - started
+            with self.lock:
+                self.counters['checkouts'] += 1
+                self.max_checkout = max(self.max_checkout, elapsed)
+            return conn
+
+    def take(self, started):
+        """(idle connection, idle since), or (None, None) with a slot reserved for a new one. Holds the lock."""
+        while True:
+            while self.idle:
+                conn, idle_since = self.idle.pop()
+                if self.expired(conn):
+                    self.close(conn)
+                    continue
+                return conn, idle_since
+            if self.size < self.max_size:
+                self.size += 1
+                return None, None
+            remaining = self.timeout - (time.monotonic() - started)
+            if remaining <= 0:
+                self.counters['timeouts'] += 1
+                logger.warning('dbpool: no connection free after %ss (%d in use)', self.timeout, self.size)
+                raise PoolTimeout('No database connection free after %ss' % self.timeout)
+            self.waiting += 1
+            try:
+                self.lock.wait(remaining)
+            finally:
+                self.waiting -= 1
+
+    def open(self, connect):
+        """Open a connection into a slot reserved by take()."""
+        try:
+            conn = connect()
+        except BaseException:
+            with self.lock:
+                self.size -= 1
+                self.lock.notify()
+            raise
+        with self.lock:
+            self.opened_at[conn] = time.monotonic()
+            self.counters['created'] += 1
+        return conn
+
+    def fill(self, connect):
+        """Open connections up to `min_size` (the first checkout of a process pays for them)."""
+        while True:
+            with self.lock:
+                if self.size >= self.min_size:
+                    return
+                self.size += 1
+            conn = self.open(connect)
+            self.release(conn)
+
+    def healthy(self, conn, idle_since):
+        if conn.closed or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - idle_since < self.check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                # autocommit o'chiq bo'lsa SELECT tranzaksiya ochadi; Django uni bo'sh holda kutadi
+                conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def expired(self, conn):
+        return time.monotonic() - self.opened_at.get(conn, 0) >= self.max_lifetime
+
+    def release(self, conn):
+        """Take a connection back; one left mid-transaction is rolled back, a broken one is dropped."""
+        if not conn.closed and conn.info.transaction_status not in (TRANSACTION_STATUS_IDLE,
+                                                                    TRANSACTION_STATUS_UNKNOWN):
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                pass
+        if conn.closed or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            return self.discard(conn)
+        with self.lock:
+            if self.expired(conn):
+                self.close(conn)
+            else:
+                self.idle.append((conn, time.monotonic()))
+            self.lock.notify()
+
+    def discard(self, conn, failed=False):
+        with self.lock:
+            if failed:
+                self.counters['failed_checks'] += 1
+            self.close(conn)
+            self.lock.notify()
+
+    def close(self, conn):
+        """Close a connection and free its slot. Holds the lock."""
+        self.opened_at.pop(conn, None)
+        self.size -= 1
+        self.counters['closed'] += 1
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def close_idle(self):
+        with self.lock:
+            while self.idle:
+                self.close(self.idle.pop()[0])
+            self.lock.notify_all()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'size': self.size,
+                'idle': len(self.idle),
+                'in_use': self.size - len(self.idle),
+                'waiting': self.waiting,
+                **self.counters,
+                'max_checkout_ms': round(self.max_checkout * 1000, 1),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Fork'dan oldingi ulanishlar: yopilsa ota jarayonning soketi ham uziladi
+_inherited = []
+
+
+def get_pool(key, options):
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = Pool(
+                min_size=options.get('MIN_SIZE', 0),
+                max_size=options.get('MAX_SIZE', 10),
+                max_lifetime=options.get('MAX_LIFETIME', 1800),
+                timeout=options.get('TIMEOUT', 10),
+                check_after=options.get('CHECK_AFTER', 5),
+            )
+        return pool
+
+
+def pool_stats():
+    """{database alias: stats} for the pools of this process."""
+    with _pools_lock:
+        pools = list(_pools.items())
+    stats = {}
+    for (alias, _), pool in pools:
+        # Testlarda bitta alias bir nechta bazaga ulanishi mumkin: yig'indisi
+        total = stats.setdefault(alias, {})
+        for name, value in pool.stats().items():
+            total[name] = max(total.get(name, 0), value) if name == 'max_checkout_ms' else total.get(name, 0) + value
+    return stats
+
+
+def close_pools():
+    """Close every idle pooled connection, e.g. before the test database is dropped."""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
+
+
+def _forget_inherited():
+    _inherited.extend(_pools.values())
+    _pools.clear()
+
+
+os.register_at_fork(after_in_child=_forget_inherited)
@@ -0,0 +1,99 @@
+import threading
+import time
+
+import psycopg2
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .pool import Pool, PoolTimeout
+
+
+class PoolTests(TestCase):
+    def setUp(self):
+        self.opened = []
+
+    def tearDown(self):
+        # Ochiq ulanish test bazasini o'chirishga to'sqinlik qiladi
+        for conn in self.opened:
+            conn.close()
+
+    def connect(self):
+        self.opened.append(psycopg2.connect(**connection.get_connection_params()))
+        return self.opened[-1]
+
+    def test_connections_are_reused(self):
+        pool = Pool(max_size=2)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        self.assertIs(pool.acquire(self.connect), conn)
+        stats = pool.stats()
+        self.assertEqual((stats['created'], stats['checkouts'], stats['in_use']), (1, 2, 1))
+
+    def test_min_size_is_opened_up_front(self):
+        pool = Pool(min_size=3, max_size=5)
+        pool.release(pool.acquire(self.connect))
+        self.assertEqual((pool.stats()['created'], pool.stats()['idle']), (3, 3))
+
+    def test_waits_for_a_release_then_times_out(self):
+        pool = Pool(max_size=1, timeout=5)
+        conn = pool.acquire(self.connect)
+        got = []
+        waiter = threading.Thread(target=lambda: got.append(pool.acquire(self.connect)))
+        waiter.start()
+        while pool.stats()['waiting'] == 0:
+            time.sleep(0.01)
+        pool.release(conn)
+        waiter.join(5)
+        self.assertEqual(got, [conn])
+
+        pool.timeout = 0.05
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(self.connect)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_broken_connection_is_replaced(self):
+        pool = Pool(check_after=0)
+        conn = pool.acquire(self.connect)
+        pool.release(conn)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_terminate_backend(%s)', [conn.info.backend_pid])
+
+        fresh = pool.acquire(self.connect)
+        self.assertIsNot(fresh, conn)
+        self.assertEqual(pool.stats()['failed_checks'], 1)
+        with fresh.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+    def test_release_rolls_back_and_lifetime_expires(self):
+        pool = Pool()
+        conn = pool.acquire(self.connect)
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        pool.release(conn)
+        self.assertEqual(conn.info.transaction_status, psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+        pool.max_lifetime = 0
+        self.assertIsNot(pool.acquire(self.connect), conn)
+        self.assertTrue(conn.closed)
+
+
+class PooledBackendTests(TestCase):
+    def test_close_returns_the_connection_to_the_pool(self):
+        wrapper = connections.create_connection('default')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        self.assertFalse(raw.closed)
+
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, raw)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            self.assertEqual(cursor.fetchone(), (1,))
+
+    @override_settings(QUERY_BUDGET_HEADERS=True)
+    def test_metrics_header(self):
+        response = self.client.get(reverse('homework_list'))
+        self.assertRegex(response['X-DB-Pool'], r'^in_use=\d+ waiting=\d+ created=\d+$')
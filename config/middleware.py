@@ -0,0 +1,190 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from config.dbpool.pool import pool_stats
+
+logger = logging.getLogger('config.querybudget')
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_IN_LISTS = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+
+
+def normalize_sql(sql):
+    """Reduce a statement to its template so N+1 repeats group together."""
+    sql = _LITERALS.sub('?', sql)
+    return _IN_LISTS.sub('(...)', sql)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that counts, times and groups queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.templates = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.templates[normalize_sql(sql)] += 1
+
+    def repeated(self, threshold):
+        return [(sql, n) for sql, n in self.templates.most_common() if n >= threshold]
+
+
+class QueryBudgetMiddleware:
+    """
+    Record query count, DB time and repeated SQL templates per request and
+    log requests that exceed their budget or look like an N+1.
+
+    QUERY_BUDGETS maps URL names to budgets; anything else gets
+    QUERY_BUDGET_DEFAULT. Queries run while a streaming response is being
+    consumed happen after this middleware returns and are not counted.
+
+    Under ASGI the async ORM runs queries in the request's thread-sensitive
+    sync thread, so the wrappers are installed there, not on the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder = QueryRecorder()
+        with self.recording(recorder):
+            response = self.get_response(request)
+
+        self.report(request, response, recorder)
+        return response
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        stack = await sync_to_async(self.recording)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+
+        self.report(request, response, recorder)
+        return response
+
+    def recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def get_budget(self, request):
+        match = getattr(request, 'resolver_match', None)
+        name = match.url_name if match else None
+        return name, settings.QUERY_BUDGETS.get(name, settings.QUERY_BUDGET_DEFAULT)
+
+    def report(self, request, response, recorder):
+        name, budget = self.get_budget(request)
+        repeated = recorder.repeated(settings.QUERY_BUDGET_REPEAT_THRESHOLD)
+
+        if recorder.count > budget or repeated:
+            logger.warning(
+                '%s %s (%s): %d queries, budget %d, %.1f ms in DB%s',
+                request.method, request.path, name or '-', recorder.count, budget,
+                recorder.duration * 1000,
+                ''.join('\n  %dx %s' % (n, sql) for sql, n in repeated)
+            )
+
+        if settings.QUERY_BUDGET_HEADERS:
+            response['X-Query-Count'] = str(recorder.count)
+            response['X-Query-Time-Ms'] = '%.1f' % (recorder.duration * 1000)
+            pool = pool_stats().get(DEFAULT_DB_ALIAS)
+            if pool:
+                response['X-DB-Pool'] = 'in_use=%(in_use)d waiting=%(waiting)d created=%(created)d' % pool
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can stay on the event loop under ASGI. WhiteNoise 6.6
+    is sync-only, which would make Django run every request's middleware
+    chain in a thread; here only actual static file hits go to a thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+async def iterate_in_thread(iterator):
+    """
+    Async generator over a sync iterator, one part per sync_to_async hop.
+    Parts are pulled in the request's thread-sensitive thread, where its
+    database connections live, and sent as they come.
+    """
+    done = object()
+    pull = sync_to_async(next, thread_sensitive=True)
+    while True:
+        part = await pull(iterator, done)
+        if part is done:
+            return
+        yield part
+
+
+class AsyncStreamingMiddleware:
+    """
+    Under ASGI, give streaming responses with a sync iterator (CSV/NDJSON
+    exports, ZIP archives, FileResponse) an async one. Django 4.2 consumes
+    a sync iterator with sync_to_async(list), i.e. builds the whole body
+    in memory before the first byte goes out. Under WSGI responses are
+    left alone, so FileResponse keeps wsgi.file_wrapper.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if response.streaming and not response.is_async:
+            # Asl iterator'ning close() i response._resource_closers da qoladi
+            response.streaming_content = iterate_in_thread(iter(response.streaming_content))
+        return response
@@ -0,0 +1,164 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import BooleanField, F, Field, Func, Q, Value
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowCompare(Func):
+    """
+    ROW(a, b, ...) < ROW(x, y, ...) (or >). Postgres uses it as a single
+    index range condition, where the equivalent OR chain is only a filter.
+    """
+    output_field = BooleanField()
+
+    def __init__(self, columns, values, operator):
+        self.operator = operator
+        super().__init__(
+            Func(*columns, function='ROW', output_field=Field()),
+            Func(*values, function='ROW', output_field=Field()),
+        )
+
+    def as_sql(self, compiler, connection, **extra_context):
+        lhs, lhs_params = compiler.compile(self.source_expressions[0])
+        rhs, rhs_params = compiler.compile(self.source_expressions[1])
+        return '%s %s %s' % (lhs, self.operator, rhs), [*lhs_params, *rhs_params]
+
+
+class KeysetPagination:
+    """
+    Keyset (seek) pagination over an indexed ordering such as
+    ('-created_at', '-id').
+
+    The cursor is an opaque token holding the ordering values of the last
+    row on the page, so every page is a single indexed range scan and deep
+    pages cost the same as the first one (unlike OFFSET).
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None, page_size=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+
+    def paginate_queryset(self, queryset, request):
+        return self.build_page(list(self.page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        """paginate_queryset() for async views; the page is read with the async ORM."""
+        return self.build_page([row async for row in self.page_queryset(queryset, request)])
+
+    def page_queryset(self, queryset, request):
+        """
+        The page as one queryset. `queryset` may also be a list of
+        querysets over disjoint partitions (e.g. one per group): each is
+        paged on its own index and the pages are joined with UNION ALL,
+        which Postgres merges in order (Merge Append) instead of sorting
+        every row of every partition.
+        """
+        self.request = request
+        self.limit = self.get_page_size(request)
+        if not isinstance(queryset, (list, tuple)):
+            self.model = queryset.model
+            return self.page_part(queryset)
+
+        self.model = queryset[0].model
+        parts = [self.page_part(part) for part in queryset]
+        if len(parts) == 1:
+            return parts[0]
+        return parts[0].union(*parts[1:], all=True).order_by(*self.ordering)[:self.limit + 1]
+
+    def page_part(self, queryset):
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(self.request)
+        if position is not None:
+            queryset = queryset.filter(self.seek_filter(position))
+
+        # Bitta ortiqcha qator keyingi sahifa borligini bildiradi
+        return queryset[:self.limit + 1]
+
+    def build_page(self, rows):
+        self.has_next = len(rows) > self.limit
+        rows = rows[:self.limit]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if size < 1:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def _fields(self):
+        for item in self.ordering:
+            name = item.lstrip('-')
+            yield name, item.startswith('-'), self.model._meta.get_field(name)
+
+    def get_position(self, obj):
+        return [field.value_to_string(obj) for _, _, field in self._fields()]
+
+    def seek_filter(self, position):
+        """
+        (a, b) < (x, y) when every ordering column has the same direction,
+        else (a < x) OR (a = x AND b < y) OR ... for the ordering columns.
+        """
+        fields = list(self._fields())
+        directions = {descending for _, descending, _ in fields}
+        if len(directions) == 1:
+            return RowCompare(
+                [F(name) for name, _, _ in fields],
+                [Value(value, output_field=field) for (_, _, field), value in zip(fields, position)],
+                '<' if directions.pop() else '>',
+            )
+
+        condition = Q()
+        equal = {}
+        for (name, descending, _), value in zip(fields, position):
+            lookup = '%s__%s' % (name, 'lt' if descending else 'gt')
+            condition |= Q(**equal, **{lookup: value})
+            equal[name] = value
+        return condition
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+            values = json.loads(raw.decode('utf-8'))
+            fields = list(self._fields())
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError
+            return [field.to_python(value) for (_, _, field), value in zip(fields, values)]
+        except (ValueError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
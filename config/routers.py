@@ -0,0 +1,218 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+logger = logging.getLogger('config.routers')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replika qancha orqada (soniya); replika bo'lmagan baza uchun 0
+LAG_SQL = (
+    'SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+    'THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+class ReadState:
+    """Where the reads of one request or job may go; decided once, on its first read."""
+
+    def __init__(self, user_id=None):
+        self.user_id = user_id
+        self.alias = None
+        self.wrote = False
+
+
+# None: faqat asosiy baza (yozuvchi so'rovlar, shell, worker'lar)
+_state = contextvars.ContextVar('db_read_state', default=None)
+
+
+def pin_key(user_id):
+    return 'db:pinned:%s' % user_id
+
+
+def pin_to_primary(user_id):
+    """Send the user's reads to the primary for DB_STICKY_SECONDS, so they see their own writes."""
+    if user_id is not None and settings.DB_STICKY_SECONDS > 0:
+        cache.set(pin_key(user_id), 1, settings.DB_STICKY_SECONDS)
+
+
+class ReplicaHealth:
+    """Per-process verdict on the replica, re-checked at most every DB_REPLICA_CHECK_INTERVAL seconds."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked_at = None
+        self.ok = False
+
+    def available(self, alias):
+        with self.lock:
+            fresh = self.checked_at is not None and \
+                time.monotonic() - self.checked_at < settings.DB_REPLICA_CHECK_INTERVAL
+            if fresh:
+                return self.ok
+            self.checked_at = time.monotonic()
+        ok = self.check(alias)
+        with self.lock:
+            self.ok = ok
+        return ok
+
+    def check(self, alias):
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError as exc:
+            logger.warning('replica %s unavailable, reading from the primary: %s', alias, exc)
+            connections[alias].close()
+            return False
+        if lag > settings.DB_REPLICA_MAX_LAG:
+            logger.warning('replica %s is %.1fs behind, reading from the primary', alias, lag)
+            return False
+        return True
+
+    def mark_down(self):
+        with self.lock:
+            self.ok = False
+            self.checked_at = time.monotonic()
+
+    def reset(self):
+        with self.lock:
+            self.checked_at = None
+
+
+health = ReplicaHealth()
+
+
+def replica_lag(alias):
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def read_alias():
+    """
+    The database the current reads should use: the replica for a safe
+    request or job whose user has not written in the last
+    DB_STICKY_SECONDS, while the replica is up and not lagging; else
+    the primary. Reads inside a transaction on the primary stay there.
+    """
+    alias = settings.DB_REPLICA_ALIAS
+    state = _state.get()
+    if alias is None or state is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    if state.alias is None:
+        state.alias = DEFAULT_DB_ALIAS
+        if state.user_id is None or not cache.get(pin_key(state.user_id)):
+            if health.available(alias) and ensure_replica(alias):
+                state.alias = alias
+    return state.alias
+
+
+def ensure_replica(alias):
+    """Connect now, so a replica that went down between checks falls back instead of failing the request."""
+    try:
+        connections[alias].ensure_connection()
+        return True
+    except DatabaseError as exc:
+        logger.warning('replica %s connection failed, reading from the primary: %s', alias, exc)
+        health.mark_down()
+        return False
+
+
+@contextmanager
+def replica_reads(user_id=None):
+    """Let the reads of a block outside a request (e.g. a report job) use the replica."""
+    token = _state.set(ReadState(user_id))
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Reads go where read_alias() says; writes and migrations always go
+    to the primary. Once a request writes, the rest of its reads follow.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.alias = DEFAULT_DB_ALIAS
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def bearer_user_id(request):
+    """User id from a valid bearer token, without touching the database."""
+    header = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if len(header) == 2 and header[0] in api_settings.AUTH_HEADER_TYPES:
+        try:
+            return AccessToken(header[1])[api_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
+    return None
+
+
+class ReplicaMiddleware:
+    """
+    Marks safe requests as replica-eligible and pins the user to the
+    primary after a request that changed something.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.finish(state, token)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            self.finish(state, token)
+
+    def start(self, request):
+        state = ReadState(bearer_user_id(request))
+        state.wrote = request.method not in SAFE_METHODS
+        # Yozuvchi so'rovlar va sessiya (admin sahifalari) asosiy bazada:
+        # sessiya foydalanuvchisini bazasiz bilib bo'lmaydi
+        primary = state.wrote or (state.user_id is None and settings.SESSION_COOKIE_NAME in request.COOKIES)
+        token = _state.set(None if primary else state)
+        return state, token
+
+    def finish(self, state, token):
+        _state.reset(token)
+        if state.wrote:
+            pin_to_primary(state.user_id)
@@ -48,6 +48,12 @@ INSTALLED_APPS = [
     'homework',
     'teacher',
     'student',
+    'reports',
+    'stats',
+    'dashboard',
+    'apicache',
+    'perf',
+    'events',
 
     # 'frontend',
     'corsheaders',
@@ -56,11 +62,15 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
 ]
 
 MIDDLEWARE = [
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # ASGI: sinxron oqimli javoblar xotiraga to'liq yig'ilmasin
+    'config.middleware.AsyncStreamingMiddleware',
+    'config.middleware.StaticFilesMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'config.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,6 +78,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'config.routers.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -95,17 +106,68 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# config.dbpool: har jarayonda ulanishlar hovuzi (DB_POOL=False - oddiy psycopg2 backend)
+DB_POOL = config('DB_POOL', default=True, cast=bool)
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'config.dbpool' if DB_POOL else 'django.db.backends.postgresql',
         'NAME': config('DB_NAME'),
         'USER': config('DB_USER'),
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        'POOL': {
+            'MIN_SIZE': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            # Jarayonlar soni x MAX_SIZE Postgres max_connections dan kam bo'lsin
+            'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=1800, cast=int),
+            # Bo'sh ulanish kutish chegarasi; keyin OperationalError
+            'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+            # Shuncha soniyadan ko'p bo'sh turgan ulanish berishdan oldin tekshiriladi
+            'CHECK_AFTER': config('DB_POOL_CHECK_AFTER', default=5, cast=float),
+        },
     }
 }
 
+# O'qish replikasi (config.routers): DB_REPLICA_NAME yoki DB_REPLICA_HOST berilsa
+# xavfsiz (GET) so'rovlar va eksportlar undan o'qiydi. Testlarda asosiy bazaning oynasi.
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': DB_REPLICA_NAME or DATABASES['default']['NAME'],
+    'HOST': DB_REPLICA_HOST or DATABASES['default']['HOST'],
+    'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+    'TEST': {'MIRROR': 'default'},
+}
+DB_REPLICA_ALIAS = 'replica' if DB_REPLICA_NAME or DB_REPLICA_HOST else None
+DATABASE_ROUTERS = ['config.routers.ReplicaRouter']
+# Yozgan foydalanuvchi shuncha soniya asosiy bazadan o'qiydi (o'z o'zgarishlarini ko'radi)
+DB_STICKY_SECONDS = config('DB_STICKY_SECONDS', default=10, cast=int)
+# Bundan ko'p orqada qolgan yoki ishlamayotgan replika chetlab o'tiladi
+DB_REPLICA_MAX_LAG = config('DB_REPLICA_MAX_LAG', default=5, cast=float)
+DB_REPLICA_CHECK_INTERVAL = 5
+
+
+# Cache
+# Local memory by default; point CACHE_BACKEND/CACHE_LOCATION at a shared
+# backend (Redis/Memcached) in production or a file-based one in tests.
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='edu-api'),
+    }
+}
+
+API_CACHE_ALIAS = 'default'
+# LocMem har jarayonda alohida: invalidatsiya boshqa worker'larga yetmaydi,
+# shuning uchun javob keshi faqat umumiy backend bilan yoqiladi (apicache.E001)
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=0 if CACHE_BACKEND.endswith('.LocMemCache') else 300,
+                           cast=int)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -148,6 +210,29 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Himoyalangan media (homework.media): 'nginx' -> X-Accel-Redirect, 'sendfile' -> X-Sendfile,
+# bo'sh -> Django FileResponse. nginx: location /protected-media/ { internal; alias <MEDIA_ROOT>/; }
+MEDIA_ACCEL = config('MEDIA_ACCEL', default='')
+MEDIA_ACCEL_PREFIX = config('MEDIA_ACCEL_PREFIX', default='/protected-media/')
+# Imzolangan fayl havolasi shuncha soniya amal qiladi. Havolali javoblarning ETag'i va kesh
+# kaliti har MEDIA_LINK_MAX_AGE / 2 soniyada almashadi (homework.media.link_epoch)
+MEDIA_LINK_MAX_AGE = config('MEDIA_LINK_MAX_AGE', default=60 * 60, cast=int)
+
+# Bo'laklab yuklash (homework.uploads): qisman fayllar MEDIA_ROOT ichida
+HOMEWORK_UPLOAD_DIR = 'uploads/partial'
+HOMEWORK_UPLOAD_MAX_SIZE = config('HOMEWORK_UPLOAD_MAX_SIZE', default=500 * 1024 * 1024, cast=int)
+HOMEWORK_UPLOAD_CHUNK_SIZE = config('HOMEWORK_UPLOAD_CHUNK_SIZE', default=8 * 1024 * 1024, cast=int)
+HOMEWORK_UPLOAD_TTL = config('HOMEWORK_UPLOAD_TTL', default=24 * 60 * 60, cast=int)
+# Topshiriq fayllari sha256 bo'yicha bir marta saqlanadi (homework.storage)
+HOMEWORK_BLOB_DIR = 'blobs'
+
+# reports: ishlayotgan job heartbeat_at ni shuncha soniyada yangilaydi;
+# REPORT_STALE_AFTER dan eski bo'lsa worker o'lgan deb qayta olinadi
+REPORT_HEARTBEAT_INTERVAL = config('REPORT_HEARTBEAT_INTERVAL', default=30, cast=int)
+REPORT_STALE_AFTER = config('REPORT_STALE_AFTER', default=300, cast=int)
+REPORT_MAX_ATTEMPTS = 3
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -155,7 +240,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
@@ -164,10 +249,18 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
-    'ROTATE_REFRESH_TOKENS': False,
+    # Har refresh yangi refresh token beradi, eskisi qora ro'yxatga tushadi
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'UPDATE_LAST_LOGIN': False,
 }
 
+# accounts.authentication: token claim'laridan user, to'liq qator faqat kerak bo'lsa
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=1024, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=300, cast=int)
+# Har foydalanuvchining auth holati (rol yoki bekor qilingan) keshda shuncha soniya turadi
+AUTH_REVOCATION_TTL = config('AUTH_REVOCATION_TTL', default=30, cast=int)
+
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='http://localhost:8000').split(',')
 
 if not DEBUG:
@@ -180,6 +273,47 @@ if not DEBUG:
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# Query budget (config.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET_DEFAULT = config('QUERY_BUDGET_DEFAULT', default=10, cast=int)
+QUERY_BUDGET_REPEAT_THRESHOLD = config('QUERY_BUDGET_REPEAT_THRESHOLD', default=5, cast=int)
+QUERY_BUDGET_HEADERS = config('QUERY_BUDGET_HEADERS', default=DEBUG, cast=bool)
+# URL nomi -> ruxsat etilgan so'rovlar soni
+QUERY_BUDGETS = {
+    # Butun import batched bulk_create: qator soniga bog'liq emas
+    'groups_group_import': 30,
+    # Submission yaratish + hisoblagich, kesh va events signallari
+    'upload_finalize': 15,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'config.querybudget': {'handlers': ['console'], 'level': 'WARNING'},
+        'config.dbpool': {'handlers': ['console'], 'level': 'WARNING'},
+        'config.routers': {'handlers': ['console'], 'level': 'WARNING'},
+        'events': {'handlers': ['console'], 'level': 'WARNING'},
+    },
+}
+
+# events: SSE oqimi (config.asgi) va LISTEN/NOTIFY
+EVENTS_PATH = '/api/events/'
+EVENTS_BROKER = config('EVENTS_BROKER', default='events.broker.PostgresBroker')
+EVENTS_CHANNEL = 'events'
+EVENTS_HEARTBEAT = config('EVENTS_HEARTBEAT', default=25, cast=int)
+EVENTS_QUEUE_SIZE = config('EVENTS_QUEUE_SIZE', default=32, cast=int)
+EVENTS_RECONNECT_DELAY = 2
+# Oqim chiptasi (POST /api/events/ticket/) shuncha soniya ichida ishlatilishi kerak
+EVENTS_TICKET_MAX_AGE = config('EVENTS_TICKET_MAX_AGE', default=30, cast=int)
+# EventSource qayta ulanishdan oldin kutadi (ms)
+EVENTS_RETRY = 5000
+
+# Har bir dashboard bo'limi alohida keshlanadi (soniya)
+DASHBOARD_CACHE_TIMEOUT = config('DASHBOARD_CACHE_TIMEOUT', default=60 if API_CACHE_TIMEOUT else 0, cast=int)
+
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
@@ -0,0 +1,127 @@
+import re
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, time, timedelta
+from functools import wraps
+
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from config.middleware import normalize_sql
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from ratings.models import Rating
+from schedules.models import Schedule
+
+PLAN_PROBLEMS = {
+    'Seq Scan': re.compile(r'\bSeq Scan on (\w+)'),
+    # Sort tuguni; Merge Append ning 'Sort Key:' qatori emas
+    'Sort': re.compile(r'^\s*(?:->\s*)?(?:Incremental )?Sort\s+\(', re.M),
+}
+
+
+def seed_hot_paths(groups=20, students_per_group=25, homework_per_group=50, weeks=10):
+    """
+    Bulk-load a dataset large enough for the planner to prefer indexes.
+    Signals are bypassed, so only use it where counters are not checked.
+    """
+    teacher = User.objects.create(phone='998990000000', role='TEACHER')
+    course = Course.objects.create(name='Seed', description='')
+    group_objs = Group.objects.bulk_create([
+        Group(name='G-%d' % i, course=course, teacher=teacher, days=['Mon', 'Wed', 'Fri'])
+        for i in range(groups)
+    ])
+    students = User.objects.bulk_create([
+        User(phone='99898%07d' % i, role='STUDENT')
+        for i in range(groups * students_per_group)
+    ])
+
+    members_of = {}
+    memberships, homework, schedules, ratings = [], [], [], []
+    for g, group in enumerate(group_objs):
+        members = members_of[group.id] = students[g * students_per_group:(g + 1) * students_per_group]
+        memberships += [Group.students.through(group=group, user=s) for s in members]
+        homework += [Homework(group=group, title='HW %d' % i) for i in range(homework_per_group)]
+        for day in range(weeks * 7):
+            lesson_date = date(2026, 9, 1) + timedelta(days=day)
+            schedules.append(Schedule(
+                group=group, date=lesson_date, day=lesson_date.strftime('%a'),
+                start_time=time(9 + g % 8), end_time=time(10 + g % 8), subject='Seed'
+            ))
+        ratings += [Rating(student=s, group=group, score=(s.id + i) % 5 + 1)
+                    for s in members for i in range(4)]
+
+    Group.students.through.objects.bulk_create(memberships)
+    homework = Homework.objects.bulk_create(homework)
+    Schedule.objects.bulk_create(schedules)
+    Rating.objects.bulk_create(ratings)
+
+    submissions = []
+    for h in homework:
+        submissions += [
+            HomeworkSubmission(homework=h, student=s, file='homeworks/seed.pdf',
+                               score=None if (s.id + h.id) % 3 else 80)
+            for s in members_of[h.group_id][::2]
+        ]
+    HomeworkSubmission.objects.bulk_create(submissions, batch_size=5000)
+
+    with connection.cursor() as cursor:
+        # auto_now_add hammasiga bir xil vaqt beradi: real jadvaldagidek soatlab yoyiladi
+        cursor.execute("UPDATE homework_homework SET created_at = now() - id * interval '1 hour'")
+        cursor.execute('ANALYZE')
+
+    return {'teacher': teacher, 'groups': group_objs, 'students': students}
+
+
+class QueryPlanAssertions:
+    """
+    TestCase mixin: EXPLAIN a queryset and fail on sequential scans or
+    sorts. Sequential scans are priced out for the test transaction, so a
+    Seq Scan in the plan means no usable index exists.
+    """
+
+    def assertIndexedPlan(self, queryset, forbid=('Seq Scan', 'Sort')):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = queryset.explain()
+
+        for problem in forbid:
+            match = PLAN_PROBLEMS[problem].search(plan)
+            self.assertIsNone(match, '%s in plan:\n%s' % (problem, plan))
+        return plan
+
+
+class QueryBudgetAssertions:
+    """TestCase mixin asserting an upper bound on queries (not an exact count)."""
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using='default'):
+        with CaptureQueriesContext(connections[using]) as ctx:
+            yield ctx
+
+        repeated = Counter(normalize_sql(q['sql']) for q in ctx.captured_queries)
+        self.assertLessEqual(len(ctx), limit, '%d queries, budget %d:\n%s' % (
+            len(ctx), limit,
+            '\n'.join('%dx %s' % (n, sql) for sql, n in repeated.most_common())
+        ))
+
+    def assertUrlBudgets(self, urlconf, budgets):
+        """
+        Every named pattern in `urlconf` must have a budget, so new
+        endpoints cannot skip the check.
+        """
+        names = {p.name for p in urlconf.urlpatterns if p.name}
+        self.assertEqual(names - set(budgets), set(), 'URLs without a query budget')
+
+
+def max_queries(limit):
+    """Decorator form of QueryBudgetAssertions.assertMaxQueries."""
+    def decorator(test):
+        @wraps(test)
+        def wrapper(self, *args, **kwargs):
+            with self.assertMaxQueries(limit):
+                return test(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,170 @@
+import asyncio
+import os
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.db import OperationalError, connections, transaction
+from django.http import FileResponse, HttpRequest
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.models import User
+from accounts.serializers import MyTokenSerializer
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from ratings.models import Rating
+from reports.jobs import run_job
+from reports.models import ReportJob
+from .middleware import AsyncStreamingMiddleware
+from .routers import health, pin_key, read_alias, replica_reads
+
+
+@override_settings(DB_REPLICA_ALIAS='replica', API_CACHE_TIMEOUT=0, MEDIA_ROOT=tempfile.mkdtemp())
+class ReplicaRoutingTests(TransactionTestCase):
+    # Testlarda 'replica' asosiy bazaning oynasi, lekin alohida ulanish
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        health.reset()
+        cache.clear()
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        self.group = Group.objects.create(
+            name='P-1', course=Course.objects.create(name='Python', description=''), teacher=self.teacher
+        )
+        self.group.students.add(self.student)
+        Rating.objects.create(student=self.student, group=self.group, score=5)
+        homework = Homework.objects.create(group=self.group, title='Loops')
+        self.submission = HomeworkSubmission.objects.create(homework=homework, student=self.student, file='a.pdf')
+
+    def request(self, user, method, url, data=None):
+        """(response, queries on default, queries on replica), streamed content included."""
+        token = str(MyTokenSerializer.get_token(user).access_token)
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(
+                url, data, content_type='application/json', HTTP_AUTHORIZATION='Bearer %s' % token)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        return response, len(primary), len(replica)
+
+    def test_safe_reads_use_the_replica(self):
+        response, primary, replica = self.request(self.student, 'get', reverse('my_ratings'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_writer_reads_the_primary_for_a_while(self):
+        response, _, _ = self.request(self.teacher, 'post', reverse('grade_homework', args=[self.submission.id]),
+                                      {'score': 90})
+        self.assertEqual(response.status_code, 200)
+
+        _, primary, replica = self.request(self.teacher, 'get', reverse('teacher_submissions'))
+        self.assertEqual(replica, 0)
+        self.assertGreater(primary, 0)
+        # Boshqa foydalanuvchilar replikadan o'qishda davom etadi
+        self.assertEqual(self.request(self.student, 'get', reverse('my_ratings'))[1], 0)
+
+        cache.delete(pin_key(self.teacher.id))
+        self.assertEqual(self.request(self.teacher, 'get', reverse('teacher_submissions'))[1], 0)
+
+    def test_lagging_or_down_replica_falls_back(self):
+        with mock.patch('config.routers.replica_lag', return_value=60) as lag:
+            for _ in range(2):
+                _, primary, replica = self.request(self.student, 'get', reverse('my_ratings'))
+                self.assertEqual((replica > 0, primary > 0), (False, True))
+        # Natija DB_REPLICA_CHECK_INTERVAL davomida eslab qolinadi
+        self.assertEqual(lag.call_count, 1)
+
+        health.reset()
+        with mock.patch('config.routers.replica_lag', side_effect=OperationalError('down')):
+            _, primary, replica = self.request(self.student, 'get', reverse('my_ratings'))
+        self.assertEqual((replica > 0, primary > 0), (False, True))
+
+    def test_exports_stream_from_the_replica(self):
+        response, primary, replica = self.request(self.admin, 'get', reverse('export_ratings') + '?output=csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        job = ReportJob.objects.create(kind='ratings_export', params={'output': 'csv'}, requested_by=self.admin)
+        with CaptureQueriesContext(connections['replica']) as replica:
+            self.assertEqual(run_job(job.id), 'DONE')
+        self.assertIn('ratings_rating', ' '.join(query['sql'] for query in replica))
+
+    def test_transactions_and_unconfigured_replica_stay_on_primary(self):
+        with replica_reads():
+            self.assertEqual(read_alias(), 'replica')
+            with transaction.atomic():
+                self.assertEqual(read_alias(), 'default')
+            with override_settings(DB_REPLICA_ALIAS=None):
+                self.assertEqual(read_alias(), 'default')
+        self.assertEqual(read_alias(), 'default')
+
+
+class AsyncStreamingTests(TransactionTestCase):
+    PARTS = 64
+    PART = b'x' * 64 * 1024
+
+    def setUp(self):
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        self.produced = 0
+
+    def large_body(self, rows):
+        for _ in range(self.PARTS):
+            self.produced += 1
+            yield self.PART
+
+    async def asgi_get(self, path, token):
+        """(produced parts when the first body part went out, body) through the ASGI handler."""
+        received, first, body = asyncio.Queue(), [], []
+        await received.put({'type': 'http.request', 'body': b''})
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                if message.get('body') and not first:
+                    first.append(self.produced)
+                body.append(message.get('body', b''))
+
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'output=csv',
+            'headers': [(b'host', b'testserver'), (b'authorization', b'Bearer ' + token.encode())],
+        }
+        await get_asgi_application()(scope, received.get, send)
+        return first[0], b''.join(body)
+
+    def test_large_export_is_not_buffered_under_asgi(self):
+        token = str(MyTokenSerializer.get_token(self.admin).access_token)
+        with mock.patch('ratings.views.iter_csv', self.large_body):
+            first, body = async_to_sync(self.asgi_get)(reverse('export_ratings'), token)
+        self.assertEqual(len(body), self.PARTS * len(self.PART))
+        # Birinchi bo'lak butun tana yig'ilishidan oldin yuborilgan
+        self.assertLess(first, self.PARTS)
+
+    def test_file_response_gets_an_async_iterator(self):
+        fd, path = tempfile.mkstemp()
+        self.addCleanup(os.remove, path)
+        os.write(fd, self.PART)
+        os.close(fd)
+
+        async def view(request):
+            return FileResponse(open(path, 'rb'))
+
+        async def consume():
+            response = await AsyncStreamingMiddleware(view)(HttpRequest())
+            self.assertTrue(response.is_async)
+            content = b''.join([part async for part in response.streaming_content])
+            await sync_to_async(response.close)()
+            return content
+
+        self.assertEqual(async_to_sync(consume)(), self.PART)
+        # WSGI: javobga tegilmaydi, file_wrapper ishlaydi
+        response = AsyncStreamingMiddleware(lambda request: FileResponse(open(path, 'rb')))(HttpRequest())
+        self.assertIsNotNone(response.file_to_stream)
+        response.close()
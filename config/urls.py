@@ -25,6 +25,10 @@ urlpatterns = [
     path('api/homework/', include('homework.urls')),
     path('api/schedules/', include('schedules.urls')),
     path('api/ratings/', include('ratings.urls')),
+    path('api/reports/', include('reports.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
+    path('api/cache/', include('apicache.urls')),
+    path('api/events/', include('events.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,149 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from apicache.cache import get_cache, record, response_key, user_namespace
+from config.pagination import KeysetPagination
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from homework.queries import (
+    student_homework,
+    student_homework_row,
+    teacher_submissions,
+    teacher_submission_row,
+    student_stats,
+    teacher_stats
+)
+from schedules.recurrence import lessons
+from schedules.serializers import OccurrenceSerializer
+
+RECENT_LIMIT = 6
+LIST_LIMIT = KeysetPagination.max_page_size
+
+
+class DashboardContext:
+    """Lookups shared by every section built in one dashboard request."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def group_ids(self):
+        if self.user.role == 'TEACHER':
+            groups = Group.objects.filter(teacher=self.user)
+        else:
+            groups = self.user.student_groups.all()
+        return list(groups.values_list('id', flat=True))
+
+
+# --- Student -------------------------------------------------------------
+
+def student_homework_list(ctx, limit):
+    homeworks = student_homework(ctx.user, ctx.group_ids).order_by('-created_at', '-id')
+    return [student_homework_row(h) for h in homeworks[:limit]]
+
+
+def student_schedule(ctx):
+    today = timezone.localdate()
+    occurrences = lessons(today, today + timedelta(days=6), ctx.group_ids)
+    return list(OccurrenceSerializer(occurrences, many=True).data)
+
+
+def student_grades(ctx):
+    grades = HomeworkSubmission.objects.filter(
+        student=ctx.user,
+        score__isnull=False
+    ).order_by('-graded_at').values(
+        'feedback',
+        'graded_at',
+        grade=F('score'),
+        homework_title=F('homework__title'),
+        course=F('homework__group__course__name'),
+    )
+    return list(grades[:LIST_LIMIT])
+
+
+STUDENT_SECTIONS = {
+    'stats': lambda ctx: student_stats(ctx.user),
+    'recent_homework': lambda ctx: student_homework_list(ctx, RECENT_LIMIT),
+    'schedule': student_schedule,
+    'homework': lambda ctx: student_homework_list(ctx, LIST_LIMIT),
+    'grades': student_grades,
+}
+
+
+# --- Teacher -------------------------------------------------------------
+
+def teacher_groups(ctx):
+    groups = Group.objects.filter(id__in=ctx.group_ids).annotate(
+        course_name=F('course__name'),
+        student_count=Count('students'),
+    ).order_by('name').values('id', 'name', 'days', 'course_name', 'student_count')
+    return list(groups)
+
+
+def teacher_homework(ctx):
+    homeworks = Homework.objects.filter(group_id__in=ctx.group_ids).annotate(
+        group_name=F('group__name'),
+        submission_count=Count('submissions'),
+        student_count=Coalesce(F('group__counters__total_students'), 0),
+    ).order_by('-created_at', '-id')[:LIST_LIMIT]
+
+    return [{
+        "id": h.id,
+        "title": h.title,
+        "description": h.description,
+        "group_name": h.group_name,
+        "created_at": h.created_at,
+        "deadline": h.deadline(),
+        "submission_count": h.submission_count,
+        "student_count": h.student_count,
+    } for h in homeworks]
+
+
+def teacher_submission_list(ctx, limit):
+    submissions = teacher_submissions(ctx.user).filter(
+        homework__group_id__in=ctx.group_ids
+    ).order_by('-submitted_at', '-id')
+    return [teacher_submission_row(s) for s in submissions[:limit]]
+
+
+TEACHER_SECTIONS = {
+    'stats': lambda ctx: teacher_stats(ctx.user),
+    'groups': teacher_groups,
+    'recent_submissions': lambda ctx: teacher_submission_list(ctx, RECENT_LIMIT),
+    'homework': teacher_homework,
+    'submissions': lambda ctx: teacher_submission_list(ctx, LIST_LIMIT),
+}
+
+
+# --- Assembly ------------------------------------------------------------
+
+def build_sections(user, sections):
+    """
+    Build the requested {name: builder} sections. Every section is cached
+    under its own key in the user's apicache namespace, so only missing or
+    invalidated sections are recomputed.
+    """
+    cache = get_cache()
+    namespace = user_namespace(user)
+    keys = {name: response_key(namespace, 'dashboard', name) for name in sections}
+    cached = cache.get_many(keys.values())
+
+    ctx = DashboardContext(user)
+    data, fresh = {}, {}
+    for name, builder in sections.items():
+        key = keys[name]
+        record('dashboard:%s' % name, key in cached)
+        if key in cached:
+            data[name] = cached[key]
+        else:
+            data[name] = fresh[key] = builder(ctx)
+
+    if fresh:
+        cache.set_many(fresh, settings.DASHBOARD_CACHE_TIMEOUT)
+    return data
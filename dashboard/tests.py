@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from schedules.models import Schedule
+
+
+@override_settings(API_CACHE_TIMEOUT=300, DASHBOARD_CACHE_TIMEOUT=60)
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        self.group.students.add(self.student)
+
+        hw = Homework.objects.create(group=self.group, title='HW 1')
+        Homework.objects.create(group=self.group, title='HW 2')
+        HomeworkSubmission.objects.create(homework=hw, student=self.student, file='a.pdf', score=80)
+        Schedule.objects.create(
+            group=self.group, date=timezone.localdate(),
+            start_time='10:00', end_time='11:30', subject='Python'
+        )
+
+        self.client = APIClient()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(ctx.captured_queries)
+
+    def test_student_dashboard(self):
+        self.client.force_authenticate(self.student)
+        data, _ = self.get('/api/dashboard/student/')
+
+        self.assertEqual(set(data), {'stats', 'recent_homework', 'schedule', 'homework', 'grades'})
+        self.assertEqual(data['stats']['submitted'], 1)
+        self.assertEqual(len(data['homework']), 2)
+        self.assertEqual(len(data['schedule']), 1)
+        self.assertEqual(data['grades'][0]['grade'], 80)
+        self.assertEqual(data['grades'][0]['course'], 'Python')
+
+    def test_teacher_dashboard(self):
+        self.client.force_authenticate(self.teacher)
+        data, _ = self.get('/api/dashboard/teacher/')
+
+        self.assertEqual(data['stats']['total_homework'], 2)
+        self.assertEqual(data['groups'][0]['student_count'], 1)
+        self.assertEqual(data['homework'][-1]['submission_count'], 1)
+        self.assertEqual(len(data['submissions']), 1)
+
+    def test_sections_are_cached_independently(self):
+        self.client.force_authenticate(self.student)
+        _, first = self.get('/api/dashboard/student/?sections=stats,grades')
+        _, cached = self.get('/api/dashboard/student/?sections=stats,grades')
+        self.assertEqual(cached, 0)
+
+        data, partial = self.get('/api/dashboard/student/?sections=stats,schedule')
+        self.assertEqual(set(data), {'stats', 'schedule'})
+        # Faqat keshda yo'q bo'lim hisoblanadi
+        cache.clear()
+        _, alone = self.get('/api/dashboard/student/?sections=schedule')
+        self.assertEqual(partial, alone)
+
+    def test_unknown_section_and_role(self):
+        self.client.force_authenticate(self.student)
+        response = self.client.get('/api/dashboard/student/?sections=stats,nope')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/dashboard/teacher/')
+        self.assertEqual(response.status_code, 403)
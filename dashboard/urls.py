@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import StudentDashboard, TeacherDashboard
+
+urlpatterns = [
+    path('student/', StudentDashboard.as_view(), name='student_dashboard_api'),
+    path('teacher/', TeacherDashboard.as_view(), name='teacher_dashboard_api'),
+]
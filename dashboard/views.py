@@ -0,0 +1,42 @@
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from .sections import STUDENT_SECTIONS, TEACHER_SECTIONS, build_sections
+
+
+class DashboardView(APIView):
+    """
+    Every dashboard section in one round trip. ?sections=stats,schedule
+    limits the response to the listed sections.
+    """
+    permission_classes = [IsAuthenticated]
+    role = None
+    sections = {}
+
+    def get(self, request):
+        if request.user.role != self.role:
+            return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        requested = request.query_params.get('sections')
+        names = requested.split(',') if requested else list(self.sections)
+
+        unknown = [name for name in names if name not in self.sections]
+        if unknown:
+            return Response(
+                {"error": "Unknown sections: %s" % ', '.join(unknown)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sections = {name: self.sections[name] for name in names}
+        return Response(build_sections(request.user, sections))
+
+
+class StudentDashboard(DashboardView):
+    role = 'STUDENT'
+    sections = STUDENT_SECTIONS
+
+
+class TeacherDashboard(DashboardView):
+    role = 'TEACHER'
+    sections = TEACHER_SECTIONS
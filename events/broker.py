@@ -0,0 +1,243 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('events')
+
+# Navbatdagi "uyg'ot" belgisi: heartbeat yoki resync uchun
+PING = object()
+
+
+def user_topic(user_id):
+    return 'user:%s' % user_id
+
+
+def group_topic(group_id):
+    """Students of a group; teachers get their events on their user topic."""
+    return 'group:%s' % group_id
+
+
+def message(topics, event, data):
+    return {'topics': list(topics), 'event': event, 'data': data}
+
+
+class Subscription:
+    """One open stream: its topics and a bounded queue of messages."""
+
+    def __init__(self, topics, size):
+        self.topics = topics
+        self.queue = asyncio.Queue(size)
+        self.lost = False
+
+    def put(self, item):
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Sekin mijoz: xabar tashlanadi, oqim keyin 'resync' yuboradi
+            self.lost = True
+
+    def wake(self):
+        if self.queue.empty():
+            self.queue.put_nowait(PING)
+
+
+class Hub:
+    """Subscriptions of this process by topic. Only touched on `loop`."""
+
+    def __init__(self, loop=None):
+        self.loop = loop
+        self.topics = defaultdict(set)
+
+    def add(self, subscription):
+        for topic in subscription.topics:
+            self.topics[topic].add(subscription)
+
+    def remove(self, subscription):
+        for topic in subscription.topics:
+            subscriptions = self.topics.get(topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.topics[topic]
+
+    def deliver(self, item):
+        targets = set()
+        for topic in item['topics']:
+            targets.update(self.topics.get(topic, ()))
+        for subscription in targets:
+            subscription.put(item)
+
+    def resync(self):
+        """Tell every stream it may have missed messages."""
+        for subscriptions in self.topics.values():
+            for subscription in subscriptions:
+                subscription.lost = True
+                subscription.wake()
+
+    def dispatch(self, item):
+        """deliver() from any thread; dropped if no stream is open in this process."""
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.deliver, item)
+
+
+class Broker:
+    """
+    Fans published messages out to the streams of every process.
+
+    publish_many() is called from the writing request, inside its
+    transaction; a message must only reach streams once that commits.
+    """
+
+    def __init__(self):
+        self.hub = Hub()
+
+    async def subscribe(self, topics):
+        loop = asyncio.get_running_loop()
+        if self.hub.loop is not loop:
+            # Jarayonda bitta loop; testlarda har test o'z loop'ini ochadi
+            self.stop()
+            self.hub = Hub(loop)
+            await self.start(loop)
+        subscription = Subscription(topics, settings.EVENTS_QUEUE_SIZE)
+        self.hub.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.hub.remove(subscription)
+
+    def retopic(self, subscription, topics):
+        """Move an open subscription to a new set of topics; called on the stream's loop."""
+        self.hub.remove(subscription)
+        subscription.topics = topics
+        self.hub.add(subscription)
+
+    async def start(self, loop):
+        pass
+
+    def stop(self):
+        pass
+
+    def publish_many(self, messages):
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    """Delivers on commit to streams of this process only: tests and single-process setups."""
+
+    def publish_many(self, messages):
+        def deliver():
+            for item in messages:
+                self.hub.dispatch(item)
+        transaction.on_commit(deliver)
+
+
+class PostgresBroker(Broker):
+    """
+    LISTEN/NOTIFY fan-out. pg_notify runs in the writer's transaction, so
+    Postgres delivers the message on commit and drops it on rollback.
+    Each process holds one LISTEN connection, read on the event loop with
+    add_reader; if it drops, streams get a 'resync' once it is back.
+    Payloads must stay under the 8000-byte NOTIFY limit.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.listener = None
+
+    def publish_many(self, messages):
+        payloads = [json.dumps(item, cls=DjangoJSONEncoder) for item in messages]
+        with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+            # Bitta so'rov, xabarlar soniga bog'liq emas
+            cursor.execute(
+                'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+                [settings.EVENTS_CHANNEL, payloads]
+            )
+
+    def open_listener(self):
+        listener = psycopg2.connect(**connections[DEFAULT_DB_ALIAS].get_connection_params())
+        listener.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        with listener.cursor() as cursor:
+            cursor.execute(sql.SQL('LISTEN {}').format(sql.Identifier(settings.EVENTS_CHANNEL)))
+        return listener
+
+    async def connect(self, loop):
+        try:
+            listener = await loop.run_in_executor(None, self.open_listener)
+        except psycopg2.Error as exc:
+            logger.warning('events: LISTEN connection failed: %s', exc)
+            return False
+        if self.hub.loop is not loop:
+            listener.close()
+            return False
+        self.listener = listener
+        loop.add_reader(listener.fileno(), self.receive, loop)
+        return True
+
+    async def start(self, loop):
+        if not await self.connect(loop):
+            loop.create_task(self.reconnect(loop))
+
+    async def reconnect(self, loop):
+        while self.hub.loop is loop:
+            await asyncio.sleep(settings.EVENTS_RECONNECT_DELAY)
+            if await self.connect(loop):
+                self.hub.resync()
+                return
+
+    def receive(self, loop):
+        try:
+            self.listener.poll()
+        except psycopg2.Error as exc:
+            logger.warning('events: LISTEN connection lost: %s', exc)
+            self.stop()
+            loop.create_task(self.reconnect(loop))
+            return
+        while self.listener.notifies:
+            self.hub.deliver(json.loads(self.listener.notifies.pop(0).payload))
+
+    def stop(self):
+        if self.listener is None:
+            return
+        loop = self.hub.loop
+        if loop is not None and not loop.is_closed():
+            loop.remove_reader(self.listener.fileno())
+        self.listener.close()
+        self.listener = None
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.EVENTS_BROKER)()
+    return _broker
+
+
+@receiver(setting_changed)
+def reset_broker(setting, **kwargs):
+    global _broker
+    if setting == 'EVENTS_BROKER' and _broker is not None:
+        _broker.stop()
+        _broker = None
+
+
+def publish(topics, event, data):
+    get_broker().publish_many([message(topics, event, data)])
+
+
+def publish_many(messages):
+    if messages:
+        get_broker().publish_many(messages)
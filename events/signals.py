@@ -0,0 +1,101 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from accounts.models import User
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from .broker import group_topic, message, publish, publish_many, user_topic
+
+Membership = Group.students.through
+
+
+def grade_message(submission):
+    return message([user_topic(submission.student_id)], 'grade', {
+        'submission': submission.id,
+        'homework': submission.homework_id,
+        'score': submission.score,
+    })
+
+
+def publish_memberships(changes, change):
+    """{student_id: [group_id, ...]} -> one 'groups' message per student ('added' or 'removed')."""
+    publish_many([
+        message([user_topic(student_id)], 'groups', {change: group_ids})
+        for student_id, group_ids in changes.items()
+    ])
+
+
+@receiver(post_save, sender=Homework)
+def homework_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        publish([group_topic(instance.group_id)], 'homework', {
+            'id': instance.id,
+            'group': instance.group_id,
+            'title': instance.title,
+        })
+
+
+@receiver(post_init, sender=HomeworkSubmission)
+def submission_loaded(sender, instance, **kwargs):
+    # Oxirgi e'lon qilingan baho; post_save'da yangilanadi
+    instance._published_score = instance.__dict__.get('score')
+
+
+@receiver(pre_save, sender=HomeworkSubmission)
+def submission_saving(sender, instance, raw=False, **kwargs):
+    instance._score_changed = (
+        not raw and not instance._state.adding
+        and instance.score is not None and instance.score != instance._published_score
+    )
+
+
+@receiver(post_save, sender=HomeworkSubmission)
+def submission_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        teacher_id = Group.objects.filter(homework=instance.homework_id).values_list('teacher_id', flat=True).first()
+        if teacher_id is not None:
+            publish([user_topic(teacher_id)], 'submission', {
+                'id': instance.id,
+                'homework': instance.homework_id,
+                'student': instance.student_id,
+            })
+    elif instance._score_changed:
+        publish_many([grade_message(instance)])
+    instance._published_score = instance.score
+
+
+@receiver(m2m_changed, sender=Membership)
+def membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Tell the student's open streams to add or drop group topics; the client gets a 'resync'."""
+    if action == 'pre_clear':
+        related = instance.student_groups if reverse else instance.students
+        instance._published_cleared = set(related.values_list('id', flat=True))
+        return
+    if action == 'post_clear':
+        pk_set, change = getattr(instance, '_published_cleared', set()), 'removed'
+    elif action in ('post_add', 'post_remove'):
+        change = 'added' if action == 'post_add' else 'removed'
+    else:
+        return
+    if not pk_set:
+        return
+
+    # {student_id: [group_id, ...]}
+    if reverse:
+        changes = {instance.pk: sorted(pk_set)}
+    else:
+        changes = {student_id: [instance.pk] for student_id in pk_set}
+    publish_memberships(changes, change)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw and not instance.is_active:
+        publish([user_topic(instance.pk)], 'token', {'state': 'revoked'})
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    publish([user_topic(instance.pk)], 'token', {'state': 'revoked'})
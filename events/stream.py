@@ -0,0 +1,174 @@
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from rest_framework.exceptions import APIException, AuthenticationFailed
+
+from accounts.authentication import REVOKED, auth_states
+from accounts.models import ClaimsUser
+from groups.models import Group
+from .broker import PING, get_broker, group_topic, user_topic
+
+Membership = Group.students.through
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    # nginx oqimni buferlamasin
+    (b'x-accel-buffering', b'no'),
+]
+
+
+_TICKETS = signing.TimestampSigner(salt='events.stream')
+
+
+def issue_ticket(user_id, expires):
+    """
+    Ticket for opening one stream within EVENTS_TICKET_MAX_AGE seconds.
+    EventSource cannot send headers, so it goes in the URL instead of the
+    access token: it is good for nothing else and expires quickly. The
+    stream still ends when the access token it was issued for (`expires`)
+    does.
+    """
+    return _TICKETS.sign('%d:%d' % (user_id, expires))
+
+
+def subscriber(ticket):
+    """(user, topics, token expiry) for a stream ticket; runs on a pool thread."""
+    try:
+        value = _TICKETS.unsign(ticket, max_age=settings.EVENTS_TICKET_MAX_AGE)
+        user_id, expires = (int(part) for part in value.split(':'))
+    except (signing.BadSignature, ValueError):
+        raise AuthenticationFailed('Invalid ticket')
+    try:
+        state = auth_states.get(user_id)
+        if state == REVOKED:
+            raise AuthenticationFailed('User is inactive')
+        user = ClaimsUser.from_claims(user_id, state)
+        topics = [user_topic(user.id)]
+        if user.role == 'STUDENT':
+            groups = Membership.objects.filter(user_id=user.id).values_list('group_id', flat=True)
+            topics += [group_topic(group_id) for group_id in groups]
+        return user, topics, expires
+    finally:
+        # Bu thread so'rov siklidan tashqarida: ulanishni o'zimiz yopamiz
+        connections.close_all()
+
+
+def regroup(topics, change):
+    """Topics after a 'groups' message: {'added': [group ids]} or {'removed': [...]}."""
+    added = {group_topic(group_id) for group_id in change.get('added', ())}
+    removed = {group_topic(group_id) for group_id in change.get('removed', ())}
+    return [topic for topic in topics if topic not in removed] + sorted(added - set(topics))
+
+
+def sse(event, data):
+    return ('event: %s\ndata: %s\n\n' % (event, json.dumps(data, cls=DjangoJSONEncoder))).encode()
+
+
+async def respond(send, status, data):
+    body = json.dumps(data).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', b'%d' % len(body))],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def cancel_on_disconnect(receive, task):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+    task.cancel()
+
+
+async def event_stream(scope, receive, send):
+    """
+    GET EVENTS_PATH?ticket=<ticket> as text/event-stream; the ticket comes
+    from POST /api/events/ticket/ (see issue_ticket()).
+
+    An open stream is one coroutine, a disconnect watcher and a bounded
+    queue in the hub: no thread and no database connection are held, so a
+    process keeps thousands of idle streams. Events: 'ready', then
+    'homework', 'submission', 'grade' as they commit; 'resync' if some
+    were dropped or the student joined or left a group (the stream's
+    group topics follow the membership); 'token' ({"state": "expired" |
+    "revoked"}) ends the stream. A comment line is sent every
+    EVENTS_HEARTBEAT idle seconds.
+    """
+    if scope['method'] != 'GET':
+        await respond(send, 405, {'error': 'Method not allowed'})
+        return
+
+    ticket = parse_qs(scope['query_string'].decode('latin-1')).get('ticket', [''])[0]
+    try:
+        user, topics, expires = await sync_to_async(subscriber, thread_sensitive=False)(ticket)
+    except APIException:
+        await respond(send, 401, {'error': 'Invalid ticket'})
+        return
+
+    broker = get_broker()
+    subscription = await broker.subscribe(topics)
+    loop = asyncio.get_running_loop()
+    watcher = loop.create_task(cancel_on_disconnect(receive, asyncio.current_task()))
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        await send({
+            'type': 'http.response.body',
+            'body': b'retry: %d\n' % settings.EVENTS_RETRY + sse('ready', {'user': user.id}),
+            'more_body': True,
+        })
+
+        while True:
+            remaining = expires - time.time()
+            if remaining <= 0:
+                chunk = sse('token', {'state': 'expired'})
+                break
+
+            timer = loop.call_later(min(settings.EVENTS_HEARTBEAT, remaining), subscription.wake)
+            item = await subscription.queue.get()
+            timer.cancel()
+
+            if subscription.lost:
+                # Navbatdagilar ham eskirgan: mijoz hammasini qayta yuklaydi
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.lost = False
+                chunk = sse('resync', {})
+            elif item is PING:
+                chunk = b': ping\n\n'
+            elif item['event'] == 'token':
+                chunk = sse(item['event'], item['data'])
+                break
+            elif item['event'] == 'groups':
+                broker.retopic(subscription, regroup(subscription.topics, item['data']))
+                chunk = sse('resync', {})
+            else:
+                chunk = sse(item['event'], item['data'])
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+        await send({'type': 'http.response.body', 'body': chunk})
+    except asyncio.CancelledError:
+        if not watcher.done():
+            raise
+    finally:
+        watcher.cancel()
+        broker.unsubscribe(subscription)
+
+
+def route_events(application):
+    """ASGI app serving EVENTS_PATH itself and everything else through `application`."""
+
+    async def router(scope, receive, send):
+        if scope['type'] == 'http' and scope['path'] == settings.EVENTS_PATH:
+            await event_stream(scope, receive, send)
+        else:
+            await application(scope, receive, send)
+
+    return router
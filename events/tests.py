@@ -0,0 +1,215 @@
+import asyncio
+import json
+import time
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from accounts.serializers import MyTokenSerializer
+from courses.models import Course
+from groups.models import Group
+from groups.roster import RosterImport
+from homework.grading import grade_batch
+from homework.models import Homework, HomeworkSubmission
+from .broker import get_broker, message
+from .stream import event_stream, issue_ticket
+
+
+def access_token(user, lifetime=None):
+    token = MyTokenSerializer.get_token(user).access_token
+    if lifetime is not None:
+        token.set_exp(lifetime=lifetime)
+    return token
+
+
+def stream_ticket(user, lifetime=None):
+    """Ticket as POST /api/events/ticket/ would issue it for a fresh access token."""
+    return issue_ticket(user.id, access_token(user, lifetime)['exp'])
+
+
+class Stream:
+    """Drives event_stream() like an ASGI server and parses what it sends."""
+
+    def __init__(self, ticket):
+        self.receive = asyncio.Queue()
+        self.sent = asyncio.Queue()
+        self.pending = []
+        self.ended = False
+        scope = {
+            'type': 'http', 'method': 'GET', 'path': settings.EVENTS_PATH,
+            'query_string': ('ticket=%s' % ticket).encode(), 'headers': [],
+        }
+        self.task = asyncio.ensure_future(event_stream(scope, self.receive.get, self.sent.put))
+
+    async def start(self):
+        return await asyncio.wait_for(self.sent.get(), 5)
+
+    async def next(self):
+        """(event, data) of the next event, or None once the stream has ended."""
+        while not self.pending:
+            if self.ended:
+                return None
+            message = await asyncio.wait_for(self.sent.get(), 5)
+            for block in message.get('body', b'').decode().split('\n\n'):
+                fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line)
+                if 'event' in fields:
+                    self.pending.append((fields['event'], json.loads(fields['data'])))
+                elif block.startswith(':'):
+                    self.pending.append(('ping', None))
+            self.ended = not message.get('more_body', False)
+        return self.pending.pop(0)
+
+    async def disconnect(self):
+        await self.receive.put({'type': 'http.disconnect'})
+        await asyncio.wait_for(self.task, 5)
+
+
+class EventStreamTests(TransactionTestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        self.group = Group.objects.create(
+            name='P-1', course=Course.objects.create(name='Python', description=''), teacher=self.teacher
+        )
+        self.group.students.add(self.student)
+        self.student_ticket, self.teacher_ticket = stream_ticket(self.student), stream_ticket(self.teacher)
+
+    def tearDown(self):
+        get_broker().stop()
+
+    async def flow(self):
+        student, teacher = Stream(self.student_ticket), Stream(self.teacher_ticket)
+        start = await student.start()
+        self.assertEqual(start['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream; charset=utf-8'), start['headers'])
+        self.assertEqual(await student.next(), ('ready', {'user': self.student.id}))
+        await teacher.start()
+        self.assertEqual(await teacher.next(), ('ready', {'user': self.teacher.id}))
+
+        homework = await sync_to_async(Homework.objects.create)(group=self.group, title='Loops')
+        self.assertEqual(await student.next(), (
+            'homework', {'id': homework.id, 'group': self.group.id, 'title': 'Loops'}))
+
+        submission = await sync_to_async(HomeworkSubmission.objects.create)(
+            homework=homework, student=self.student, file='a.pdf')
+        self.assertEqual(await teacher.next(), (
+            'submission', {'id': submission.id, 'homework': homework.id, 'student': self.student.id}))
+
+        submission.score = 80
+        await sync_to_async(submission.save)()
+        self.assertEqual(await student.next(), (
+            'grade', {'submission': submission.id, 'homework': homework.id, 'score': 80}))
+
+        # bulk_update signal yubormaydi: grade_batch o'zi e'lon qiladi
+        await sync_to_async(grade_batch)(self.teacher, [{'submission_id': submission.id, 'score': 95}])
+        self.assertEqual(await student.next(), (
+            'grade', {'submission': submission.id, 'homework': homework.id, 'score': 95}))
+
+        for stream in (student, teacher):
+            await stream.disconnect()
+        self.assertEqual(dict(get_broker().hub.topics), {})
+
+    @override_settings(EVENTS_BROKER='events.broker.InProcessBroker')
+    async def test_in_process_broker(self):
+        await self.flow()
+
+    async def test_postgres_broker(self):
+        await self.flow()
+        self.assertIsNotNone(get_broker().listener)
+
+    async def rejected(self, ticket):
+        stream = Stream(ticket)
+        self.assertEqual((await stream.start())['status'], 401)
+        self.assertEqual(json.loads((await stream.sent.get())['body']), {'error': 'Invalid ticket'})
+        await stream.task
+
+    async def test_invalid_ticket(self):
+        await self.rejected('not-a-ticket')
+        # Access token chipta o'rnida ishlamaydi
+        await self.rejected(str(await sync_to_async(access_token)(self.student)))
+        with mock.patch('django.core.signing.time.time', return_value=time.time() + 60):
+            await self.rejected(self.student_ticket)
+
+    def test_ticket_endpoint(self):
+        client = APIClient()
+        self.assertEqual(client.post('/api/events/ticket/').status_code, 401)
+        token = access_token(self.student)
+        client.credentials(HTTP_AUTHORIZATION='Bearer %s' % token)
+        data = client.post('/api/events/ticket/').data
+        self.assertEqual(data, {'ticket': issue_ticket(self.student.id, token['exp']),
+                                'expires_in': settings.EVENTS_TICKET_MAX_AGE})
+
+    @override_settings(EVENTS_HEARTBEAT=0.1)
+    async def test_heartbeat_and_expiry(self):
+        stream = Stream(await sync_to_async(stream_ticket)(self.student, timedelta(seconds=1)))
+        await stream.start()
+        self.assertEqual((await stream.next())[0], 'ready')
+        self.assertEqual(await stream.next(), ('ping', None))
+
+        events = []
+        while (event := await stream.next()) is not None:
+            events.append(event)
+        self.assertEqual(events[-1], ('token', {'state': 'expired'}))
+        await stream.task
+
+    @override_settings(EVENTS_BROKER='events.broker.InProcessBroker')
+    async def test_deactivated_user_is_revoked(self):
+        stream = Stream(self.student_ticket)
+        await stream.start()
+        await stream.next()
+
+        self.student.is_active = False
+        await sync_to_async(self.student.save)()
+        self.assertEqual(await stream.next(), ('token', {'state': 'revoked'}))
+        self.assertIsNone(await stream.next())
+        await stream.task
+
+    @override_settings(EVENTS_QUEUE_SIZE=2)
+    async def test_slow_stream_gets_resync(self):
+        stream = Stream(self.student_ticket)
+        await stream.start()
+        await stream.next()
+
+        hub = get_broker().hub
+        for i in range(4):
+            hub.deliver(message(['user:%d' % self.student.id], 'grade', {'submission': i}))
+        # Navbat to'lgan: qolganlari o'rniga bitta resync
+        self.assertEqual(await stream.next(), ('resync', {}))
+        await stream.disconnect()
+
+    @override_settings(EVENTS_BROKER='events.broker.InProcessBroker')
+    async def test_topics_follow_membership(self):
+        stream = Stream(self.student_ticket)
+        await stream.start()
+        await stream.next()
+
+        other = await sync_to_async(Group.objects.create)(name='P-2', course=self.group.course, teacher=self.teacher)
+        await sync_to_async(other.students.add)(self.student)
+        self.assertEqual(await stream.next(), ('resync', {}))
+        homework = await sync_to_async(Homework.objects.create)(group=other, title='Joins')
+        self.assertEqual(await stream.next(), ('homework', {'id': homework.id, 'group': other.id, 'title': 'Joins'}))
+
+        await sync_to_async(self.student.student_groups.clear)()
+        self.assertEqual(await stream.next(), ('resync', {}))
+        self.assertEqual(get_broker().hub.topics.keys(), {'user:%d' % self.student.id})
+        await stream.disconnect()
+
+    @override_settings(EVENTS_BROKER='events.broker.InProcessBroker')
+    async def test_roster_import_updates_topics(self):
+        other = await sync_to_async(Group.objects.create)(name='P-2', course=self.group.course, teacher=self.teacher)
+        stream = Stream(self.student_ticket)
+        await stream.start()
+        await stream.next()
+
+        # Import a'zolikni bulk_create bilan yozadi: m2m_changed yo'q
+        roster = RosterImport({'enrollments': [{'group': 'P-2', 'student': self.student.phone, 'full_name': ''}]})
+        self.assertTrue(await sync_to_async(roster.run)())
+        self.assertEqual(await stream.next(), ('resync', {}))
+        homework = await sync_to_async(Homework.objects.create)(group=other, title='Imported')
+        self.assertEqual(await stream.next(), ('homework', {'id': homework.id, 'group': other.id, 'title': 'Imported'}))
+        await stream.disconnect()
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import StreamTicket
+
+urlpatterns = [
+    path('ticket/', StreamTicket.as_view(), name='events_ticket'),
+]
@@ -0,0 +1,16 @@
+from django.conf import settings
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .stream import issue_ticket
+
+
+class StreamTicket(APIView):
+    """POST -> ticket for opening the event stream (EVENTS_PATH?ticket=...)."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return Response({
+            "ticket": issue_ticket(request.user.id, request.auth['exp']),
+            "expires_in": settings.EVENTS_TICKET_MAX_AGE,
+        })
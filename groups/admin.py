@@ -1,6 +1,12 @@
-from django.contrib import admin
+import io
+
+from django.contrib import admin, messages
 from django import forms
+from django.http import HttpResponse
+from django.shortcuts import redirect, render
+from django.urls import path
 from .models import Group
+from .roster import RosterImport, RowError
 
 class GroupAdminForm(forms.ModelForm):
     days = forms.MultipleChoiceField(
@@ -14,10 +20,54 @@ class GroupAdminForm(forms.ModelForm):
         fields = '__all__'
 
 
+class RosterImportForm(forms.Form):
+    file = forms.FileField(help_text="XLSX (groups, enrollments, schedule, rules varaqlari) yoki shu nomli CSV")
+    dry_run = forms.BooleanField(required=False, initial=True, label="Faqat tekshirish")
+
+
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
     form = GroupAdminForm
     list_display = ('name', 'course', 'teacher', 'get_days')
+    change_list_template = 'admin/groups/group/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_roster), name='groups_group_import'),
+        ]
+        return urls + super().get_urls()
+
+    def import_roster(self, request):
+        if not self.has_add_permission(request):
+            return redirect('admin:groups_group_changelist')
+
+        form = RosterImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            try:
+                roster = RosterImport.from_files([(upload, upload.name)])
+                valid = roster.run(dry_run=form.cleaned_data['dry_run'])
+            except RowError as exc:
+                form.add_error('file', str(exc))
+            else:
+                if valid:
+                    self.message_user(request, roster.summary(), messages.SUCCESS)
+                    return redirect('admin:groups_group_changelist')
+
+                # Xatolar fayli: har bir noto'g'ri qator alohida
+                text = io.StringIO()
+                roster.write_errors(text)
+                response = HttpResponse(text.getvalue(), content_type='text/csv')
+                response['Content-Disposition'] = 'attachment; filename="import_errors.csv"'
+                return response
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': 'Import roster',
+        }
+        return render(request, 'admin/groups/group/import.html', context)
 
     def get_days(self, obj):
         return ", ".join(obj.days)
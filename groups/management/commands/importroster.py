@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from groups.roster import SHEETS, RosterImport, RowError
+
+
+class Command(BaseCommand):
+    help = (
+        'Import groups, enrollments, schedule rows and schedule rules from CSV '
+        'files (named %s) or XLSX workbooks with sheets of the same names'
+        % ', '.join('%s.csv' % s for s in SHEETS)
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Validate every row without writing anything')
+        parser.add_argument('--errors', metavar='PATH',
+                            help='Write per-row errors to this CSV file')
+
+    def handle(self, *args, **options):
+        opened = [open(path, 'rb') for path in options['files']]
+        try:
+            roster = RosterImport.from_files(zip(opened, options['files']))
+            valid = roster.run(dry_run=options['dry_run'])
+        except RowError as exc:
+            raise CommandError(str(exc))
+        finally:
+            for fileobj in opened:
+                fileobj.close()
+
+        if valid:
+            self.stdout.write(roster.summary())
+            return
+
+        if options['errors']:
+            with open(options['errors'], 'w', newline='', encoding='utf-8') as fileobj:
+                roster.write_errors(fileobj)
+        for sheet, row, message in roster.errors[:20]:
+            self.stdout.write('%s:%d: %s' % (sheet, row, message))
+        raise CommandError('%d invalid rows, nothing imported' % len(roster.errors))
@@ -0,0 +1,320 @@
+import csv
+import io
+import os
+import re
+from collections import Counter
+from datetime import date, datetime, time
+
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_time
+
+from accounts.models import User
+from apicache.signals import group_audience, invalidate
+from courses.models import Course
+from events.signals import publish_memberships
+from schedules.models import Schedule, ScheduleRule
+from schedules.recurrence import WEEKDAYS
+from stats.signals import rebuild_groups
+from .models import Group
+
+Membership = Group.students.through
+
+# sheet (CSV fayl nomi yoki XLSX varaq nomi) -> ustunlar; * = majburiy
+SHEETS = {
+    'groups': ('name*', 'course*', 'teacher*', 'days*'),
+    'enrollments': ('group*', 'student*', 'full_name'),
+    'schedule': ('group*', 'date*', 'start_time*', 'end_time*', 'subject*'),
+    'rules': ('group*', 'start_time*', 'end_time*', 'subject*', 'starts_on*', 'ends_on'),
+}
+BATCH_SIZE = 1000
+GROUP_DAYS = {code for code, _ in Group.DAYS}
+
+
+class RowError(Exception):
+    pass
+
+
+def cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        # Excel telefon raqamlarini son sifatida saqlaydi
+        value = int(value)
+    return str(value).strip()
+
+
+def read_csv(fileobj):
+    if isinstance(fileobj.read(0), bytes):
+        fileobj = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    return [{k.strip().lower(): v for k, v in row.items() if k} for row in csv.DictReader(fileobj)]
+
+
+def read_xlsx(fileobj):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    sheets = {}
+    for sheet in workbook.worksheets:
+        rows = sheet.iter_rows(values_only=True)
+        header = [cell_text(c).lower() for c in next(rows, ())]
+        sheets[sheet.title.strip().lower()] = [
+            dict(zip(header, row)) for row in rows if any(c is not None for c in row)
+        ]
+    workbook.close()
+    return sheets
+
+
+def read_source(fileobj, name):
+    """{sheet: [row dicts]} from a CSV (sheet = file name) or an XLSX workbook."""
+    stem, ext = os.path.splitext(os.path.basename(name))
+    if ext.lower() == '.xlsx':
+        return read_xlsx(fileobj)
+    if ext.lower() == '.csv':
+        return {stem.lower(): read_csv(fileobj)}
+    raise RowError('Unsupported file type: %s' % name)
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        parsed = parse_date(cell_text(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise RowError('expected a YYYY-MM-DD date, got %r' % value)
+    return parsed
+
+
+def to_time(value):
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, time):
+        return value
+    try:
+        parsed = parse_time(cell_text(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise RowError('expected a HH:MM time, got %r' % value)
+    return parsed
+
+
+class RosterImport:
+    """
+    Validate every row first, then load groups, new students, memberships,
+    schedule rows and rules with batched bulk_create in one transaction.
+    Nothing is written if any row is invalid.
+    """
+
+    def __init__(self, sheets):
+        unknown = set(sheets) - set(SHEETS)
+        if unknown:
+            raise RowError('Unknown sheet(s): %s' % ', '.join(sorted(unknown)))
+        self.sheets = sheets
+        self.errors = []  # (sheet, row, message)
+        self.counts = Counter()
+
+        self.new_groups = {}
+        self.new_students = {}
+        self.memberships = {}
+        self.schedules = []
+        self.rules = []
+
+    @classmethod
+    def from_files(cls, files):
+        """files: iterable of (fileobj, name)."""
+        sheets = {}
+        for fileobj, name in files:
+            for sheet, rows in read_source(fileobj, name).items():
+                sheets.setdefault(sheet, []).extend(rows)
+        return cls(sheets)
+
+    def rows(self, sheet):
+        columns = SHEETS[sheet]
+        for number, raw in enumerate(self.sheets.get(sheet, ()), start=2):
+            row = {}
+            for column in columns:
+                name = column.rstrip('*')
+                row[name] = raw.get(name)
+                if column.endswith('*') and not cell_text(row[name]):
+                    self.errors.append((sheet, number, '%s is required' % name))
+                    break
+            else:
+                yield number, row
+
+    def collect(self, sheet, column):
+        return {cell_text(r.get(column)) for r in self.sheets.get(sheet, ())} - {''}
+
+    def preload(self):
+        """Every lookup the rows need, one query per table."""
+        phones = self.collect('groups', 'teacher') | self.collect('enrollments', 'student')
+        self.users = {u.phone: u for u in User.objects.filter(phone__in=phones)}
+
+        self.courses = {}
+        for course in Course.objects.filter(name__in=self.collect('groups', 'course')):
+            self.courses.setdefault(course.name, []).append(course)
+
+        names = set()
+        for sheet in ('groups', 'enrollments', 'schedule', 'rules'):
+            names |= self.collect(sheet, 'name' if sheet == 'groups' else 'group')
+        self.existing_groups = {}
+        for group in Group.objects.filter(name__in=names):
+            self.existing_groups.setdefault(group.name, []).append(group)
+
+    def find_group(self, name):
+        name = cell_text(name)
+        if name in self.new_groups:
+            return self.new_groups[name]
+        found = self.existing_groups.get(name, [])
+        if not found:
+            raise RowError('unknown group %r' % name)
+        if len(found) > 1:
+            raise RowError('group name %r is ambiguous' % name)
+        return found[0]
+
+    def validate(self):
+        self.preload()
+        handlers = (
+            ('groups', self.add_group),
+            ('enrollments', self.add_enrollment),
+            ('schedule', self.add_schedule),
+            ('rules', self.add_rule),
+        )
+        for sheet, handler in handlers:
+            for number, row in self.rows(sheet):
+                try:
+                    handler(row)
+                except RowError as exc:
+                    self.errors.append((sheet, number, str(exc)))
+        return not self.errors
+
+    def add_group(self, row):
+        name = cell_text(row['name'])
+        if name in self.new_groups or name in self.existing_groups:
+            raise RowError('group %r already exists' % name)
+
+        courses = self.courses.get(cell_text(row['course']), [])
+        if len(courses) != 1:
+            raise RowError('course %r %s' % (row['course'], 'is ambiguous' if courses else 'not found'))
+
+        teacher = self.users.get(cell_text(row['teacher']))
+        if teacher is None or teacher.role != 'TEACHER':
+            raise RowError('teacher %r not found' % row['teacher'])
+
+        days = re.split(r'[\s,;]+', cell_text(row['days']))
+        bad = [d for d in days if d not in GROUP_DAYS]
+        if bad:
+            raise RowError('unknown day(s): %s' % ', '.join(bad))
+
+        self.new_groups[name] = Group(name=name, course=courses[0], teacher=teacher, days=days)
+
+    def add_enrollment(self, row):
+        group = self.find_group(row['group'])
+        phone = cell_text(row['student'])
+
+        student = self.users.get(phone) or self.new_students.get(phone)
+        if student is None:
+            student = User(phone=phone, role='STUDENT', full_name=cell_text(row['full_name']) or None)
+            student.set_unusable_password()
+            self.new_students[phone] = student
+        elif student.role != 'STUDENT':
+            raise RowError('%s is not a student' % phone)
+
+        self.memberships[(id(group), phone)] = (group, student)
+
+    def lesson_times(self, row):
+        start, end = to_time(row['start_time']), to_time(row['end_time'])
+        if end <= start:
+            raise RowError('end_time must be after start_time')
+        return start, end
+
+    def add_schedule(self, row):
+        group = self.find_group(row['group'])
+        lesson_date = to_date(row['date'])
+        start, end = self.lesson_times(row)
+        # bulk_create save() ni chaqirmaydi: day shu yerda to'ldiriladi
+        self.schedules.append(Schedule(
+            group=group, date=lesson_date, day=WEEKDAYS[lesson_date.weekday()],
+            start_time=start, end_time=end, subject=cell_text(row['subject'])
+        ))
+
+    def add_rule(self, row):
+        group = self.find_group(row['group'])
+        start, end = self.lesson_times(row)
+        starts_on = to_date(row['starts_on'])
+        ends_on = to_date(row['ends_on']) if cell_text(row['ends_on']) else None
+        if ends_on and ends_on < starts_on:
+            raise RowError('ends_on is before starts_on')
+        self.rules.append(ScheduleRule(
+            group=group, start_time=start, end_time=end, subject=cell_text(row['subject']),
+            starts_on=starts_on, ends_on=ends_on
+        ))
+
+    @transaction.atomic
+    def load(self):
+        Group.objects.bulk_create(self.new_groups.values(), batch_size=BATCH_SIZE)
+        User.objects.bulk_create(self.new_students.values(), batch_size=BATCH_SIZE)
+
+        # Obyektlar endi id ga ega: FK larni qayta bog'lash
+        for obj in self.schedules + self.rules:
+            obj.group_id = obj.group.id
+        # ignore_conflicts bilan bulk_create urinilgan qatorlarni qaytaradi: mavjud a'zolik oldindan ajratiladi
+        pairs = [(g.id, s.id) for g, s in self.memberships.values()]
+        existing = set(Membership.objects.filter(
+            group_id__in={group_id for group_id, _ in pairs},
+            user_id__in={user_id for _, user_id in pairs},
+        ).values_list('group_id', 'user_id'))
+        created = Membership.objects.bulk_create(
+            [Membership(group_id=g, user_id=u) for g, u in pairs if (g, u) not in existing],
+            batch_size=BATCH_SIZE, ignore_conflicts=True
+        )
+        Schedule.objects.bulk_create(self.schedules, batch_size=BATCH_SIZE)
+        ScheduleRule.objects.bulk_create(self.rules, batch_size=BATCH_SIZE)
+
+        self.counts.update({
+            'groups': len(self.new_groups),
+            'students': len(self.new_students),
+            'enrollments': len(created),
+            'schedule': len(self.schedules),
+            'rules': len(self.rules),
+        })
+        touched = {g.id for g in self.new_groups.values()}
+        touched |= {m.group_id for m in created}
+        touched |= {obj.group_id for obj in self.schedules + self.rules}
+        self.refresh_derived(touched, created)
+
+    def refresh_derived(self, group_ids, enrollments=()):
+        # bulk_create signal yubormaydi: hisoblagichlar, API kesh va ochiq streamlar qo'lda
+        group_ids = list(group_ids)
+        rebuild_groups(group_ids)
+        invalidate(group_audience(group_ids))
+
+        # {student_id: [group_id, ...]}: talabaning ochiq streami yangi guruh topiclariga ulanadi
+        added = {}
+        for m in sorted(enrollments, key=lambda m: (m.user_id, m.group_id)):
+            added.setdefault(m.user_id, []).append(m.group_id)
+        if added:
+            transaction.on_commit(lambda: publish_memberships(added, 'added'))
+
+    def run(self, dry_run=False):
+        """Validate, then load unless dry_run; returns True if the data was valid."""
+        if not self.validate():
+            return False
+        if not dry_run:
+            self.load()
+        return True
+
+    def write_errors(self, fileobj):
+        writer = csv.writer(fileobj)
+        writer.writerow(['sheet', 'row', 'error'])
+        writer.writerows(self.errors)
+
+    def summary(self):
+        if not self.counts:
+            return 'valid: %d groups, %d new students, %d enrollments, %d lessons, %d rules' % (
+                len(self.new_groups), len(self.new_students), len(self.memberships),
+                len(self.schedules), len(self.rules))
+        return 'imported: ' + ', '.join('%d %s' % (n, k) for k, n in self.counts.items())
@@ -1,3 +1,183 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
 
-# Create your tests here.
+import openpyxl
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from courses.models import Course
+from schedules.models import Schedule, ScheduleRule
+from stats.counters import verify
+from stats.models import GroupCounters, StudentCounters, TeacherCounters
+from .models import Group
+from .roster import RosterImport
+
+
+def roster(groups=2, students=3, lessons=4):
+    """Sheets for `groups` new groups, each with its own students and lessons."""
+    sheets = {'groups': [], 'enrollments': [], 'schedule': [], 'rules': []}
+    for g in range(groups):
+        name = 'G-%d' % g
+        sheets['groups'].append({'name': name, 'course': 'Python', 'teacher': '998900000001',
+                                 'days': 'Mon, Wed'})
+        sheets['enrollments'] += [
+            {'group': name, 'student': '99891%03d%04d' % (g, s), 'full_name': 'S %d' % s}
+            for s in range(students)
+        ]
+        sheets['schedule'] += [
+            {'group': name, 'date': date(2026, 9, 1) + timedelta(days=d), 'start_time': '09:00',
+             'end_time': '10:30', 'subject': 'Python'}
+            for d in range(lessons)
+        ]
+        sheets['rules'].append({'group': name, 'start_time': '14:00', 'end_time': '15:00',
+                                'subject': 'Python', 'starts_on': '2026-09-01', 'ends_on': ''})
+    return sheets
+
+
+class RosterImportTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        Course.objects.create(name='Python', description='')
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def write_csvs(self, sheets):
+        paths = []
+        for sheet, rows in sheets.items():
+            path = os.path.join(self.tmp, sheet + '.csv')
+            with open(path, 'w', encoding='utf-8') as fileobj:
+                fileobj.write(','.join(rows[0]) + '\n')
+                fileobj.writelines(','.join('"%s"' % v for v in row.values()) + '\n' for row in rows)
+            paths.append(path)
+        return paths
+
+    def test_csv_import(self):
+        call_command('importroster', *self.write_csvs(roster()), stdout=io.StringIO())
+
+        self.assertEqual(Group.objects.count(), 2)
+        group = Group.objects.get(name='G-1')
+        self.assertEqual(group.days, ['Mon', 'Wed'])
+        self.assertEqual(group.students.count(), 3)
+        self.assertFalse(group.students.first().has_usable_password())
+
+        # 2026-09-01 seshanba: day bulk load paytida to'ldirilgan
+        lesson = Schedule.objects.filter(group=group).order_by('date').first()
+        self.assertEqual((lesson.date, lesson.day), (date(2026, 9, 1), 'Tue'))
+        self.assertEqual(ScheduleRule.objects.filter(group=group).count(), 1)
+
+        for model in (GroupCounters, TeacherCounters, StudentCounters):
+            self.assertEqual(verify(model), [], model.__name__)
+
+    def test_queries_do_not_grow_with_rows(self):
+        def load(sheets):
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertTrue(RosterImport(sheets).run())
+            return len(ctx.captured_queries)
+
+        small = load(roster(groups=1, students=2, lessons=2))
+        Group.objects.all().delete()
+        large = load(roster(groups=20, students=30, lessons=40))
+        self.assertEqual(small, large)
+
+    def test_xlsx_existing_group_and_student(self):
+        existing = Group.objects.create(name='Old', course=Course.objects.get(), teacher=self.teacher)
+        User.objects.create_user('998910000001', 'pass', role='STUDENT')
+
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = 'enrollments'
+        sheet.append(['group', 'student'])
+        sheet.append(['Old', 998910000001])
+        sheet = workbook.create_sheet('schedule')
+        sheet.append(['group', 'date', 'start_time', 'end_time', 'subject'])
+        sheet.append(['Old', date(2026, 9, 7), '09:00', '10:00', 'Extra'])
+        buffer = io.BytesIO()
+        workbook.save(buffer)
+        buffer.seek(0)
+
+        self.assertTrue(RosterImport.from_files([(buffer, 'term.xlsx')]).run())
+        self.assertEqual(existing.students.get().phone, '998910000001')
+        self.assertEqual(Schedule.objects.get(group=existing).day, 'Mon')
+
+    def test_reimport_counts_only_new_enrollments(self):
+        sheets = roster(groups=2, students=3, lessons=0)
+        first = RosterImport(sheets)
+        self.assertTrue(first.run())
+        self.assertEqual(first.counts['enrollments'], 6)
+
+        # Guruhlar bor, talabalar allaqachon a'zo; bittasi yangi
+        enrollments = sheets['enrollments'] + [{'group': 'G-0', 'student': '998919999999', 'full_name': 'New'}]
+        again = RosterImport({'enrollments': enrollments})
+        self.assertTrue(again.run())
+        self.assertEqual(again.counts['enrollments'], 1)
+
+        again = RosterImport({'enrollments': enrollments})
+        self.assertTrue(again.run())
+        self.assertEqual(again.counts['enrollments'], 0)
+        self.assertEqual(Group.students.through.objects.count(), 7)
+
+    def test_dry_run_and_error_file(self):
+        sheets = roster()
+        call_command('importroster', *self.write_csvs(sheets), '--dry-run', stdout=io.StringIO())
+        self.assertFalse(Group.objects.exists())
+
+        sheets['groups'][1]['teacher'] = '000'
+        sheets['schedule'][0]['date'] = '2026-13-01'
+        sheets['schedule'][1]['end_time'] = '08:00'
+        sheets['enrollments'][0]['student'] = ''
+        errors = os.path.join(self.tmp, 'errors.csv')
+        with self.assertRaises(CommandError):
+            call_command('importroster', *self.write_csvs(sheets), '--errors', errors,
+                         stdout=io.StringIO())
+
+        self.assertFalse(Group.objects.exists())
+        self.assertFalse(User.objects.filter(role='STUDENT').exists())
+        with open(errors, newline='') as fileobj:
+            rows = [tuple(row) for row in csv.reader(fileobj)]
+        self.assertEqual(rows[0], ('sheet', 'row', 'error'))
+        self.assertIn(('groups', '3', "teacher '000' not found"), rows)
+        self.assertIn(('enrollments', '2', 'student is required'), rows)
+        self.assertIn(('schedule', '2', "expected a YYYY-MM-DD date, got '2026-13-01'"), rows)
+        self.assertIn(('schedule', '3', 'end_time must be after start_time'), rows)
+        # G-1 yaratilmagan: unga bog'langan qatorlar ham xato
+        self.assertIn(('rules', '3', "unknown group 'G-1'"), rows)
+
+
+@override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage')
+class GroupAdminImportTests(TestCase):
+    def setUp(self):
+        admin = User.objects.create_superuser('998900000000', 'pass')
+        User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        Course.objects.create(name='Python', description='')
+        self.client.force_login(admin)
+
+    def upload(self, content, dry_run=False):
+        data = {'file': SimpleUploadedFile('groups.csv', content.encode())}
+        if dry_run:
+            data['dry_run'] = 'on'
+        return self.client.post('/admin/groups/group/import/', data)
+
+    def test_import(self):
+        self.assertContains(self.client.get('/admin/groups/group/'), 'import/')
+
+        response = self.upload('name,course,teacher,days\nP-1,Python,998900000001,Mon Fri\n', dry_run=True)
+        self.assertRedirects(response, '/admin/groups/group/')
+        self.assertFalse(Group.objects.exists())
+
+        self.upload('name,course,teacher,days\nP-1,Python,998900000001,Mon Fri\n')
+        self.assertEqual(Group.objects.get().days, ['Mon', 'Fri'])
+
+    def test_errors_are_downloaded(self):
+        response = self.upload('name,course,teacher,days\nP-1,Java,998900000001,Sun\n')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn(b"groups,2,course 'Java' not found", response.content)
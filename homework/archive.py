@@ -0,0 +1,117 @@
+import csv
+import io
+import os
+import re
+import zipfile
+
+from django.utils import timezone
+
+from .models import HomeworkSubmission
+
+# Allaqachon siqilgan formatlar qayta siqilmaydi (ZIP_STORED)
+STORED_EXTENSIONS = {
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.docx', '.xlsx', '.pptx', '.odt', '.zip', '.rar', '.7z', '.gz', '.mp3', '.mp4',
+}
+MANIFEST_NAME = 'manifest.csv'
+MANIFEST_HEADER = ['Student', 'Phone', 'Homework', 'Submitted at', 'Late', 'Score', 'File']
+ARCHIVE_BLOCK_SIZE = 64 * 1024
+ARCHIVE_CHUNK_SIZE = 500
+
+
+class ZipBuffer:
+    """Write-only sink for ZipFile; the generator drains it after every write."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def archive_submissions(homework_id=None, group_id=None):
+    submissions = HomeworkSubmission.objects.select_related('student', 'homework')
+    if homework_id is not None:
+        submissions = submissions.filter(homework_id=homework_id)
+    else:
+        submissions = submissions.filter(homework__group_id=group_id)
+    return submissions.order_by('homework__created_at', 'homework_id', 'student__phone')
+
+
+def safe_name(text):
+    return re.sub(r'[^\w.-]+', '_', text).strip('._') or 'file'
+
+
+def entry_name(submission, nested):
+    """'<student>_<phone>.pdf', inside a folder per homework for a group archive."""
+    student = submission.student
+    label = safe_name('%s_%s' % (student.full_name, student.phone) if student.full_name else student.phone)
+    name = label + os.path.splitext(submission.file.name)[1].lower()
+    if nested:
+        homework = submission.homework
+        name = '%d_%s/%s' % (homework.id, safe_name(homework.title), name)
+    return name
+
+
+def write_entry(archive, buffer, submission, name):
+    """Yield the archive bytes for one submission file as it is read."""
+    ext = os.path.splitext(name)[1]
+    info = zipfile.ZipInfo(name, date_time=timezone.localtime(submission.submitted_at).timetuple()[:6])
+    info.compress_type = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+    info.file_size = submission.file.size
+
+    with submission.file.open('rb') as src, archive.open(info, 'w') as dst:
+        for block in iter(lambda: src.read(ARCHIVE_BLOCK_SIZE), b''):
+            dst.write(block)
+            yield buffer.drain()
+
+
+def iter_zip(submissions, nested=False):
+    """
+    Stream a ZIP of the submission files followed by a CSV manifest.
+
+    ZipFile writes to an unseekable buffer, so every entry carries a data
+    descriptor and nothing is ever rewound: memory stays at one block plus
+    the ids of missing files, and no temporary file is used. The queryset
+    is read twice with .iterator(): once for the files, once for the
+    manifest.
+    """
+    buffer = ZipBuffer()
+    missing = set()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for submission in submissions.iterator(chunk_size=ARCHIVE_CHUNK_SIZE):
+            try:
+                yield from write_entry(archive, buffer, submission, entry_name(submission, nested))
+            except FileNotFoundError:
+                missing.add(submission.id)
+            yield buffer.drain()
+
+        with archive.open(MANIFEST_NAME, 'w') as dst:
+            text = io.TextIOWrapper(dst, encoding='utf-8-sig', newline='')
+            writer = csv.writer(text)
+            writer.writerow(MANIFEST_HEADER)
+            for i, submission in enumerate(submissions.iterator(chunk_size=ARCHIVE_CHUNK_SIZE), 1):
+                writer.writerow([
+                    submission.student.full_name or '',
+                    submission.student.phone,
+                    submission.homework.title,
+                    timezone.localtime(submission.submitted_at).isoformat(),
+                    'yes' if submission.is_late() else 'no',
+                    '' if submission.score is None else submission.score,
+                    '' if submission.id in missing else entry_name(submission, nested),
+                ])
+                if i % ARCHIVE_CHUNK_SIZE == 0:
+                    text.flush()
+                    yield buffer.drain()
+            text.flush()
+            text.detach()
+    yield buffer.drain()
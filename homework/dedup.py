@@ -0,0 +1,115 @@
+import os
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Blob, HomeworkSubmission
+from .storage import content_digest
+from .uploads import file_sha256
+
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def adopt_legacy(name, refs, dry_run=False, seen=None):
+    """
+    Move one plain-named file into the blob store and point its
+    submissions at the content name. Returns (size, duplicate).
+    """
+    field = HomeworkSubmission._meta.get_field('file')
+    storage = field.storage
+    path = storage.path(name)
+    size = os.path.getsize(path)
+    digest = file_sha256(path)
+
+    if dry_run:
+        duplicate = digest in seen or os.path.exists(storage.blob_path(digest))
+        seen.add(digest)
+        return size, duplicate
+
+    with transaction.atomic():
+        HomeworkSubmission.objects.filter(file=name).update(
+            file=storage.content_name(name, digest, field.max_length)
+        )
+        duplicate = not storage.acquire(path, digest, size, refs)
+        transaction.on_commit(lambda: remove_file(path))
+    return size, duplicate
+
+
+def recount():
+    """Fix refcounts that drifted from the submission rows; returns the number fixed."""
+    expected = Counter()
+    for name in HomeworkSubmission.objects.values_list('file', flat=True).iterator():
+        digest = content_digest(name)
+        if digest:
+            expected[digest] += 1
+
+    fixed = 0
+    for digest, refcount in Blob.objects.values_list('digest', 'refcount').iterator():
+        if refcount != expected[digest]:
+            Blob.objects.filter(pk=digest).update(refcount=expected[digest])
+            fixed += 1
+    return fixed
+
+
+def collect_blobs(min_age):
+    """Remove blobs nobody references and blob files with no row. Returns (count, bytes)."""
+    storage = HomeworkSubmission._meta.get_field('file').storage
+    count = size = 0
+    for digest, blob_size in Blob.objects.filter(refcount=0).values_list('digest', 'size'):
+        if storage.release(digest):
+            count += 1
+            size += blob_size
+
+    root = storage.path(settings.HOMEWORK_BLOB_DIR)
+    if not os.path.isdir(root):
+        return count, size
+    known = set(Blob.objects.values_list('digest', flat=True))
+    cutoff = time.time() - min_age.total_seconds()
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            # ctime: hard link paytida yangilanadi, yozilayotgan blob ga tegilmaydi
+            if filename not in known and stat.st_ctime < cutoff:
+                os.remove(path)
+                count += 1
+                size += stat.st_size
+    return count, size
+
+
+def deduplicate(min_age, dry_run=False):
+    """
+    Move every plain-named submission file into the blob store, dropping
+    copies whose content is already stored, then repair refcounts and
+    remove unreferenced blobs. Returns a Counter of what happened.
+    """
+    stats = Counter()
+    names = Counter(
+        name for name in HomeworkSubmission.objects.values_list('file', flat=True).iterator()
+        if name and not content_digest(name)
+    )
+    storage = HomeworkSubmission._meta.get_field('file').storage
+    seen = set()
+    for name, refs in names.items():
+        if not storage.exists(name):
+            stats['missing'] += 1
+            continue
+        size, duplicate = adopt_legacy(name, refs, dry_run, seen)
+        stats['files'] += 1
+        stats['bytes'] += size
+        if duplicate:
+            stats['duplicates'] += 1
+            stats['saved'] += size
+
+    if not dry_run:
+        stats['recounted'] = recount()
+        stats['collected'], collected_bytes = collect_blobs(min_age)
+        stats['saved'] += collected_bytes
+    return stats
@@ -0,0 +1,107 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apicache.signals import invalidate
+from events.broker import publish_many
+from events.signals import grade_message
+from stats.counters import bump, bump_many
+from stats.models import GroupCounters, StudentCounters, TeacherCounters
+from stats.signals import score_change_deltas
+from .models import HomeworkSubmission
+
+MAX_BATCH_SIZE = 200
+GRADED_FIELDS = ['score', 'feedback', 'graded_at', 'updated_at']
+
+
+def parse_grade(item):
+    """(submission_id, score, feedback) or raise ValueError with a message."""
+    if not isinstance(item, dict):
+        raise ValueError('Expected an object')
+    try:
+        submission_id = int(item['submission_id'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('submission_id is required')
+    try:
+        score = int(item['score'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('score must be an integer')
+    if score < 0:
+        raise ValueError('score must not be negative')
+    return submission_id, score, str(item.get('feedback') or '')
+
+
+def grade_batch(teacher, items):
+    """
+    Grade many submissions at once. Ownership for the whole batch is
+    checked with one joined query and the rows are written with a single
+    bulk_update; returns one result per item, in input order.
+
+    bulk_update sends no signals, so updated_at, the stats counters, the
+    API cache and the 'grade' events are maintained here.
+    """
+    results = []
+    grades = {}
+    for item in items:
+        try:
+            submission_id, score, feedback = parse_grade(item)
+        except ValueError as exc:
+            submission_id = item.get('submission_id') if isinstance(item, dict) else None
+            results.append({'submission_id': submission_id, 'status': 'error', 'error': str(exc)})
+            continue
+        if submission_id in grades:
+            results.append({'submission_id': submission_id, 'status': 'error', 'error': 'Duplicate submission'})
+            continue
+        grades[submission_id] = (score, feedback)
+        results.append({'submission_id': submission_id, 'status': None})
+
+    with transaction.atomic():
+        submissions = {
+            s.id: s for s in HomeworkSubmission.objects
+            .select_for_update(of=('self',))
+            .filter(id__in=list(grades))
+            .annotate(group_id=F('homework__group_id'), teacher_id=F('homework__group__teacher_id'))
+            .only('id', 'homework_id', 'student_id', 'score')
+        }
+
+        now = timezone.now()
+        graded = []
+        student_deltas = defaultdict(Counter)
+        group_deltas = defaultdict(Counter)
+        teacher_deltas = Counter()
+
+        for result in results:
+            if result['status'] is not None:
+                continue
+            submission = submissions.get(result['submission_id'])
+            if submission is None:
+                result.update(status='error', error='Submission not found')
+                continue
+            if submission.teacher_id != teacher.id:
+                result.update(status='error', error='Not your submission')
+                continue
+
+            score, feedback = grades[submission.id]
+            deltas = score_change_deltas(submission.score, score)
+            student_deltas[submission.student_id].update(deltas)
+            group_deltas[submission.group_id].update(deltas)
+            teacher_deltas.update(deltas)
+
+            submission.score = score
+            submission.feedback = feedback
+            submission.graded_at = now
+            submission.updated_at = now
+            graded.append(submission)
+            result['status'] = 'graded'
+
+        if graded:
+            HomeworkSubmission.objects.bulk_update(graded, GRADED_FIELDS)
+            bump_many(StudentCounters, student_deltas)
+            bump_many(GroupCounters, group_deltas)
+            bump(TeacherCounters, teacher_deltas, pk=teacher.id)
+            invalidate(list(student_deltas) + [teacher.id])
+            publish_many([grade_message(submission) for submission in graded])
+
+    return results
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from homework.uploads import collect_stale
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked uploads that were not touched for a while, and orphaned partial files'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, metavar='SECONDS',
+                            help='Default: HOMEWORK_UPLOAD_TTL')
+
+    def handle(self, *args, **options):
+        max_age = None if options['max_age'] is None else timedelta(seconds=options['max_age'])
+        sessions, files = collect_stale(max_age)
+        self.stdout.write('%d stale uploads, %d orphaned files removed' % (sessions, files))
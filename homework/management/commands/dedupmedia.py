@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from homework.dedup import deduplicate
+
+
+class Command(BaseCommand):
+    help = 'Move submission files into the content-addressed store and report the space saved'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Hash the files and report, without changing anything')
+        parser.add_argument('--min-age', type=int, default=3600, metavar='SECONDS',
+                            help='Blob files without a row are removed only if older than this')
+
+    def handle(self, *args, **options):
+        stats = deduplicate(timedelta(seconds=options['min_age']), options['dry_run'])
+        self.stdout.write('%d files (%s) checked, %d duplicates, %d missing' % (
+            stats['files'], filesizeformat(stats['bytes']), stats['duplicates'], stats['missing']))
+        if not options['dry_run']:
+            self.stdout.write('%d refcounts repaired, %d unreferenced blobs removed' % (
+                stats['recounted'], stats['collected']))
+        self.stdout.write('%s %s' % ('would save' if options['dry_run'] else 'saved',
+                                     filesizeformat(stats['saved'])))
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homework', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='homework',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='homeworksubmission',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('groups', '0001_initial'),
+        ('homework', '0002_homework_updated_at_homeworksubmission_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='homework',
+            name='group',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='groups.group'),
+        ),
+        migrations.AlterField(
+            model_name='homeworksubmission',
+            name='student',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'STUDENT'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='homework',
+            index=models.Index(fields=['group', '-created_at', '-id'], name='homework_group_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homeworksubmission',
+            index=models.Index(fields=['student', '-submitted_at', '-id'], name='submission_student_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='homeworksubmission',
+            index=models.Index(condition=models.Q(('score__isnull', True)), fields=['homework'], name='submission_ungraded_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:41
+
+from django.db import migrations, models
+import homework.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homework', '0004_uploadsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('digest', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('size', models.BigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='homeworksubmission',
+            name='file',
+            field=models.FileField(max_length=255, storage=homework.storage.ContentAddressedStorage(), upload_to='homeworks/'),
+        ),
+    ]
@@ -1,19 +1,27 @@
+import uuid
+
 from django.db import models
 from django.utils import timezone
 from datetime import timedelta
 from groups.models import Group
 from accounts.models import User
+from .storage import submission_storage
+
+# Topshirish muddati: vazifa yaratilgandan keyin
+SUBMISSION_WINDOW = timedelta(hours=24)
 
 
 class Homework(models.Model):
-    group = models.ForeignKey(Group, on_delete=models.CASCADE)
+    # homework_group_recent_idx guruh bo'yicha qidiruvni ham qoplaydi
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, db_index=False)
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def deadline(self):
         """Return deadline (24 hours after creation)"""
-        return self.created_at + timedelta(hours=24)
+        return self.created_at + SUBMISSION_WINDOW
 
     def is_expired(self):
         """Check if homework deadline has passed"""
@@ -24,6 +32,10 @@ class Homework(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Talaba lentasi: guruh bo'yicha, eng yangisi birinchi
+            models.Index(fields=['group', '-created_at', '-id'], name='homework_group_recent_idx'),
+        ]
 
 
 class HomeworkSubmission(models.Model):
@@ -31,15 +43,17 @@ class HomeworkSubmission(models.Model):
     student = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
-        limit_choices_to={'role': 'STUDENT'}
+        limit_choices_to={'role': 'STUDENT'},
+        db_index=False
     )
-    file = models.FileField(upload_to='homeworks/')
+    file = models.FileField(upload_to='homeworks/', storage=submission_storage, max_length=255)
     submitted_at = models.DateTimeField(auto_now_add=True)
     
     # Grading fields
     score = models.IntegerField(null=True, blank=True)
     feedback = models.TextField(blank=True)
     graded_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def is_late(self):
         """Check if submission was late"""
@@ -50,4 +64,45 @@ class HomeworkSubmission(models.Model):
 
     class Meta:
         ordering = ['-submitted_at']
-        unique_together = ['homework', 'student']
\ No newline at end of file
+        unique_together = ['homework', 'student']
+        indexes = [
+            models.Index(fields=['student', '-submitted_at', '-id'], name='submission_student_recent_idx'),
+            # Baholanmagan topshiriqlar (pending grades) uchun kichik partial indeks
+            models.Index(
+                fields=['homework'],
+                name='submission_ungraded_idx',
+                condition=models.Q(score__isnull=True),
+            ),
+        ]
+
+class Blob(models.Model):
+    """submission_storage dagi bitta fayl (sha256 bo'yicha); refcount - unga ishora qiluvchi nomlar soni."""
+    digest = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.digest[:12]} x{self.refcount}"
+
+
+class UploadSession(models.Model):
+    """Bo'laklab (chunked) yuklanayotgan topshiriq fayli; finalize da HomeworkSubmission bo'ladi."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    homework = models.ForeignKey(Homework, on_delete=models.CASCADE, related_name='uploads')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='homework_uploads')
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64, blank=True)
+    received = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.received}/{self.size})"
+
+    class Meta:
+        indexes = [
+            # Eskirgan yuklashlarni tozalash uchun
+            models.Index(fields=['updated_at'], name='upload_session_updated_idx'),
+        ]
@@ -0,0 +1,126 @@
+from django.db.models import F, FilteredRelation, Q
+
+from groups.models import Group
+from stats.counters import aget_or_rebuild, get_or_rebuild
+from stats.models import StudentCounters, TeacherCounters
+from .media import submission_file_url
+from .models import Homework, HomeworkSubmission
+
+
+def student_homework(user, group_ids=None):
+    """
+    Homework feed for a student with their own submission, course and group
+    names joined in, so the whole page is a single SELECT.
+    """
+    if group_ids is None:
+        homeworks = Homework.objects.filter(group__students=user)
+    else:
+        homeworks = Homework.objects.filter(group_id__in=group_ids)
+
+    return homeworks.annotate(
+        my_submission=FilteredRelation(
+            'submissions',
+            condition=Q(submissions__student=user)
+        )
+    ).annotate(
+        course_name=F('group__course__name'),
+        group_name=F('group__name'),
+        submission_id=F('my_submission__id'),
+        submission_score=F('my_submission__score'),
+        submission_feedback=F('my_submission__feedback'),
+        submission_submitted_at=F('my_submission__submitted_at'),
+        submission_student_id=F('my_submission__student_id'),
+    )
+
+
+def student_group_ids(user):
+    return Group.students.through.objects.filter(user_id=user.id).values_list('group_id', flat=True)
+
+
+def student_homework_partitions(user, group_ids):
+    """
+    student_homework() split into one queryset per group, for
+    KeysetPagination: every part is read in homework_group_recent_idx
+    order, so a page never sorts the student's whole feed.
+    """
+    return [student_homework(user, [group_id]) for group_id in group_ids] or [Homework.objects.none()]
+
+
+def student_homework_row(h):
+    submitted = h.submission_id is not None
+
+    return {
+        "id": h.id,
+        "title": h.title,
+        "description": h.description,
+        "course": h.course_name,
+        "group_name": h.group_name,
+        "created_at": h.created_at,
+        "deadline": h.deadline(),
+        "expired": h.is_expired(),
+        "status": "GRADED" if submitted and h.submission_score is not None else (
+            "SUBMITTED" if submitted else "PENDING"
+        ),
+        "grade": h.submission_score if submitted else None,
+        "feedback": h.submission_feedback if submitted else None,
+        "submission": {
+            "submitted_at": h.submission_submitted_at,
+            "file_url": submission_file_url(h.submission_id, h.submission_student_id)
+        } if submitted else None
+    }
+
+
+def teacher_submissions(user):
+    return HomeworkSubmission.objects.filter(
+        homework__group__teacher=user
+    ).select_related('student', 'homework', 'homework__group')
+
+
+def teacher_submission_row(s):
+    return {
+        "id": s.id,
+        "student_name": s.student.phone,
+        "homework_title": s.homework.title,
+        "group_name": s.homework.group.name,
+        "submitted_at": s.submitted_at,
+        "late": s.is_late(),
+        "file_url": submission_file_url(s.id, s.homework.group.teacher_id),
+        "score": s.score,
+        "feedback": s.feedback,
+        "status": "GRADED" if s.score is not None else "SUBMITTED"
+    }
+
+
+def student_stats_row(counters):
+    return {
+        'total': counters.total_homework,
+        'pending': counters.total_homework - counters.submitted,
+        'submitted': counters.submitted,
+        'average_grade': round(counters.average_score, 1)
+    }
+
+
+def teacher_stats_row(counters):
+    return {
+        'total_groups': counters.total_groups,
+        'total_students': counters.total_students,
+        'total_homework': counters.total_homework,
+        'pending_grades': counters.pending_grades
+    }
+
+
+def student_stats(user):
+    # stats.signals tomonidan yangilanadigan bitta qator
+    return student_stats_row(get_or_rebuild(StudentCounters, user.id))
+
+
+def teacher_stats(user):
+    return teacher_stats_row(get_or_rebuild(TeacherCounters, user.id))
+
+
+async def astudent_stats(user):
+    return student_stats_row(await aget_or_rebuild(StudentCounters, user.id))
+
+
+async def ateacher_stats(user):
+    return teacher_stats_row(await aget_or_rebuild(TeacherCounters, user.id))
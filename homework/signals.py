@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import HomeworkSubmission
+from .storage import content_digest
+
+
+@receiver(post_delete, sender=HomeworkSubmission)
+def release_submission_file(sender, instance, **kwargs):
+    # Eski (digest siz) nomlarga tegilmaydi: ular dedupmedia bilan ko'chiriladi
+    if content_digest(instance.file.name):
+        instance.file.storage.delete(instance.file.name)
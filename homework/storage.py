@@ -0,0 +1,140 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.deconstruct import deconstructible
+
+# homeworks/<sha256>/<asl fayl nomi>: nom fayl nomini saqlaydi, tarkib esa blob da
+CONTENT_NAME = re.compile(r'(?:^|/)([0-9a-f]{64})/[^/]+$')
+BLOCK_SIZE = 64 * 1024
+
+
+def content_digest(name):
+    """sha256 for a content-addressed name, None for a plain (legacy) name."""
+    match = CONTENT_NAME.search(name or '')
+    return match.group(1) if match else None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stores each distinct file once under HOMEWORK_BLOB_DIR/<ab>/<sha256>.
+
+    Names keep the FileField shape ('homeworks/<sha256>/scan.pdf'), so
+    open(), size(), path() and the download name work as before; names
+    without a digest are served from their own path. homework.Blob counts
+    the names pointing at each blob, and the file is removed when the last
+    one is deleted.
+    """
+
+    def blob_name(self, name):
+        """Where the content of `name` is on disk, relative to the storage root."""
+        digest = content_digest(name)
+        return os.path.join(settings.HOMEWORK_BLOB_DIR, digest[:2], digest) if digest else name
+
+    def blob_path(self, digest):
+        return super().path(os.path.join(settings.HOMEWORK_BLOB_DIR, digest[:2], digest))
+
+    def path(self, name):
+        return super().path(self.blob_name(name))
+
+    def url(self, name):
+        return super().url(self.blob_name(name))
+
+    def content_name(self, name, digest, max_length=None):
+        dirname, filename = os.path.split(name)
+        name = os.path.join(dirname, digest, filename)
+        if max_length and len(name) > max_length:
+            # Kengaytma saqlanib, fayl nomi qisqartiriladi
+            stem, ext = os.path.splitext(filename)
+            name = os.path.join(dirname, digest, stem[:max(len(stem) - len(name) + max_length, 1)] + ext)
+        return name
+
+    def save(self, name, content, max_length=None):
+        """Hash `content` while copying it to a temporary file, then acquire its blob."""
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        validate_file_name(name, allow_relative_path=True)
+
+        blob_dir = self.path(settings.HOMEWORK_BLOB_DIR)
+        os.makedirs(blob_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp = tempfile.mkstemp(dir=blob_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as fileobj:
+                for block in content.chunks(BLOCK_SIZE):
+                    digest.update(block)
+                    fileobj.write(block)
+                    size += len(block)
+            self.acquire(temp, digest.hexdigest(), size)
+        finally:
+            os.remove(temp)
+        return self.content_name(name, digest.hexdigest(), max_length)
+
+    def acquire(self, source, digest, size, refs=1):
+        """
+        Add `refs` references to the blob, linking `source` in as its
+        content if the blob file does not exist yet. The caller still owns
+        `source`. Returns True if `source` became the blob.
+
+        The upsert locks the blob row until the transaction ends, so a
+        concurrent release() cannot remove the file in between. Callers
+        run it in the transaction that inserts the referencing row, so a
+        failed insert takes the reference back with it; a blob file left
+        behind without a row is reused by the next acquire() or removed
+        by collect_blobs().
+        """
+        table = apps.get_model('homework', 'Blob')._meta.db_table
+        with transaction.atomic(savepoint=False), connection.cursor() as cursor:
+            cursor.execute(
+                'INSERT INTO {0} (digest, size, refcount, created_at) VALUES (%s, %s, %s, NOW()) '
+                'ON CONFLICT (digest) DO UPDATE SET refcount = {0}.refcount + EXCLUDED.refcount'
+                .format(table),
+                [digest, size, refs]
+            )
+            path = self.blob_path(digest)
+            if os.path.exists(path):
+                return False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.link(source, path)
+            except OSError:
+                # Boshqa fayl tizimi: hard link ishlamaydi
+                shutil.copyfile(source, path)
+            return True
+
+    def delete(self, name):
+        digest = content_digest(name)
+        if not digest:
+            return super().delete(name)
+        Blob = apps.get_model('homework', 'Blob')
+        Blob.objects.filter(pk=digest, refcount__gt=0).update(refcount=F('refcount') - 1)
+        # Fayl faqat commit dan keyin o'chiriladi: rollback bo'lsa havola qaytadi
+        transaction.on_commit(lambda: self.release(digest))
+
+    def release(self, digest):
+        """Remove the blob if nothing references it any more."""
+        Blob = apps.get_model('homework', 'Blob')
+        with transaction.atomic():
+            deleted, _ = Blob.objects.filter(pk=digest, refcount=0).delete()
+            if deleted:
+                try:
+                    os.remove(self.blob_path(digest))
+                except FileNotFoundError:
+                    pass
+        return bool(deleted)
+
+
+submission_storage = ContentAddressedStorage()
@@ -1,3 +1,877 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from accounts.serializers import MyTokenSerializer
+from config.pagination import KeysetPagination
+from config.testing import QueryBudgetAssertions, QueryPlanAssertions, seed_hot_paths
+from courses.models import Course
+from groups.models import Group
+from stats.counters import verify
+from stats.models import GroupCounters, StudentCounters, TeacherCounters
+from . import urls as homework_urls
+from .media import submission_file_url
+from .models import Blob, Homework, HomeworkSubmission, UploadSession
+from .queries import student_group_ids, student_homework_partitions
+from .views import HomeworkListStudent
+from .uploads import append_chunk, partial_path
+
+
+class HomeworkListStudentTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        self.course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=self.course, teacher=self.teacher)
+        self.group.students.add(self.student)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def make_homework(self, count):
+        for i in range(count):
+            homework = Homework.objects.create(group=self.group, title='HW %d' % i)
+            if i % 2:
+                HomeworkSubmission.objects.create(
+                    homework=homework,
+                    student=self.student,
+                    file='homeworks/hw.pdf',
+                    score=90 if i % 4 == 1 else None,
+                )
+
+    def count_queries(self, url='/api/homework/?limit=100'):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.data
+
+    def test_query_count_is_flat(self):
+        self.make_homework(3)
+        small, _ = self.count_queries()
+
+        self.make_homework(40)
+        large, data = self.count_queries()
+
+        self.assertEqual(len(data['results']), 43)
+        self.assertEqual(small, large)
+
+    def test_submission_status(self):
+        self.make_homework(4)
+        _, data = self.count_queries()
+        statuses = {row['title']: row['status'] for row in data['results']}
+
+        self.assertEqual(statuses['HW 0'], 'PENDING')
+        self.assertEqual(statuses['HW 1'], 'GRADED')
+        self.assertEqual(statuses['HW 3'], 'SUBMITTED')
+        graded = next(row for row in data['results'] if row['title'] == 'HW 1')
+        self.assertEqual(graded['grade'], 90)
+        self.assertEqual(graded['course'], 'Python')
+        submission = HomeworkSubmission.objects.get(homework__title='HW 1')
+        self.assertTrue(graded['submission']['file_url'].startswith(
+            '/api/homework/submission/%d/file/?viewer=%d&token=' % (submission.id, self.student.id)))
+
+    def test_cursor_paging(self):
+        self.make_homework(5)
+        seen = []
+        url = '/api/homework/?limit=2'
+        while url:
+            _, data = self.count_queries(url)
+            self.assertLessEqual(len(data['results']), 2)
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+
+        expected = list(Homework.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/homework/?cursor=bogus')
+        self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=teacher)
+        self.group.students.add(self.student)
+        self.homework = Homework.objects.create(group=self.group, title='HW 1')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_etag_round_trip(self):
+        response = self.client.get('/api/homework/')
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/homework/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_change_produces_new_etag(self):
+        url = '/api/homework/%d/' % self.homework.id
+        etag = self.client.get(url)['ETag']
+
+        HomeworkSubmission.objects.create(homework=self.homework, student=self.student, file='a.pdf')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['status'], 'SUBMITTED')
+
+    def test_teacher_list_follows_homework_edits(self):
+        HomeworkSubmission.objects.create(homework=self.homework, student=self.student, file='a.pdf')
+        self.client.force_authenticate(self.group.teacher)
+        etag = self.client.get(reverse('teacher_submissions'))['ETag']
+
+        self.homework.title = 'HW 1 (renamed)'
+        self.homework.save()
+        response = self.client.get(reverse('teacher_submissions'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['homework_title'], 'HW 1 (renamed)')
+
+    def test_passed_deadline_produces_new_etag(self):
+        response = self.client.get('/api/homework/')
+        self.assertFalse(response.data['results'][0]['expired'])
+
+        later = timezone.now() + timedelta(hours=26)
+        with mock.patch('django.utils.timezone.now', return_value=later):
+            response = self.client.get('/api/homework/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['results'][0]['expired'])
+
+    def test_signed_links_are_reissued_before_they_expire(self):
+        HomeworkSubmission.objects.create(homework=self.homework, student=self.student, file='a.pdf')
+        urls = ['/api/homework/', '/api/homework/%d/' % self.homework.id]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        self.assertEqual([self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+                          for url, etag in zip(urls, etags)], [304, 304])
+
+        later = time.time() + settings.MEDIA_LINK_MAX_AGE // 2
+        with mock.patch('time.time', return_value=later):
+            response = self.client.get(urls[0], HTTP_IF_NONE_MATCH=etags[0])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(self.client.get(urls[1], HTTP_IF_NONE_MATCH=etags[1]).status_code, 200)
+            self.client.logout()
+            file_url = response.data['results'][0]['submission']['file_url']
+            # Yangi havola hali amal qiladi (fayl yo'q: 404, lekin 403 emas)
+            self.assertEqual(self.client.get(file_url).status_code, 404)
+
+    def test_if_modified_since_is_ignored_for_lists(self):
+        other = Homework.objects.create(group=self.group, title='HW 2')
+        since = http_date(time.time() + 60)
+        self.assertEqual(self.client.get('/api/homework/', HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+        # Eng yangisi bo'lmagan qator o'chirilsa max(updated_at) o'zgarmaydi
+        self.homework.delete()
+        response = self.client.get('/api/homework/', HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data['results']], [other.id])
+
+
+class AsyncReadViewTests(TestCase):
+    def setUp(self):
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        group = Group.objects.create(name='P-1', course=course, teacher=teacher)
+        group.students.add(self.student)
+        self.homework = Homework.objects.create(group=group, title='HW 1')
+        token = MyTokenSerializer.get_token(self.student).access_token
+        self.auth = {'Authorization': 'Bearer %s' % token}
+
+    async def test_served_on_the_event_loop(self):
+        self.assertTrue(HomeworkListStudent.view_is_async)
+        response = await self.async_client.get('/api/homework/', headers=self.auth)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['title'] for row in response.json()['results']], ['HW 1'])
+
+        response = await self.async_client.get('/api/homework/%d/' % self.homework.id, headers=self.auth)
+        self.assertEqual(response.json()['status'], 'PENDING')
+        response = await self.async_client.get('/api/homework/stats/', headers=self.auth)
+        self.assertEqual(response.json()['total'], 1)
+
+        etag = (await self.async_client.get('/api/homework/', headers=self.auth))['ETag']
+        response = await self.async_client.get('/api/homework/', headers={**self.auth, 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        response = await self.async_client.get('/api/homework/')
+        self.assertEqual(response.status_code, 401)
+
+
+class HomeworkQueryPlanTests(QueryPlanAssertions, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_hot_paths()
+
+    def test_student_submissions_recent_first(self):
+        student = self.seed['students'][0]
+        self.assertIndexedPlan(
+            HomeworkSubmission.objects.filter(student=student).order_by('-submitted_at', '-id')[:21]
+        )
+
+    def test_group_feed_recent_first(self):
+        group = self.seed['groups'][0]
+        self.assertIndexedPlan(
+            Homework.objects.filter(group_id=group.id).order_by('-created_at', '-id')[:21]
+        )
+
+    def feed_page(self, student, **params):
+        """(paginator, page query) of HomeworkListStudent for `student`."""
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get('/api/homework/', params))
+        partitions = student_homework_partitions(student, list(student_group_ids(student)))
+        return paginator, paginator.page_queryset(partitions, request)
+
+    def test_student_feed(self):
+        student = self.seed['students'][0]
+        plan = self.assertIndexedPlan(self.feed_page(student)[1])
+        self.assertIn('homework_group_recent_idx', plan)
+
+    def test_multi_group_feed(self):
+        # Har guruh o'z indeksi tartibida, sahifalar Merge Append bilan: Sort yo'q
+        student = self.seed['students'][0]
+        for group in self.seed['groups'][1:3]:
+            group.students.add(student)
+
+        paginator, page = self.feed_page(student)
+        self.assertIn('Merge Append', self.assertIndexedPlan(page))
+
+        rows = paginator.build_page(list(page))
+        expected = Homework.objects.filter(group__students=student).order_by('-created_at', '-id')
+        self.assertEqual([h.id for h in rows], [h.id for h in expected[:20]])
+        cursor = paginator.encode_cursor(paginator.next_position)
+        _, page = self.feed_page(student, cursor=cursor)
+        self.assertIn('Merge Append', self.assertIndexedPlan(page))
+        self.assertEqual(len(list(page)), 21)
+
+    def test_pending_grades_use_partial_index(self):
+        plan = self.assertIndexedPlan(
+            HomeworkSubmission.objects.filter(
+                homework__group__teacher=self.seed['teacher'],
+                score__isnull=True
+            ),
+            forbid=('Seq Scan',)
+        )
+        self.assertIn('submission_ungraded_idx', plan)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class HomeworkQueryBudgetTests(QueryBudgetAssertions, TestCase):
+    # URL name -> maximum queries, measured with 10 homeworks and submissions
+    BUDGETS = {
+        'homework_list': 4,
+        'student_stats': 1,
+        'my_submissions': 1,
+        'homework_detail': 5,
+        # Fayl va INSERT bitta tranzaksiyada: test ichida SAVEPOINT/RELEASE ham sanaladi
+        'submit_homework': 12,
+        'create_homework': 7,
+        'teacher_submissions': 2,
+        'teacher_stats': 1,
+        'grade_homework': 7,
+        'grade_batch': 8,
+        'upload_start': 5,
+        'upload_chunk': 4,
+        'upload_finalize': 15,
+        'submission_file': 1,
+        'submission_archive': 1,
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        self.group.students.add(self.student)
+
+        self.homeworks = [Homework.objects.create(group=self.group, title='HW %d' % i) for i in range(10)]
+        self.submissions = [
+            HomeworkSubmission.objects.create(homework=h, student=self.student, file='a.pdf')
+            for h in self.homeworks[1:]
+        ]
+        self.client = APIClient()
+
+    def request(self, name, user, method='get', data=None, **kwargs):
+        self.client.force_authenticate(user)
+        # Ro'yxat (batch) faqat JSON bilan yuboriladi
+        options = {'format': 'json'} if isinstance(data, list) else {}
+        with self.assertMaxQueries(self.BUDGETS[name]):
+            response = getattr(self.client, method)(reverse(name, kwargs=kwargs), data, **options)
+        self.assertLess(response.status_code, 300)
+        return response
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlBudgets(homework_urls, self.BUDGETS)
+
+    def test_student_endpoints(self):
+        self.request('homework_list', self.student)
+        self.request('student_stats', self.student)
+        self.request('my_submissions', self.student)
+        self.request('homework_detail', self.student, pk=self.homeworks[0].id)
+        self.request(
+            'submit_homework', self.student, 'post',
+            {'file': SimpleUploadedFile('hw.pdf', b'%PDF')},
+            homework_id=self.homeworks[0].id
+        )
+
+    def test_file_endpoint(self):
+        with open(os.path.join(settings.MEDIA_ROOT, 'a.pdf'), 'wb') as fileobj:
+            fileobj.write(b'%PDF')
+        response = self.request('submission_file', self.teacher, submission_id=self.submissions[0].id)
+        self.assertEqual(b''.join(response.streaming_content), b'%PDF')
+
+    def test_chunked_upload_endpoints(self):
+        self.homeworks[0].submissions.all().delete()
+        upload = self.request('upload_start', self.student, 'post', {'filename': 'a.pdf', 'size': 4},
+                              homework_id=self.homeworks[0].id).data
+        self.client.force_authenticate(self.student)
+        with self.assertMaxQueries(self.BUDGETS['upload_chunk']):
+            self.client.put(reverse('upload_chunk', kwargs={'upload_id': upload['id']}) + '?offset=0',
+                            b'%PDF', content_type='application/octet-stream')
+        self.request('upload_chunk', self.student, upload_id=upload['id'])
+        self.request('upload_finalize', self.student, 'post', upload_id=upload['id'])
+
+    def test_teacher_endpoints(self):
+        self.request('teacher_submissions', self.teacher)
+        self.request('teacher_stats', self.teacher)
+        self.request('create_homework', self.teacher, 'post', {'group': self.group.id, 'title': 'New'})
+        self.request(
+            'grade_homework', self.teacher, 'post', {'score': 90},
+            submission_id=self.submissions[0].id
+        )
+        self.request('submission_archive', self.teacher, data={'homework': self.homeworks[1].id})
+        grades = [{'submission_id': s.id, 'score': 70} for s in self.submissions]
+        self.request('grade_batch', self.teacher, 'post', grades)
+
+    def test_middleware_flags_n_plus_one(self):
+        with self.settings(QUERY_BUDGET_HEADERS=True), \
+                self.assertLogs('config.querybudget', 'WARNING') as logs:
+            self.client.force_authenticate(self.student)
+            # Har bir chaqiruv alohida so'rov: shablon takrorlanadi
+            for h in self.homeworks[:6]:
+                HomeworkSubmission.objects.filter(homework=h).exists()
+            response = self.client.get(reverse('homework_list'))
+            self.assertTrue(response.has_header('X-Query-Count'))
+
+            with self.settings(QUERY_BUDGET_DEFAULT=0):
+                self.client.get(reverse('student_stats'))
+
+        self.assertIn('budget 0', logs.output[-1])
+
+
+class BatchGradeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        other = User.objects.create_user('998900000009', 'pass', role='TEACHER')
+        course = Course.objects.create(name='Python', description='')
+        group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        other_group = Group.objects.create(name='P-2', course=course, teacher=other)
+
+        homework = Homework.objects.create(group=group, title='HW 1')
+        self.submissions = []
+        for i in range(30):
+            student = User.objects.create_user('9989001000%02d' % i, 'pass', role='STUDENT')
+            group.students.add(student)
+            self.submissions.append(HomeworkSubmission.objects.create(
+                homework=homework, student=student, file='a.pdf', score=50 if i < 5 else None
+            ))
+        stranger = User.objects.create_user('998900200000', 'pass', role='STUDENT')
+        self.foreign = HomeworkSubmission.objects.create(
+            homework=Homework.objects.create(group=other_group, title='HW X'),
+            student=stranger, file='a.pdf'
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def grade(self, items):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/homework/submissions/grade/', items, format='json')
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(ctx.captured_queries)
+
+    def test_per_item_results(self):
+        data, _ = self.grade([
+            {'submission_id': self.submissions[0].id, 'score': 90, 'feedback': 'Good'},
+            {'submission_id': self.foreign.id, 'score': 90},
+            {'submission_id': 999999, 'score': 90},
+            {'submission_id': self.submissions[1].id, 'score': 'x'},
+            {'submission_id': self.submissions[0].id, 'score': 10},
+        ])
+        self.assertEqual(data['graded'], 1)
+        self.assertEqual([r['status'] for r in data['results']],
+                         ['graded', 'error', 'error', 'error', 'error'])
+        self.assertEqual(data['results'][1]['error'], 'Not your submission')
+        self.assertEqual(data['results'][2]['error'], 'Submission not found')
+
+        graded = HomeworkSubmission.objects.get(id=self.submissions[0].id)
+        self.assertEqual((graded.score, graded.feedback), (90, 'Good'))
+        self.assertIsNotNone(graded.graded_at)
+        self.assertGreater(graded.updated_at, self.submissions[0].updated_at)
+        self.assertIsNone(HomeworkSubmission.objects.get(id=self.foreign.id).score)
+
+    def test_queries_do_not_grow_with_batch(self):
+        _, small = self.grade([{'submission_id': s.id, 'score': 80} for s in self.submissions[:2]])
+        _, large = self.grade([{'submission_id': s.id, 'score': 80} for s in self.submissions[2:]])
+        self.assertEqual(small, large)
+
+    def test_counters_and_cache_follow_bulk_update(self):
+        stats_url = '/api/homework/teacher-stats/'
+        self.assertEqual(self.client.get(stats_url).data['pending_grades'], 25)
+
+        self.grade([{'submission_id': s.id, 'score': 80} for s in self.submissions])
+        self.assertEqual(self.client.get(stats_url).data['pending_grades'], 0)
+        for model in (GroupCounters, TeacherCounters, StudentCounters):
+            self.assertEqual(verify(model), [], model.__name__)
+
+    def test_validation(self):
+        response = self.client.post('/api/homework/submissions/grade/', {'grades': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/homework/submissions/grade/',
+                                    [{'submission_id': 1, 'score': 1}] * 201, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(self.submissions[0].student)
+        response = self.client.post('/api/homework/submissions/grade/', [], format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media, HOMEWORK_UPLOAD_CHUNK_SIZE=1024)
+        self.override.enable()
+
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        group = Group.objects.create(name='P-1', course=course, teacher=teacher)
+        group.students.add(self.student)
+        self.homework = Homework.objects.create(group=group, title='HW 1')
+
+        self.content = os.urandom(2500)
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media)
+
+    def start(self, **data):
+        data = {'filename': 'scan.pdf', 'size': len(self.content),
+                'sha256': hashlib.sha256(self.content).hexdigest(), **data}
+        return self.client.post('/api/homework/%d/uploads/' % self.homework.id, data, format='json')
+
+    def put(self, upload_id, offset, chunk, checksum=None):
+        headers = {'HTTP_X_CHUNK_SHA256': checksum} if checksum else {}
+        return self.client.put('/api/homework/uploads/%s/?offset=%d' % (upload_id, offset), chunk,
+                               content_type='application/octet-stream', **headers)
+
+    def finalize(self, upload_id):
+        return self.client.post('/api/homework/uploads/%s/finalize/' % upload_id)
+
+    def test_resumable_upload(self):
+        upload = self.start().data
+        self.assertEqual((upload['offset'], upload['chunk_size']), (0, 1024))
+
+        first = self.content[:1024]
+        response = self.put(upload['id'], 0, first, hashlib.sha256(first).hexdigest())
+        self.assertEqual(response.data['offset'], 1024)
+
+        # Uzilishdan keyin: server qayerdaligini aytadi, noto'g'ri offset rad etiladi
+        self.assertEqual(self.client.get('/api/homework/uploads/%s/' % upload['id']).data['offset'], 1024)
+        response = self.put(upload['id'], 0, first)
+        self.assertEqual((response.status_code, response.data['offset']), (409, 1024))
+
+        self.assertEqual(self.finalize(upload['id']).status_code, 409)
+        self.put(upload['id'], 1024, self.content[1024:2048])
+        self.put(upload['id'], 2048, self.content[2048:])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.finalize(upload['id'])
+        self.assertEqual(response.status_code, 201)
+        submission = HomeworkSubmission.objects.get(id=response.data['id'])
+        with submission.file.open() as fileobj:
+            self.assertEqual(fileobj.read(), self.content)
+        self.assertEqual(submission.file.name,
+                         'homeworks/%s/scan.pdf' % hashlib.sha256(self.content).hexdigest())
+        self.assertFalse(UploadSession.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media, 'uploads/partial')), [])
+
+    def test_bad_chunk_checksum_is_discarded(self):
+        upload = self.start().data
+        response = self.put(upload['id'], 0, self.content[:1024], '0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get().received, 0)
+        self.assertEqual(os.path.getsize(partial_path(UploadSession.objects.get())), 0)
+
+        self.assertEqual(self.put(upload['id'], 0, b'x' * 2000).status_code, 400)
+
+    def test_whole_file_checksum(self):
+        upload = self.start(sha256=hashlib.sha256(b'other').hexdigest()).data
+        for offset in range(0, len(self.content), 1024):
+            self.put(upload['id'], offset, self.content[offset:offset + 1024])
+
+        response = self.finalize(upload['id'])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(HomeworkSubmission.objects.exists())
+
+    def test_finalize_rejects_second_submission(self):
+        upload = self.start(size=3, sha256='').data
+        self.put(upload['id'], 0, b'abc')
+        HomeworkSubmission.objects.create(homework=self.homework, student=self.student, file='a.pdf')
+
+        response = self.finalize(upload['id'])
+        self.assertEqual(response.data['error'], 'Already submitted')
+        # Qisman fayl joyida qoladi, storage ga ko'chirilgan nusxa yo'q
+        self.assertTrue(os.path.exists(partial_path(UploadSession.objects.get())))
+        self.assertFalse(os.path.exists(os.path.join(self.media, 'homeworks')) and
+                         os.listdir(os.path.join(self.media, 'homeworks')))
+
+    def test_chunk_is_read_outside_the_transaction(self):
+        upload = UploadSession.objects.get(id=self.start().data['id'])
+        depth = len(connection.atomic_blocks)
+        seen = []
+
+        class Stream(io.BytesIO):
+            def read(stream, size=-1):
+                seen.append(len(connection.atomic_blocks))
+                return super().read(size)
+
+        upload = append_chunk(upload.id, self.student, 0, Stream(self.content[:1024]), 1024)
+        # Tana o'qilayotganda qator qulflanmagan, tranzaksiya ochilmagan
+        self.assertEqual(set(seen), {depth})
+        self.assertEqual(UploadSession.objects.get().received, upload.received)
+        with open(partial_path(upload), 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.content[:1024])
+        self.assertEqual(os.listdir(os.path.join(self.media, 'uploads/partial')), ['%s.part' % upload.id])
+
+    def test_finalize_rechecks_deadline_and_expiry(self):
+        upload = self.start(size=3, sha256='').data
+        self.put(upload['id'], 0, b'abc')
+
+        UploadSession.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(self.finalize(upload['id']).status_code, 410)
+
+        UploadSession.objects.update(updated_at=timezone.now())
+        Homework.objects.update(created_at=timezone.now() - timedelta(days=2))
+        response = self.finalize(upload['id'])
+        self.assertEqual((response.status_code, response.data['error']), (400, 'Deadline passed (24 hours)'))
+        self.assertFalse(HomeworkSubmission.objects.exists())
+
+    def test_uploads_are_private(self):
+        upload = self.start().data
+        other = User.objects.create_user('998900000003', 'pass', role='STUDENT')
+        self.client.force_authenticate(other)
+        self.assertEqual(self.put(upload['id'], 0, b'abc').status_code, 404)
+        self.assertEqual(self.finalize(upload['id']).status_code, 404)
+
+    def test_stale_uploads_are_collected(self):
+        stale = UploadSession.objects.get(id=self.start().data['id'])
+        fresh = UploadSession.objects.get(id=self.start().data['id'])
+        UploadSession.objects.filter(id=stale.id).update(updated_at=timezone.now() - timedelta(days=2))
+        orphan = os.path.join(self.media, 'uploads/partial/orphan.part')
+        open(orphan, 'wb').close()
+        os.utime(orphan, (0, 0))
+
+        call_command('cleanuploads', stdout=io.StringIO())
+        self.assertEqual(list(UploadSession.objects.values_list('id', flat=True)), [fresh.id])
+        self.assertFalse(os.path.exists(partial_path(stale)))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(os.path.exists(partial_path(fresh)))
+
+
+class SubmissionFileTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        homework = Homework.objects.create(group=group, title='HW 1')
+
+        self.content = bytes(range(256)) * 4
+        os.makedirs(os.path.join(self.media, 'homeworks'))
+        with open(os.path.join(self.media, 'homeworks/scan.pdf'), 'wb') as fileobj:
+            fileobj.write(self.content)
+        self.submission = HomeworkSubmission.objects.create(
+            homework=homework, student=self.student, file='homeworks/scan.pdf'
+        )
+        self.url = '/api/homework/submission/%d/file/' % self.submission.id
+        self.client = APIClient()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media)
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        # streaming_content oxirigacha o'qilganda test client faylni yopadi
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_signed_link(self):
+        response, body = self.get(submission_file_url(self.submission.id, self.student.id))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertIn('attachment', response['Content-Disposition'])
+
+        # Boshqa foydalanuvchi uchun imzo yoki buzilgan token ishlamaydi
+        url = submission_file_url(self.submission.id, self.teacher.id)
+        self.assertEqual(self.get(url.replace('viewer=%d' % self.teacher.id,
+                                              'viewer=%d' % self.student.id))[0].status_code, 401)
+        self.assertEqual(self.get(self.url)[0].status_code, 401)
+
+    def test_expired_link_is_refused(self):
+        url = submission_file_url(self.submission.id, self.student.id)
+        with self.settings(MEDIA_LINK_MAX_AGE=0), \
+                mock.patch('django.core.signing.time.time', return_value=time.time() + 5):
+            response, _ = self.get(url)
+        self.assertEqual((response.status_code, response.data['error']), (403, 'Link expired'))
+        self.assertEqual(self.get(url)[0].status_code, 200)
+
+    def test_access_matches_homework_detail(self):
+        other = User.objects.create_user('998900000003', 'pass', role='STUDENT')
+        self.assertEqual(self.get(submission_file_url(self.submission.id, other.id))[0].status_code, 403)
+
+        stranger = User.objects.create_user('998900000004', 'pass', role='TEACHER')
+        self.client.force_authenticate(stranger)
+        self.assertEqual(self.get()[0].status_code, 403)
+        self.client.force_authenticate(self.teacher)
+        self.assertEqual(self.get()[0].status_code, 200)
+
+    def test_range_and_etag(self):
+        self.client.force_authenticate(self.student)
+        response, body = self.get(HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(body, self.content[100:200])
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(response['Content-Length'], '100')
+
+        response, body = self.get(HTTP_RANGE='bytes=-24')
+        self.assertEqual(body, self.content[-24:])
+        self.assertEqual(self.get(HTTP_RANGE='bytes=2000-')[0].status_code, 416)
+
+        etag = response['ETag']
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+        # If-Range mos kelmasa butun fayl yuboriladi
+        response, body = self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, body), (200, self.content))
+
+    def test_front_server_offload(self):
+        self.client.force_authenticate(self.student)
+        with self.settings(MEDIA_ACCEL='nginx'):
+            response, body = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/homeworks/scan.pdf')
+        self.assertEqual(body, b'')
+
+        with self.settings(MEDIA_ACCEL='sendfile'):
+            response, _ = self.get()
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media, 'homeworks/scan.pdf'))
+
+
+class ContentAddressedStorageTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=teacher)
+        self.homework = Homework.objects.create(group=self.group, title='HW 1')
+        self.students = [
+            User.objects.create_user('99890000001%d' % i, 'pass', role='STUDENT') for i in range(3)
+        ]
+        self.group.students.add(*self.students)
+        self.content = b'%PDF template ' * 100
+        self.digest = hashlib.sha256(self.content).hexdigest()
+        self.client = APIClient()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media)
+
+    def submit(self, student, content, filename='hw.pdf'):
+        self.client.force_authenticate(student)
+        return self.client.post('/api/homework/%d/submit/' % self.homework.id,
+                                {'file': SimpleUploadedFile(filename, content)})
+
+    def blob_files(self):
+        return [f for _, _, files in os.walk(os.path.join(self.media, 'blobs')) for f in files]
+
+    def test_same_content_is_stored_once(self):
+        self.submit(self.students[0], self.content)
+        self.submit(self.students[1], self.content, 'copy.pdf')
+        self.submit(self.students[2], b'other')
+
+        first, second = HomeworkSubmission.objects.filter(student__in=self.students[:2]).order_by('student')
+        self.assertEqual(first.file.name, 'homeworks/%s/hw.pdf' % self.digest)
+        self.assertEqual(second.file.name, 'homeworks/%s/copy.pdf' % self.digest)
+        self.assertEqual(second.file.size, len(self.content))
+        self.assertEqual(sorted(self.blob_files()), sorted([self.digest, hashlib.sha256(b'other').hexdigest()]))
+        self.assertEqual(Blob.objects.get(pk=self.digest).refcount, 2)
+
+        # Oxirgi havola o'chirilgandagina fayl o'chadi
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(second.file.path))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(second.file.path))
+        self.assertFalse(Blob.objects.filter(pk=self.digest).exists())
+
+    def test_failed_insert_takes_the_reference_back(self):
+        self.submit(self.students[0], self.content)
+        # Poyga: ikkinchi so'rov tekshiruvdan o'tib ulgurgan
+        with mock.patch('homework.views.submission_blocker', return_value=(self.homework, None)):
+            response = self.submit(self.students[0], b'second try')
+            self.assertEqual((response.status_code, response.data['error']), (400, 'Already submitted'))
+            self.submit(self.students[0], self.content, 'again.pdf')
+
+        self.assertEqual(Blob.objects.get(pk=self.digest).refcount, 1)
+        self.assertFalse(Blob.objects.filter(pk=hashlib.sha256(b'second try').hexdigest()).exists())
+        self.assertEqual(HomeworkSubmission.objects.count(), 1)
+
+    def test_dedupmedia_command(self):
+        os.makedirs(os.path.join(self.media, 'homeworks'))
+        legacy = {'homeworks/a.pdf': self.content, 'homeworks/b.pdf': self.content, 'homeworks/c.pdf': b'c'}
+        for name, content in legacy.items():
+            with open(os.path.join(self.media, name), 'wb') as fileobj:
+                fileobj.write(content)
+        for student, name in zip(self.students, legacy):
+            HomeworkSubmission.objects.create(homework=self.homework, student=student, file=name)
+
+        out = io.StringIO()
+        call_command('dedupmedia', '--dry-run', stdout=out)
+        self.assertIn('3 files', out.getvalue())
+        self.assertIn('1 duplicates', out.getvalue())
+        self.assertIn('would save 1', out.getvalue())
+        self.assertTrue(os.path.exists(os.path.join(self.media, 'homeworks/a.pdf')))
+
+        out = io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupmedia', stdout=out)
+        self.assertIn('1 duplicates', out.getvalue())
+        self.assertEqual(os.listdir(os.path.join(self.media, 'homeworks')), [])
+        self.assertEqual(len(self.blob_files()), 2)
+        self.assertEqual(Blob.objects.get(pk=self.digest).refcount, 2)
+        submission = HomeworkSubmission.objects.get(student=self.students[1])
+        self.assertEqual(submission.file.name, 'homeworks/%s/b.pdf' % self.digest)
+        with submission.file.open() as fileobj:
+            self.assertEqual(fileobj.read(), self.content)
+
+    def test_dedupmedia_repairs_refcounts(self):
+        self.submit(self.students[0], self.content)
+        Blob.objects.update(refcount=5)
+        Blob.objects.create(digest='0' * 64, size=1)
+
+        out = io.StringIO()
+        call_command('dedupmedia', stdout=out)
+        self.assertIn('1 refcounts repaired, 1 unreferenced blobs removed', out.getvalue())
+        self.assertEqual(list(Blob.objects.values_list('refcount', flat=True)), [1])
+
+
+class SubmissionArchiveTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        self.homeworks = [Homework.objects.create(group=self.group, title='HW %d' % i) for i in range(2)]
+        self.files = {'.pdf': b'%PDF ' + os.urandom(2000), '.py': b'print("salom")\n' * 200}
+
+        for i, (ext, content) in enumerate(self.files.items()):
+            student = User.objects.create_user('99890000002%d' % i, 'pass', role='STUDENT')
+            if i == 0:
+                User.objects.filter(id=student.id).update(full_name='Ali Valiyev')
+            for homework in self.homeworks:
+                HomeworkSubmission.objects.create(
+                    homework=homework, student=student, score=80 if i == 0 else None,
+                    file=SimpleUploadedFile('work' + ext, content)
+                )
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media)
+
+    def download(self, **params):
+        response = self.client.get('/api/homework/submissions/archive/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+
+    def test_homework_archive(self):
+        archive = self.download(homework=self.homeworks[0].id)
+        self.assertEqual(archive.namelist(), ['Ali_Valiyev_998900000020.pdf', '998900000021.py', 'manifest.csv'])
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(archive.read('998900000021.py'), self.files['.py'])
+
+        # PDF qayta siqilmaydi, matn fayli siqiladi
+        pdf, source = archive.infolist()[:2]
+        self.assertEqual(pdf.compress_type, zipfile.ZIP_STORED)
+        self.assertEqual(source.compress_type, zipfile.ZIP_DEFLATED)
+        self.assertLess(source.compress_size, source.file_size)
+
+        rows = list(csv.reader(io.StringIO(archive.read('manifest.csv').decode('utf-8-sig'))))
+        self.assertEqual(rows[0], ['Student', 'Phone', 'Homework', 'Submitted at', 'Late', 'Score', 'File'])
+        self.assertEqual(rows[1][:3] + rows[1][4:], ['Ali Valiyev', '998900000020', 'HW 0', 'no', '80',
+                                                     'Ali_Valiyev_998900000020.pdf'])
+        self.assertEqual(rows[2][5], '')
+
+    def test_group_archive_and_missing_file(self):
+        submission = HomeworkSubmission.objects.filter(file__endswith='.py').first()
+        HomeworkSubmission.objects.filter(id=submission.id).update(file='homeworks/gone.py')
+
+        archive = self.download(group=self.group.id)
+        names = archive.namelist()
+        self.assertEqual(len(names), 4)
+        self.assertIn('%d_HW_1/Ali_Valiyev_998900000020.pdf' % self.homeworks[1].id, names)
+        manifest = archive.read('manifest.csv').decode('utf-8-sig')
+        self.assertEqual(manifest.count('\n'), 5)
+        self.assertIn('998900000021,%s,' % submission.homework.title, manifest)
+
+    def test_access(self):
+        other = User.objects.create_user('998900000003', 'pass', role='TEACHER')
+        self.client.force_authenticate(other)
+        response = self.client.get('/api/homework/submissions/archive/', {'group': self.group.id})
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(self.teacher)
+        response = self.client.get('/api/homework/submissions/archive/')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/homework/submissions/archive/', {'homework': 0})
+        self.assertEqual(response.status_code, 404)
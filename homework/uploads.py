@@ -0,0 +1,222 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from config.dbpool.base import DatabaseWrapper as PooledWrapper
+
+from .models import HomeworkSubmission, UploadSession
+
+BLOCK_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+def partial_dir():
+    return os.path.join(settings.MEDIA_ROOT, settings.HOMEWORK_UPLOAD_DIR)
+
+
+def partial_path(upload):
+    return os.path.join(partial_dir(), '%s.part' % upload.pk)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fileobj:
+        for block in iter(lambda: fileobj.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def start_upload(homework, student, filename, size, sha256=''):
+    if size <= 0 or size > settings.HOMEWORK_UPLOAD_MAX_SIZE:
+        raise UploadError('size must be between 1 and %d bytes' % settings.HOMEWORK_UPLOAD_MAX_SIZE)
+
+    upload = UploadSession.objects.create(
+        homework=homework, student=student, filename=os.path.basename(filename)[:255],
+        size=size, sha256=sha256.lower()
+    )
+    os.makedirs(partial_dir(), exist_ok=True)
+    open(partial_path(upload), 'wb').close()
+    return upload
+
+
+def append_chunk(upload_id, student, offset, stream, length, sha256=None):
+    """
+    Write `length` bytes from `stream` at `offset` of the partial file.
+
+    The body is read into a temporary file first, with no transaction open
+    and the pooled connection handed back, so a slow client holds neither
+    a row lock nor a database connection. Only then is the offset advanced
+    with a conditional UPDATE, which also locks the row while the chunk is
+    copied in; a concurrent retry of the same chunk gets 409. A chunk whose
+    checksum does not match never reaches the partial file.
+    """
+    if length <= 0 or length > settings.HOMEWORK_UPLOAD_CHUNK_SIZE:
+        raise UploadError('Chunk must be between 1 and %d bytes' % settings.HOMEWORK_UPLOAD_CHUNK_SIZE)
+
+    upload = get_upload(upload_id, student)
+    if offset != upload.received:
+        raise UploadError('Offset mismatch', status=409, offset=upload.received)
+    if offset + length > upload.size:
+        raise UploadError('Chunk goes past the declared size')
+
+    release_connection()
+    chunk = receive_chunk(upload, stream, length, sha256)
+    try:
+        with transaction.atomic():
+            now = timezone.now()
+            advanced = UploadSession.objects.filter(pk=upload.pk, received=offset).update(
+                received=offset + length, updated_at=now
+            )
+            if not advanced:
+                received = UploadSession.objects.filter(pk=upload.pk).values_list('received', flat=True).first()
+                if received is None:
+                    raise UploadError('Upload not found', status=404)
+                raise UploadError('Offset mismatch', status=409, offset=received)
+
+            with open(chunk, 'rb') as source, open(partial_path(upload), 'r+b') as fileobj:
+                # Oldingi uzilgan urinishdan qolgan baytlar kesib tashlanadi
+                fileobj.truncate(offset)
+                fileobj.seek(offset)
+                shutil.copyfileobj(source, fileobj, BLOCK_SIZE)
+    finally:
+        os.remove(chunk)
+    upload.received, upload.updated_at = offset + length, now
+    return upload
+
+
+def release_connection():
+    """Hand a pooled connection back until the next query, unless a transaction still needs it."""
+    if isinstance(connection, PooledWrapper) and not connection.in_atomic_block:
+        connection.close()
+
+
+def receive_chunk(upload, stream, length, sha256=None):
+    """Copy the chunk into a temporary file next to the partial one and return its path."""
+    digest = hashlib.sha256()
+    written = 0
+    fd, path = tempfile.mkstemp(dir=partial_dir(), prefix='%s.' % upload.pk, suffix='.chunk')
+    try:
+        with os.fdopen(fd, 'wb') as fileobj:
+            while written < length:
+                block = stream.read(min(BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                digest.update(block)
+                fileobj.write(block)
+                written += len(block)
+        if written != length:
+            raise UploadError('Incomplete chunk')
+        if sha256 and digest.hexdigest() != sha256.lower():
+            raise UploadError('Chunk checksum mismatch')
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def get_upload(upload_id, student, lock=False):
+    uploads = UploadSession.objects.filter(pk=upload_id, student=student)
+    if lock:
+        uploads = uploads.select_for_update()
+    upload = uploads.first()
+    if upload is None:
+        raise UploadError('Upload not found', status=404)
+    return upload
+
+
+def finalize_upload(upload_id, student):
+    """
+    Verify the whole file and create the submission in one transaction.
+    The partial file becomes the content-addressed blob (or is dropped if
+    the same content is already stored) once the insert succeeded. The
+    homework deadline and the session's own expiry are checked again
+    here: both may have passed since the upload was started.
+    """
+    with transaction.atomic():
+        upload = get_upload(upload_id, student, lock=True)
+        if upload_expired(upload):
+            raise UploadError('Upload expired', status=410)
+        if upload.homework.is_expired():
+            raise UploadError('Deadline passed (24 hours)')
+        if upload.received != upload.size:
+            raise UploadError('Upload incomplete', status=409, offset=upload.received)
+
+        path = partial_path(upload)
+        digest = file_sha256(path)
+        if upload.sha256 and digest != upload.sha256:
+            raise UploadError('Checksum mismatch')
+
+        field = HomeworkSubmission._meta.get_field('file')
+        name = field.storage.content_name(
+            field.generate_filename(None, upload.filename), digest, field.max_length
+        )
+        try:
+            with transaction.atomic():
+                submission = HomeworkSubmission.objects.create(
+                    homework_id=upload.homework_id, student_id=upload.student_id, file=name
+                )
+                upload.delete()
+        except IntegrityError:
+            raise UploadError('Already submitted')
+
+        # Hard link: fayl nusxalanmaydi; qisman fayl commit dan keyin o'chiriladi
+        field.storage.acquire(path, digest, upload.size)
+        transaction.on_commit(lambda: os.remove(path))
+    return submission
+
+
+def upload_expired(upload):
+    return upload.updated_at < timezone.now() - timedelta(seconds=settings.HOMEWORK_UPLOAD_TTL)
+
+
+def abort_upload(upload_id, student):
+    upload = get_upload(upload_id, student)
+    remove_partial(upload)
+    upload.delete()
+
+
+def remove_partial(upload):
+    try:
+        os.remove(partial_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def collect_stale(max_age=None):
+    """
+    Delete sessions untouched for `max_age` (default HOMEWORK_UPLOAD_TTL
+    seconds) and .part files with no session. Returns (sessions, files).
+    """
+    if max_age is None:
+        max_age = timedelta(seconds=settings.HOMEWORK_UPLOAD_TTL)
+    stale = UploadSession.objects.filter(updated_at__lt=timezone.now() - max_age)
+
+    removed = []
+    for upload in stale.iterator():
+        remove_partial(upload)
+        removed.append(upload.pk)
+    UploadSession.objects.filter(pk__in=removed).delete()
+    sessions = len(removed)
+
+    files = 0
+    if os.path.isdir(partial_dir()):
+        live = {'%s.part' % pk for pk in UploadSession.objects.values_list('pk', flat=True)}
+        cutoff = (timezone.now() - max_age).timestamp()
+        for entry in os.scandir(partial_dir()):
+            # Yangi yaratilgan (hali session commit qilinmagan) fayllarga tegilmaydi
+            if entry.name not in live and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                files += 1
+    return sessions, files
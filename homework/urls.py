@@ -5,10 +5,16 @@ from .views import (
     MyHomeworkSubmissions,
     SubmitHomework,
     GradeHomework,
+    BatchGradeHomework,
     CreateHomework,
     StudentStats,
     TeacherStats,
-    HomeworkDetail
+    HomeworkDetail,
+    StartUpload,
+    UploadChunk,
+    FinishUpload,
+    SubmissionFile,
+    SubmissionArchive
 )
 
 urlpatterns = [
@@ -18,10 +24,16 @@ urlpatterns = [
     path('my-submissions/', MyHomeworkSubmissions.as_view(), name='my_submissions'),
     path('<int:pk>/', HomeworkDetail.as_view(), name='homework_detail'),
     path('<int:homework_id>/submit/', SubmitHomework.as_view(), name='submit_homework'),
+    path('<int:homework_id>/uploads/', StartUpload.as_view(), name='upload_start'),
+    path('uploads/<uuid:upload_id>/', UploadChunk.as_view(), name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/finalize/', FinishUpload.as_view(), name='upload_finalize'),
     
     # Teacher endpoints
     path('create/', CreateHomework.as_view(), name='create_homework'),
     path('submissions/', HomeworkSubmissionsTeacher.as_view(), name='teacher_submissions'),
     path('teacher-stats/', TeacherStats.as_view(), name='teacher_stats'),
     path('submission/<int:submission_id>/grade/', GradeHomework.as_view(), name='grade_homework'),
+    path('submission/<int:submission_id>/file/', SubmissionFile.as_view(), name='submission_file'),
+    path('submissions/archive/', SubmissionArchive.as_view(), name='submission_archive'),
+    path('submissions/grade/', BatchGradeHomework.as_view(), name='grade_batch'),
 ]
\ No newline at end of file
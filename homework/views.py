@@ -1,11 +1,36 @@
+import os
+
 from rest_framework.views import APIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.core import signing
+from django.http import StreamingHttpResponse
 from django.utils import timezone
-from django.db.models import Count, Avg, Q
-from .models import Homework, HomeworkSubmission
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Avg, Max, Q
+from .archive import archive_submissions, iter_zip
+from .grading import MAX_BATCH_SIZE, grade_batch
+from .media import link_epoch, serve_file, submission_file_url, viewer_from_token
+from .uploads import UploadError, abort_upload, append_chunk, finalize_upload, get_upload, start_upload
+from .models import SUBMISSION_WINDOW, Homework, HomeworkSubmission
+from .queries import (
+    student_group_ids,
+    student_homework_partitions,
+    student_homework_row,
+    teacher_submissions,
+    teacher_submission_row,
+    astudent_stats,
+    ateacher_stats
+)
+from accounts.models import User
 from groups.models import Group
+from config.asyncviews import AsyncAPIView
+from config.conditional import ConditionalGetMixin
+from config.pagination import KeysetPagination
+from config.routers import read_alias
+from apicache.cache import cached_response
 
 
 class CreateHomework(APIView):
@@ -29,42 +54,150 @@ class CreateHomework(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+def submission_blocker(user, homework_id):
+    """(homework, None) if the student may submit, else (None, error Response)."""
+    if user.role != 'STUDENT':
+        return None, Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        homework = Homework.objects.get(id=homework_id)
+    except Homework.DoesNotExist:
+        return None, Response({"error": "Homework not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    if homework.is_expired():
+        return None, Response(
+            {"error": "Deadline passed (24 hours)"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Check if already submitted
+    if HomeworkSubmission.objects.filter(homework=homework, student=user).exists():
+        return None, Response(
+            {"error": "Already submitted"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return homework, None
+
+
 class SubmitHomework(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, homework_id):
-        if request.user.role != 'STUDENT':
-            return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+        homework, error = submission_blocker(request.user, homework_id)
+        if error:
+            return error
 
-        try:
-            homework = Homework.objects.get(id=homework_id)
-        except Homework.DoesNotExist:
-            return Response({"error": "Homework not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        if homework.is_expired():
+        if 'file' not in request.FILES:
             return Response(
-                {"error": "Deadline passed (24 hours)"},
+                {"error": "File required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Check if already submitted
-        if HomeworkSubmission.objects.filter(homework=homework, student=request.user).exists():
+        # Fayl saqlash (blob refcount) va INSERT bitta tranzaksiyada: biri
+        # muvaffaqiyatsiz bo'lsa refcount ham qaytariladi
+        try:
+            with transaction.atomic():
+                submission = HomeworkSubmission.objects.create(
+                    homework=homework,
+                    student=request.user,
+                    file=request.FILES['file']
+                )
+        except IntegrityError:
             return Response(
                 {"error": "Already submitted"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if 'file' not in request.FILES:
-            return Response(
-                {"error": "File required"},
-                status=status.HTTP_400_BAD_REQUEST
+        return Response({
+            "message": "Homework submitted",
+            "id": submission.id
+        }, status=status.HTTP_201_CREATED)
+
+
+def upload_state(upload):
+    return {
+        "id": str(upload.id),
+        "offset": upload.received,
+        "size": upload.size,
+        "chunk_size": settings.HOMEWORK_UPLOAD_CHUNK_SIZE,
+    }
+
+
+def upload_error(exc):
+    return Response({"error": str(exc), **exc.extra}, status=exc.status)
+
+
+class StartUpload(APIView):
+    """POST {filename, size, sha256?} -> bo'laklab yuklash sessiyasi."""
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, homework_id):
+        homework, error = submission_blocker(request.user, homework_id)
+        if error:
+            return error
+
+        try:
+            size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            return Response({"error": "size required"}, status=status.HTTP_400_BAD_REQUEST)
+        filename = request.data.get('filename') or ''
+        if not filename:
+            return Response({"error": "filename required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            upload = start_upload(homework, request.user, filename, size, request.data.get('sha256') or '')
+        except UploadError as exc:
+            return upload_error(exc)
+        return Response(upload_state(upload), status=status.HTTP_201_CREATED)
+
+
+class UploadChunk(APIView):
+    """
+    GET: qayerdan davom ettirish (offset).
+    PUT ?offset=N, tana = xom baytlar, X-Chunk-SHA256 ixtiyoriy.
+    DELETE: yuklashni bekor qilish.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, upload_id):
+        try:
+            return Response(upload_state(get_upload(upload_id, request.user)))
+        except UploadError as exc:
+            return upload_error(exc)
+
+    def put(self, request, upload_id):
+        try:
+            offset = int(request.query_params.get('offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({"error": "offset required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # request.stream: tana xotiraga to'liq o'qilmaydi, to'g'ridan-to'g'ri diskka
+            upload = append_chunk(
+                upload_id, request.user, offset, request.stream, length,
+                request.META.get('HTTP_X_CHUNK_SHA256')
             )
+        except UploadError as exc:
+            return upload_error(exc)
+        return Response(upload_state(upload))
 
-        submission = HomeworkSubmission.objects.create(
-            homework=homework,
-            student=request.user,
-            file=request.FILES['file']
-        )
+    def delete(self, request, upload_id):
+        try:
+            abort_upload(upload_id, request.user)
+        except UploadError as exc:
+            return upload_error(exc)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class FinishUpload(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, upload_id):
+        try:
+            submission = finalize_upload(upload_id, request.user)
+        except UploadError as exc:
+            return upload_error(exc)
 
         return Response({
             "message": "Homework submitted",
@@ -80,12 +213,12 @@ class GradeHomework(APIView):
             return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
         try:
-            submission = HomeworkSubmission.objects.get(id=submission_id)
+            submission = HomeworkSubmission.objects.select_related('homework__group').get(id=submission_id)
         except HomeworkSubmission.DoesNotExist:
             return Response({"error": "Submission not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # Verify teacher owns this homework
-        if submission.homework.group.teacher != request.user:
+        if submission.homework.group.teacher_id != request.user.id:
             return Response({"error": "Not your submission"}, status=status.HTTP_403_FORBIDDEN)
 
         submission.score = request.data.get('score')
@@ -96,74 +229,163 @@ class GradeHomework(APIView):
         return Response({"message": "Homework graded"}, status=status.HTTP_200_OK)
 
 
-class HomeworkListStudent(APIView):
+class BatchGradeHomework(APIView):
+    """POST [{submission_id, score, feedback}, ...] (or {"grades": [...]})"""
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    def post(self, request):
+        if request.user.role != 'TEACHER':
+            return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        items = request.data.get('grades') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Expected a list of grades"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BATCH_SIZE:
+            return Response(
+                {"error": "At most %d grades per request" % MAX_BATCH_SIZE},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = grade_batch(request.user, items)
+        return Response({
+            "graded": sum(1 for r in results if r['status'] == 'graded'),
+            "results": results,
+        }, status=status.HTTP_200_OK)
+
+
+class SubmissionFile(APIView):
+    """
+    Topshiriq fayli: Bearer token yoki file_url dagi imzo bilan, HomeworkDetail
+    bilan bir xil ruxsat tekshiruvidan keyin.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, submission_id):
+        try:
+            submission = HomeworkSubmission.objects.select_related('homework__group').get(id=submission_id)
+        except HomeworkSubmission.DoesNotExist:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.user.is_authenticated:
+            viewer = request.user
+        else:
+            try:
+                viewer_id = viewer_from_token(submission_id, request.query_params)
+            except signing.SignatureExpired:
+                return Response({"error": "Link expired"}, status=status.HTTP_403_FORBIDDEN)
+            viewer = User.objects.filter(id=viewer_id, is_active=True).first() if viewer_id else None
+        if viewer is None:
+            return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
+
+        # Check access
+        if viewer.role == 'STUDENT':
+            if submission.student_id != viewer.id:
+                return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+        elif viewer.role == 'TEACHER':
+            if submission.homework.group.teacher_id != viewer.id:
+                return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        return serve_file(request, submission.file, os.path.basename(submission.file.name))
+
+
+def signed_links_vary(request):
+    return link_epoch()
+
+
+class SignedLinksMixin:
+    """For ConditionalGetMixin views whose bodies carry submission_file_url() links."""
+
+    def get_fingerprint_parts(self, request, *args, **kwargs):
+        return super().get_fingerprint_parts(request, *args, **kwargs) + [str(link_epoch())]
+
+
+class HomeworkListStudent(SignedLinksMixin, ConditionalGetMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_conditional_querysets(self, request):
+        # 'expired' vaqt o'tishi bilan o'zgaradi: muddati o'tganlar soni ham ETag'da
+        cutoff = timezone.now() - SUBMISSION_WINDOW
+        return [
+            (Homework.objects.filter(group__students=request.user),
+             {'expired': Count('pk', filter=Q(created_at__lt=cutoff))}),
+            HomeworkSubmission.objects.filter(student=request.user),
+        ]
+
+    @cached_response('homework_list', vary=signed_links_vary)
+    async def get(self, request):
         if request.user.role != 'STUDENT':
             return Response([], status=status.HTTP_403_FORBIDDEN)
 
-        groups = request.user.student_groups.all()
-        homeworks = Homework.objects.filter(group__in=groups).order_by('-created_at')
+        # Submission, kurs va guruh nomlari bitta JOIN orqali olinadi;
+        # har guruh o'z indeksi tartibida o'qiladi va sahifalar birlashtiriladi
+        group_ids = [group_id async for group_id in student_group_ids(request.user)]
+        homeworks = student_homework_partitions(request.user, group_ids)
 
-        data = []
-        for h in homeworks:
-            # Check if submitted
-            submission = HomeworkSubmission.objects.filter(
-                homework=h, 
-                student=request.user
-            ).first()
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(homeworks, request)
+        data = [student_homework_row(h) for h in page]
 
-            data.append({
-                "id": h.id,
-                "title": h.title,
-                "description": h.description,
-                "course": h.group.course.name,
-                "group_name": h.group.name,
-                "created_at": h.created_at,
-                "deadline": h.deadline(),
-                "expired": h.is_expired(),
-                "status": "GRADED" if submission and submission.score is not None else (
-                    "SUBMITTED" if submission else "PENDING"
-                ),
-                "grade": submission.score if submission else None,
-                "feedback": submission.feedback if submission else None,
-                "submission": {
-                    "submitted_at": submission.submitted_at,
-                    "file_url": submission.file.url
-                } if submission else None
-            })
-
-        return Response(data)
+        return paginator.get_paginated_response(data)
 
 
-class HomeworkSubmissionsTeacher(APIView):
+class HomeworkSubmissionsTeacher(SignedLinksMixin, ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_conditional_querysets(self, request):
+        # Qatorlarda vazifa nomi va muddati (late) ham bor: vazifalarning
+        # updated_at'i ham o'sha so'rovda olinadi
+        return [
+            (HomeworkSubmission.objects.filter(homework__group__teacher=request.user),
+             {'homework': Max('homework__updated_at')}),
+        ]
+
     def get(self, request):
         if request.user.role != 'TEACHER':
             return Response([], status=status.HTTP_403_FORBIDDEN)
 
-        submissions = HomeworkSubmission.objects.filter(
-            homework__group__teacher=request.user
-        ).select_related('student', 'homework', 'homework__group').order_by('-submitted_at')
+        paginator = KeysetPagination(ordering=('-submitted_at', '-id'))
+        page = paginator.paginate_queryset(teacher_submissions(request.user), request)
+        data = [teacher_submission_row(s) for s in page]
 
-        data = []
-        for s in submissions:
-            data.append({
-                "id": s.id,
-                "student_name": s.student.phone,
-                "homework_title": s.homework.title,
-                "group_name": s.homework.group.name,
-                "submitted_at": s.submitted_at,
-                "late": s.is_late(),
-                "file_url": s.file.url,
-                "score": s.score,
-                "feedback": s.feedback,
-                "status": "GRADED" if s.score is not None else "SUBMITTED"
-            })
+        return paginator.get_paginated_response(data)
 
-        return Response(data)
+
+class SubmissionArchive(APIView):
+    """
+    ?homework=<id> yoki ?group=<id>: barcha topshiriq fayllari va manifest.csv
+    bitta ZIP da, vaqtinchalik faylsiz oqim bilan.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        if request.user.role not in ('TEACHER', 'ADMIN'):
+            return Response({"error": "Only teachers can download submissions"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params
+        try:
+            homework_id = int(params['homework']) if params.get('homework') else None
+            group_id = None if homework_id is not None else int(params['group'])
+        except (KeyError, ValueError):
+            return Response({"error": "homework or group is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if homework_id is not None:
+            teacher_id = Homework.objects.filter(id=homework_id).values_list('group__teacher_id', flat=True).first()
+            filename = 'homework-%d.zip' % homework_id
+        else:
+            teacher_id = Group.objects.filter(id=group_id).values_list('teacher_id', flat=True).first()
+            filename = 'group-%d.zip' % group_id
+        if teacher_id is None:
+            return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role == 'TEACHER' and teacher_id != request.user.id:
+            return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        # Oqim javobdan keyin o'qiladi: baza hozir tanlanadi
+        submissions = archive_submissions(homework_id=homework_id, group_id=group_id).using(read_alias())
+        response = StreamingHttpResponse(iter_zip(submissions, nested=group_id is not None),
+                                         content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename=%s' % filename
+        return response
 
 
 class MyHomeworkSubmissions(APIView):
@@ -175,10 +397,13 @@ class MyHomeworkSubmissions(APIView):
 
         submissions = HomeworkSubmission.objects.filter(
             student=request.user
-        ).select_related('homework').order_by('-submitted_at')
+        ).select_related('homework')
+
+        paginator = KeysetPagination(ordering=('-submitted_at', '-id'))
+        page = paginator.paginate_queryset(submissions, request)
 
         data = []
-        for s in submissions:
+        for s in page:
             data.append({
                 "homework": s.homework.title,
                 "submitted_at": s.submitted_at,
@@ -188,71 +413,48 @@ class MyHomeworkSubmissions(APIView):
                 "graded_at": s.graded_at
             })
 
-        return Response(data)
+        return paginator.get_paginated_response(data)
 
 
-class StudentStats(APIView):
+class StudentStats(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         if request.user.role != 'STUDENT':
             return Response({}, status=status.HTTP_403_FORBIDDEN)
 
-        groups = request.user.student_groups.all()
-        total_homework = Homework.objects.filter(group__in=groups).count()
-        
-        submissions = HomeworkSubmission.objects.filter(student=request.user)
-        submitted = submissions.count()
-        pending = total_homework - submitted
-        
-        avg_grade = submissions.filter(
-            score__isnull=False
-        ).aggregate(avg=Avg('score'))['avg'] or 0
-
-        return Response({
-            'total': total_homework,
-            'pending': pending,
-            'submitted': submitted,
-            'average_grade': round(avg_grade, 1)
-        })
+        return Response(await astudent_stats(request.user))
 
 
-class TeacherStats(APIView):
+class TeacherStats(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         if request.user.role != 'TEACHER':
             return Response({}, status=status.HTTP_403_FORBIDDEN)
 
-        groups = Group.objects.filter(teacher=request.user)
-        total_groups = groups.count()
-        total_students = sum(g.students.count() for g in groups)
-        total_homework = Homework.objects.filter(group__teacher=request.user).count()
-        pending_grades = HomeworkSubmission.objects.filter(
-            homework__group__teacher=request.user,
-            score__isnull=True
-        ).count()
-
-        return Response({
-            'total_groups': total_groups,
-            'total_students': total_students,
-            'total_homework': total_homework,
-            'pending_grades': pending_grades
-        })
+        return Response(await ateacher_stats(request.user))
 
 
-class HomeworkDetail(APIView):
+class HomeworkDetail(SignedLinksMixin, ConditionalGetMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pk):
+    def get_conditional_querysets(self, request, pk):
+        return [
+            Homework.objects.filter(id=pk),
+            HomeworkSubmission.objects.filter(homework_id=pk, student=request.user),
+        ]
+
+    @cached_response('homework_detail', vary=signed_links_vary)
+    async def get(self, request, pk):
         try:
-            homework = Homework.objects.select_related('group', 'group__course', 'group__teacher').get(id=pk)
+            homework = await Homework.objects.select_related('group', 'group__course', 'group__teacher').aget(id=pk)
         except Homework.DoesNotExist:
             return Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
 
         # Check access
         if request.user.role == 'STUDENT':
-            if not homework.group.students.filter(id=request.user.id).exists():
+            if not await homework.group.students.filter(id=request.user.id).aexists():
                 return Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
         elif request.user.role == 'TEACHER':
             if homework.group.teacher != request.user:
@@ -261,10 +463,10 @@ class HomeworkDetail(APIView):
         # Get submission if student
         submission = None
         if request.user.role == 'STUDENT':
-            submission = HomeworkSubmission.objects.filter(
+            submission = await HomeworkSubmission.objects.filter(
                 homework=homework,
                 student=request.user
-            ).first()
+            ).afirst()
 
         return Response({
             "id": homework.id,
@@ -283,6 +485,6 @@ class HomeworkDetail(APIView):
             "feedback": submission.feedback if submission else None,
             "submission": {
                 "submitted_at": submission.submitted_at,
-                "file_url": submission.file.url
+                "file_url": submission_file_url(submission.id, request.user.id)
             } if submission else None
         })
\ No newline at end of file
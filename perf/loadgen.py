@@ -0,0 +1,243 @@
+import http.client
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+from apicache.checks import process_local
+
+# Bitta so'rov tavsifi; name natijalarni endpoint bo'yicha guruhlaydi
+Call = namedtuple('Call', 'name method path headers body')
+
+
+def server_commands(bind, workers, threads):
+    gunicorn = [sys.executable, '-m', 'gunicorn', '--bind', bind, '--workers', str(workers)]
+    return {
+        # Sinxron WSGI: har bir so'rov so'nggi baytgacha worker thread'ni band qiladi
+        'wsgi': gunicorn + ['--threads', str(threads), 'config.wsgi:application'],
+        'asgi': gunicorn + ['--worker-class', 'uvicorn.workers.UvicornWorker', 'config.asgi:application'],
+    }
+
+
+def multipart(fields, files):
+    """(body, content type) for a multipart/form-data POST; files are {name: (filename, bytes)}."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(('--%s\r\nContent-Disposition: form-data; name="%s"\r\n\r\n%s\r\n'
+                      % (boundary, name, value)).encode())
+    for name, (filename, content) in files.items():
+        parts.append(('--%s\r\nContent-Disposition: form-data; name="%s"; filename="%s"\r\n'
+                      'Content-Type: application/octet-stream\r\n\r\n' % (boundary, name, filename)).encode()
+                     + content + b'\r\n')
+    parts.append(('--%s--\r\n' % boundary).encode())
+    return b''.join(parts), 'multipart/form-data; boundary=%s' % boundary
+
+
+class Mix:
+    """
+    Weighted random choice of call factories: [(name, weight, factory)].
+    A factory takes the worker's Random and returns a Call, or None when it
+    has nothing to send (then another entry is drawn).
+    """
+
+    def __init__(self, entries):
+        self.entries = [entry for entry in entries if entry[1] > 0]
+        self.weights = [weight for _, weight, _ in self.entries]
+
+    def __call__(self, rng):
+        for _ in range(20):
+            _, _, factory = rng.choices(self.entries, self.weights)[0]
+            call = factory(rng)
+            if call is not None:
+                return call
+        raise RuntimeError('No call in the mix can be made')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not values:
+        return None
+    rank = max(int(math.ceil(pct / 100.0 * len(values))), 1)
+    return values[rank - 1]
+
+
+def wait_for_port(host, port, timeout, process=None):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError('server exited with code %d' % process.returncode)
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start on %s:%d in %ds' % (host, port, timeout))
+
+
+@contextmanager
+def serve(command, host, port, env=None, timeout=30):
+    """Run a server command until the block exits; its output is discarded."""
+    process = subprocess.Popen(
+        command, env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_for_port(host, port, timeout, process)
+        yield process
+    finally:
+        process.terminate()
+        try:
+            process.wait(10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@contextmanager
+def shared_cache(env):
+    """
+    Server env for the block, with a file-based cache all workers share
+    when the configured backend is per-process (see apicache.checks).
+    """
+    if not process_local('default'):
+        yield env
+        return
+    with tempfile.TemporaryDirectory(prefix='edu-cache-') as location:
+        yield {**env, 'CACHE_BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+               'CACHE_LOCATION': location}
+
+
+def run_load(host, port, calls, concurrency, duration, seed=0):
+    """
+    Closed-loop load: `concurrency` threads, each on its own keep-alive
+    connection, cycle through `calls` until `duration` seconds have passed.
+    `calls` may also be a Mix, drawn from with a Random per thread.
+    Returns ({call name: [(seconds, status, headers)]}, elapsed seconds);
+    status 0 means the connection failed.
+    """
+    deadline = time.perf_counter() + duration
+    results = defaultdict(list)
+    lock = threading.Lock()
+
+    def worker(offset):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        samples = []
+        rng = random.Random(seed * 1000 + offset)
+        i = offset
+        while time.perf_counter() < deadline:
+            call = calls(rng) if callable(calls) else calls[i % len(calls)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request(call.method, call.path, body=call.body, headers=call.headers)
+                response = conn.getresponse()
+                response.read()
+                status, headers = response.status, dict(response.getheaders())
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                status, headers = 0, {}
+            samples.append((call.name, time.perf_counter() - start, status, headers))
+        conn.close()
+        with lock:
+            for name, seconds, status, headers in samples:
+                results[name].append((seconds, status, headers))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, time.perf_counter() - started
+
+
+def login(host, port, path, credentials, concurrency=8):
+    """
+    POST each {phone, password} to the login endpoint in parallel.
+    Returns ({phone: access token}, [(seconds, status, headers)]).
+    """
+    tokens, samples = {}, []
+    pending = list(credentials)
+    lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        while True:
+            with lock:
+                if not pending:
+                    break
+                credential = pending.pop()
+            start = time.perf_counter()
+            conn.request('POST', path, body=json.dumps(credential),
+                         headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            body = response.read()
+            with lock:
+                samples.append((time.perf_counter() - start, response.status, dict(response.getheaders())))
+                if response.status == 200:
+                    tokens[credential['phone']] = json.loads(body)['access']
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return tokens, samples
+
+
+def summarize(samples, elapsed):
+    """
+    requests, errors, req/s, p50/p95/p99 in ms and the median and max
+    X-Query-Count (None if the server did not send it) for one list of
+    samples.
+    """
+    latencies = sorted(seconds for seconds, _, _ in samples)
+    queries = sorted(int(headers['X-Query-Count']) for _, _, headers in samples if 'X-Query-Count' in headers)
+    ms = lambda value: None if value is None else round(value * 1000, 2)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _ in samples if not 200 <= status < 400),
+        'rps': round(len(samples) / elapsed, 1) if elapsed else 0,
+        'p50': ms(percentile(latencies, 50)),
+        'p95': ms(percentile(latencies, 95)),
+        'p99': ms(percentile(latencies, 99)),
+        'queries': percentile(queries, 50),
+        'queries_max': queries[-1] if queries else None,
+    }
+
+
+def compare(baseline, current, tolerance, min_ms=1.0, min_requests=20):
+    """
+    Regressions of `current` against `baseline` ({endpoint: summary}), as
+    messages: p95 slower by more than `tolerance` (a fraction) and
+    `min_ms`, throughput lower by more than `tolerance`, more queries, or
+    more errors. Timings of endpoints with fewer than `min_requests`
+    samples on either side are too noisy and are not compared; endpoints
+    missing from either side are skipped.
+    """
+    problems = []
+    for endpoint in sorted(set(baseline) & set(current)):
+        old, new = baseline[endpoint], current[endpoint]
+        timed = min(old['requests'], new['requests']) >= min_requests
+        if (timed and old['p95'] is not None and new['p95'] is not None
+                and new['p95'] > old['p95'] * (1 + tolerance) and new['p95'] - old['p95'] >= min_ms):
+            problems.append('%s: p95 %.1f ms -> %.1f ms' % (endpoint, old['p95'], new['p95']))
+        if timed and new['rps'] < old['rps'] * (1 - tolerance):
+            problems.append('%s: %.1f req/s -> %.1f req/s' % (endpoint, old['rps'], new['rps']))
+        if old.get('queries_max') is not None and (new.get('queries_max') or 0) > old['queries_max']:
+            problems.append('%s: up to %d queries -> %d' % (endpoint, old['queries_max'], new['queries_max']))
+        if new['errors'] > old['errors']:
+            problems.append('%s: %d errors -> %d' % (endpoint, old['errors'], new['errors']))
+    return problems
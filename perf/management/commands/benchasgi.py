@@ -0,0 +1,83 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from accounts.models import User
+from accounts.serializers import MyTokenSerializer
+from homework.models import Homework
+from perf.loadgen import Call, run_load, serve, server_commands, shared_cache, summarize
+
+
+def bearer(user):
+    return {'Authorization': 'Bearer %s' % MyTokenSerializer.get_token(user).access_token}
+
+
+def read_calls():
+    """The async read endpoints, as a student and a teacher from the current database."""
+    homework = (Homework.objects.filter(group__students__isnull=False)
+                .select_related('group__teacher').order_by('-id').first())
+    if homework is None:
+        raise CommandError('No homework with enrolled students; seed the database first')
+    student = User.objects.filter(student_groups=homework.group_id).order_by('id').first()
+    as_student, as_teacher = bearer(student), bearer(homework.group.teacher)
+
+    return [
+        Call('homework_list', 'GET', reverse('homework_list'), as_student, None),
+        Call('homework_detail', 'GET', reverse('homework_detail', args=[homework.id]), as_student, None),
+        Call('student_stats', 'GET', reverse('student_stats'), as_student, None),
+        Call('my_schedule', 'GET', reverse('my_schedule'), as_student, None),
+        Call('my_ratings', 'GET', reverse('my_ratings'), as_student, None),
+        Call('teacher_stats', 'GET', reverse('teacher_stats'), as_teacher, None),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Compare sync WSGI and ASGI throughput and latency on the async read endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', default='wsgi,asgi')
+        parser.add_argument('--workers', type=int, default=2, help='Server processes')
+        parser.add_argument('--threads', type=int, default=1, help='Threads per WSGI worker')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds per server')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--cache', action='store_true',
+                            help='Keep the API response cache on (off by default, so every call reads the DB)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        calls = read_calls()
+        commands = server_commands('127.0.0.1:%d' % options['port'], options['workers'], options['threads'])
+        env = {'DEBUG': 'False', 'QUERY_BUDGET_HEADERS': 'False'}
+        if not options['cache']:
+            env['API_CACHE_TIMEOUT'] = '0'
+
+        results = {}
+        for name in options['servers'].split(','):
+            if name not in commands:
+                raise CommandError('Unknown server %r' % name)
+            self.stdout.write('%s: %s' % (name, ' '.join(commands[name][2:])))
+            with shared_cache(env) as server_env, serve(commands[name], '127.0.0.1', options['port'], server_env):
+                # Isitish: import, ulanish va keshlar o'lchovga kirmaydi
+                run_load('127.0.0.1', options['port'], calls, options['concurrency'], 2)
+                samples, elapsed = run_load('127.0.0.1', options['port'], calls,
+                                            options['concurrency'], options['duration'])
+            results[name] = {call: summarize(rows, elapsed) for call, rows in sorted(samples.items())}
+            results[name]['total'] = summarize([row for rows in samples.values() for row in rows], elapsed)
+
+        self.report(results)
+        if options['output']:
+            with open(options['output'], 'w') as fileobj:
+                json.dump({'options': {k: options[k] for k in ('workers', 'threads', 'concurrency', 'duration')},
+                           'results': results}, fileobj, indent=2)
+
+    def report(self, results):
+        self.stdout.write('%-16s %-5s %9s %9s %9s %9s %7s' % (
+            'endpoint', 'srv', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'errors'))
+        endpoints = next(iter(results.values())).keys()
+        for endpoint in endpoints:
+            for server, stats in results.items():
+                row = stats[endpoint]
+                self.stdout.write('%-16s %-5s %9s %9s %9s %9s %7d' % (
+                    endpoint, server, row['rps'], row['p50'], row['p95'], row['p99'], row['errors']))
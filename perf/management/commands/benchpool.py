@@ -0,0 +1,77 @@
+import json
+import re
+
+from django.core.management.base import BaseCommand
+
+from perf.loadgen import run_load, serve, server_commands, summarize
+from perf.management.commands.benchasgi import read_calls
+
+# Rejim -> server muhiti
+MODES = {
+    'direct': {'DB_POOL': 'False'},
+    'pooled': {'DB_POOL': 'True'},
+}
+POOL_HEADER = re.compile(r'in_use=(\d+) waiting=(\d+) created=(\d+)')
+
+
+def pool_peaks(samples):
+    """Highest in_use / waiting / created reported by any worker (X-DB-Pool), or None."""
+    peaks = None
+    for rows in samples.values():
+        for _, _, headers in rows:
+            match = POOL_HEADER.match(headers.get('X-DB-Pool', ''))
+            if match:
+                values = [int(value) for value in match.groups()]
+                peaks = values if peaks is None else [max(a, b) for a, b in zip(peaks, values)]
+    return peaks and dict(zip(('in_use', 'waiting', 'created'), peaks))
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request latency with a new DB connection per request and with config.dbpool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['wsgi', 'asgi'], default='wsgi')
+        parser.add_argument('--workers', type=int, default=2, help='Server processes')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per WSGI worker')
+        parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=15, help='Seconds per mode')
+        parser.add_argument('--port', type=int, default=8767)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        calls = read_calls()
+        command = server_commands('127.0.0.1:%d' % options['port'], options['workers'],
+                                  options['threads'])[options['server']]
+        self.stdout.write('%s: %s' % (options['server'], ' '.join(command[2:])))
+
+        results, pools = {}, {}
+        for mode, env in MODES.items():
+            # Kesh o'chiq: har so'rov bazaga boradi
+            env = {**env, 'DEBUG': 'False', 'QUERY_BUDGET_HEADERS': 'True', 'API_CACHE_TIMEOUT': '0'}
+            with serve(command, '127.0.0.1', options['port'], env):
+                run_load('127.0.0.1', options['port'], calls, options['concurrency'], 2)
+                samples, elapsed = run_load('127.0.0.1', options['port'], calls,
+                                            options['concurrency'], options['duration'])
+            results[mode] = {call: summarize(rows, elapsed) for call, rows in sorted(samples.items())}
+            results[mode]['total'] = summarize([row for rows in samples.values() for row in rows], elapsed)
+            pools[mode] = pool_peaks(samples)
+
+        self.report(results, pools)
+        if options['output']:
+            with open(options['output'], 'w') as fileobj:
+                json.dump({'options': {k: options[k] for k in ('server', 'workers', 'threads', 'concurrency',
+                                                               'duration')},
+                           'results': results, 'pool': pools}, fileobj, indent=2)
+
+    def report(self, results, pools):
+        self.stdout.write('%-16s %-7s %9s %9s %9s %9s %7s' % (
+            'endpoint', 'mode', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'errors'))
+        for endpoint in results['direct']:
+            for mode, stats in results.items():
+                row = stats[endpoint]
+                self.stdout.write('%-16s %-7s %9s %9s %9s %9s %7d' % (
+                    endpoint, mode, row['rps'], row['p50'], row['p95'], row['p99'], row['errors']))
+        peaks = pools['pooled']
+        if peaks:
+            self.stdout.write('pool per worker (peak): in_use=%(in_use)d waiting=%(waiting)d created=%(created)d'
+                              % peaks)
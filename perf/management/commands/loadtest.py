@@ -0,0 +1,134 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from perf.loadgen import Mix, compare, login, run_load, serve, server_commands, shared_cache, summarize
+from perf.scenario import DEFAULT_WEIGHTS, PASSWORD, Scenario, ensure_dataset
+
+# Baseline bilan solishtirishda mos kelishi kerak bo'lgan parametrlar
+COMPARABLE_OPTIONS = ('server', 'workers', 'threads', 'concurrency', 'students', 'teachers', 'admins', 'cache')
+
+
+def parse_weights(text):
+    weights = dict(DEFAULT_WEIGHTS)
+    for item in filter(None, text.split(',')):
+        name, _, weight = item.partition('=')
+        try:
+            weights[name.strip()] = float(weight)
+        except ValueError:
+            raise CommandError('Bad --mix entry %r, expected name=weight' % item)
+    return weights
+
+
+class Command(BaseCommand):
+    help = ('Log in synthetic students, teachers and admins, replay a weighted call mix against a '
+            'locally started server and report throughput, latency percentiles and query counts')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--teachers', type=int, default=10)
+        parser.add_argument('--admins', type=int, default=2)
+        parser.add_argument('--homework', type=int, default=30, help='Open homework per group')
+        parser.add_argument('--mix', default='',
+                            help='Weights to override, e.g. "submit_homework=10,export_ratings=0" (defaults: %s)'
+                                 % ', '.join('%s=%s' % item for item in DEFAULT_WEIGHTS.items()))
+        parser.add_argument('--server', choices=['asgi', 'wsgi'], default='asgi')
+        parser.add_argument('--workers', type=int, default=2, help='Server processes')
+        parser.add_argument('--threads', type=int, default=4, help='Threads per WSGI worker')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent client connections')
+        parser.add_argument('--duration', type=float, default=30, help='Measured seconds')
+        parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before the run')
+        parser.add_argument('--port', type=int, default=8766)
+        parser.add_argument('--seed', type=int, default=1, help='Seed of the per-connection call choice')
+        parser.add_argument('--no-cache', dest='cache', action='store_false',
+                            help='Turn the API response cache off, so every read reaches the DB')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='JSON baseline to compare against (written by --save-baseline)')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='Store this run as the --baseline instead of failing on regressions')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95/throughput change before a regression is flagged (fraction)')
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline PATH')
+        weights = parse_weights(options['mix'])
+
+        self.stdout.write('Preparing synthetic users and data...')
+        dataset = ensure_dataset(options['students'], options['teachers'], options['admins'], options['homework'])
+        users = dataset['students'] + dataset['teachers'] + dataset['admins']
+
+        env = {'DEBUG': 'False', 'QUERY_BUDGET_HEADERS': 'True'}
+        if not options['cache']:
+            env['API_CACHE_TIMEOUT'] = '0'
+        command = server_commands('127.0.0.1:%d' % options['port'], options['workers'],
+                                  options['threads'])[options['server']]
+        self.stdout.write('%s: %s' % (options['server'], ' '.join(command[2:])))
+
+        with shared_cache(env) as env, serve(command, '127.0.0.1', options['port'], env):
+            started = time.perf_counter()
+            tokens, login_samples = login('127.0.0.1', options['port'], reverse('api_login'),
+                                          [{'phone': user.phone, 'password': PASSWORD} for user in users])
+            login_elapsed = time.perf_counter() - started
+            if len(tokens) < len(users):
+                raise CommandError('%d of %d logins failed' % (len(users) - len(tokens), len(users)))
+
+            scenario = Scenario({user.id: tokens[user.phone] for user in users}, weights)
+            try:
+                mix = Mix(scenario.mix())
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            run_load('127.0.0.1', options['port'], mix, options['concurrency'], options['warmup'], options['seed'])
+            samples, elapsed = run_load('127.0.0.1', options['port'], mix, options['concurrency'],
+                                        options['duration'], options['seed'])
+
+        results = {name: summarize(rows, elapsed) for name, rows in sorted(samples.items())}
+        results['total'] = summarize([row for rows in samples.values() for row in rows], elapsed)
+        results['login'] = summarize(login_samples, login_elapsed)
+        run = {
+            'options': {key: options[key] for key in COMPARABLE_OPTIONS + ('duration', 'mix')},
+            'results': results,
+        }
+        run['options']['mix'] = weights
+        self.report(results)
+
+        if options['output']:
+            with open(options['output'], 'w') as fileobj:
+                json.dump(run, fileobj, indent=2)
+        if options['baseline']:
+            self.check_baseline(run, options)
+
+    def check_baseline(self, run, options):
+        path = options['baseline']
+        problems = []
+        if os.path.exists(path):
+            with open(path) as fileobj:
+                baseline = json.load(fileobj)
+            changed = [key for key in COMPARABLE_OPTIONS if baseline['options'].get(key) != run['options'][key]]
+            if changed:
+                self.stderr.write('Baseline was run with different %s' % ', '.join(changed))
+            problems = compare(baseline['results'], run['results'], options['tolerance'])
+            for problem in problems:
+                self.stderr.write('REGRESSION %s' % problem)
+            if not problems:
+                self.stdout.write('No regressions against %s' % path)
+
+        if options['save_baseline']:
+            with open(path, 'w') as fileobj:
+                json.dump(run, fileobj, indent=2)
+            self.stdout.write('Baseline saved to %s' % path)
+        elif problems:
+            raise CommandError('%d regressions against %s' % (len(problems), path))
+        elif not os.path.exists(path):
+            raise CommandError('No baseline at %s; run with --save-baseline first' % path)
+
+    def report(self, results):
+        self.stdout.write('%-16s %8s %9s %9s %9s %9s %9s %7s' % (
+            'endpoint', 'requests', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'errors'))
+        for endpoint, row in results.items():
+            queries = '-' if row['queries'] is None else '%d/%d' % (row['queries'], row['queries_max'])
+            self.stdout.write('%-16s %8d %9s %9s %9s %9s %9s %7d' % (
+                endpoint, row['requests'], row['rps'], row['p50'], row['p95'], row['p99'], queries, row['errors']))
@@ -0,0 +1,55 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from perf.seed import EPOCH, PASSWORD, Dataset
+
+
+class Command(BaseCommand):
+    help = ('Generate a deterministic synthetic dataset (users, courses, groups, schedules, homework, '
+            'submissions, ratings) and stream it into Postgres with COPY')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=1, help='Same seed and options, same dataset')
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--teachers', type=int, default=50)
+        parser.add_argument('--admins', type=int, default=3)
+        parser.add_argument('--courses', type=int, default=12)
+        parser.add_argument('--groups-per-teacher', type=float, default=3, help='Mean groups per teacher')
+        parser.add_argument('--groups-per-student', type=float, default=1.3, help='Mean groups per student')
+        parser.add_argument('--homework-per-group', type=float, default=30, help='Mean homework per group')
+        parser.add_argument('--submission-rate', type=float, default=0.8,
+                            help='Mean share of homework a student submits')
+        parser.add_argument('--graded-rate', type=float, default=0.75, help='Share of submissions graded')
+        parser.add_argument('--ratings-per-student', type=float, default=12,
+                            help='Mean ratings per student and group')
+        parser.add_argument('--attendance-rate', type=float, default=0.9)
+        parser.add_argument('--days', type=int, default=120, help='How far back groups started')
+        parser.add_argument('--epoch', type=date.fromisoformat, default=EPOCH,
+                            help='The dataset\'s "today" (YYYY-MM-DD); nothing is dated later')
+        parser.add_argument('--password', default=PASSWORD, help='Password of every seeded account')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('seeddata needs PostgreSQL (COPY FROM STDIN)')
+        dataset = Dataset(
+            seed=options['seed'], students=options['students'], teachers=options['teachers'],
+            admins=options['admins'], courses=options['courses'],
+            groups_per_teacher=options['groups_per_teacher'], groups_per_student=options['groups_per_student'],
+            homework_per_group=options['homework_per_group'], submission_rate=options['submission_rate'],
+            graded_rate=options['graded_rate'], ratings_per_student=options['ratings_per_student'],
+            attendance_rate=options['attendance_rate'], days=options['days'], epoch=options['epoch'],
+            password=options['password'],
+        )
+        started = time.perf_counter()
+        try:
+            loaded = dataset.load()
+        except ValueError as exc:
+            raise CommandError('%s; seed into an empty database or flush it first' % exc)
+        elapsed = time.perf_counter() - started
+        for label, rows in loaded.items():
+            self.stdout.write('%-28s %9d rows' % (label, rows))
+        total = sum(loaded.values())
+        self.stdout.write('%d rows in %.1fs (%d rows/s)' % (total, elapsed, total / max(elapsed, 1e-9)))
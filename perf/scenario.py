@@ -0,0 +1,239 @@
+import json
+import threading
+from collections import defaultdict, deque
+from datetime import date, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from ratings.models import Rating
+from schedules.models import ScheduleRule
+from .loadgen import Call, multipart
+
+# Sintetik hisoblar: 99897 + rol raqami + 6 xonali tartib raqami
+PHONE_PREFIX = '99897'
+ROLE_DIGITS = {'STUDENT': '1', 'TEACHER': '2', 'ADMIN': '3'}
+PASSWORD = 'loadtest-pass'
+COURSE_NAME = 'Load test'
+SUBMISSION_BODY = b'%PDF-1.4\n% load test submission\n'
+# Sintetik vazifalar nomi bo'yicha topiladi; submit faqat 24 soat ichida mumkin
+HOMEWORK_TITLE = 'Load homework %d'
+OPEN_FOR = timedelta(hours=20)
+
+# Endpoint -> nisbiy og'irlik (har bir chaqiruvda tasodifiy tanlanadi)
+DEFAULT_WEIGHTS = {
+    'homework_list': 25,
+    'homework_detail': 20,
+    'submit_homework': 5,
+    'grade_homework': 5,
+    'my_schedule': 20,
+    'my_ratings': 20,
+    'export_ratings': 2,
+}
+
+
+def phone(role, n):
+    return '%s%s%06d' % (PHONE_PREFIX, ROLE_DIGITS[role], n)
+
+
+def synthetic_users(role):
+    return User.objects.filter(phone__startswith=PHONE_PREFIX + ROLE_DIGITS[role], role=role).order_by('phone')
+
+
+def ensure_users(role, count, password_hash):
+    existing = set(synthetic_users(role).values_list('phone', flat=True))
+    for n in range(count):
+        if phone(role, n) not in existing:
+            # Signal'lar ishlaydi (hisoblagichlar); hash bir marta hisoblangan
+            User(phone=phone(role, n), role=role, full_name='Load %s %d' % (role.title(), n),
+                 password=password_hash, is_staff=role == 'ADMIN').save()
+    return list(synthetic_users(role)[:count])
+
+
+def ensure_dataset(students, teachers, admins, homework_per_group):
+    """
+    Create the synthetic accounts and what they need, if missing: a group
+    per teacher with the students dealt round-robin, a weekly schedule,
+    ratings, and the homework of ensure_homework(). Safe to run again;
+    only the shortfall is created, and the homework is reset so every run
+    starts from the same state.
+    """
+    password_hash = make_password(PASSWORD)
+    student_users = ensure_users('STUDENT', students, password_hash)
+    teacher_users = ensure_users('TEACHER', max(teachers, 1), password_hash)
+    admin_users = ensure_users('ADMIN', admins, password_hash)
+
+    course = Course.objects.filter(name=COURSE_NAME).first() or Course.objects.create(
+        name=COURSE_NAME, description='Synthetic data for manage.py loadtest')
+    groups = []
+    for n, teacher in enumerate(teacher_users):
+        group = Group.objects.filter(course=course, teacher=teacher).first()
+        if group is None:
+            group = Group.objects.create(name='Load %d' % n, course=course, teacher=teacher,
+                                         days=['Mon', 'Wed', 'Fri'])
+            ScheduleRule.objects.create(group=group, start_time=time(9 + n % 8), end_time=time(10 + n % 8),
+                                        subject='Load test', starts_on=date.today() - timedelta(days=30))
+        groups.append(group)
+
+    for n, student in enumerate(student_users):
+        group = groups[n % len(groups)]
+        if not group.students.filter(id=student.id).exists():
+            group.students.add(student)
+            Rating.objects.bulk_create([
+                Rating(student=student, group=group, score=(n + i) % 5 + 1) for i in range(4)
+            ])
+
+    for group in groups:
+        ensure_homework(group, homework_per_group)
+    return {'students': student_users, 'teachers': teacher_users, 'admins': admin_users}
+
+
+def ensure_homework(group, count):
+    """
+    Bring the group's synthetic homework back to its starting state: slots
+    HOMEWORK_TITLE % 0..count-1 (found by title, never added twice), each
+    open for submission, the first with one ungraded submission per
+    student so teachers have work and the others unsubmitted. Deadlines
+    run from created_at, so a slot close to its deadline is moved forward
+    instead of being replaced. Other homework in the group is removed.
+    """
+    titles = [HOMEWORK_TITLE % n for n in range(count)]
+    # Signal'lar ishlashi uchun bittalab o'chiriladi (hisoblagichlar, blob'lar)
+    for homework in Homework.objects.filter(group=group).exclude(title__in=titles):
+        homework.delete()
+
+    now = timezone.now()
+    students = list(group.students.all())
+    for n, title in enumerate(titles):
+        homework = Homework.objects.filter(group=group, title=title).first()
+        if homework is None:
+            homework = Homework.objects.create(group=group, title=title)
+        elif homework.created_at < now - OPEN_FOR:
+            Homework.objects.filter(pk=homework.pk).update(created_at=now)
+
+        submissions = {s.student_id: s for s in HomeworkSubmission.objects.filter(homework=homework)}
+        if n > 0:
+            for submission in submissions.values():
+                submission.delete()
+            continue
+        for student in students:
+            submission = submissions.get(student.id)
+            if submission is None:
+                HomeworkSubmission.objects.create(
+                    homework=homework, student=student, file=ContentFile(SUBMISSION_BODY, name='load.pdf'))
+            elif submission.score is not None:
+                submission.score, submission.feedback, submission.graded_at = None, '', None
+                submission.save()
+
+
+class Scenario:
+    """
+    The weighted call mix for a set of logged-in users.
+
+    `tokens` maps user id -> access token. Calls are built per pick, so a
+    student submits each open homework at most once and teachers grade
+    submissions of their own groups. Thread-safe: workers share it.
+    """
+
+    def __init__(self, tokens, weights=None):
+        self.weights = dict(DEFAULT_WEIGHTS if weights is None else weights)
+        users = User.objects.filter(id__in=list(tokens)).only('id', 'role')
+        self.headers = {user.id: {'Authorization': 'Bearer %s' % tokens[user.id]} for user in users}
+        by_role = defaultdict(list)
+        for user in users:
+            by_role[user.role].append(user.id)
+        self.students, self.teachers, self.admins = by_role['STUDENT'], by_role['TEACHER'], by_role['ADMIN']
+
+        open_since = timezone.now() - OPEN_FOR
+        memberships = Group.students.through.objects.filter(user_id__in=self.students)
+        group_of = dict(memberships.values_list('user_id', 'group_id'))
+        homework = defaultdict(list)
+        for homework_id, group_id in Homework.objects.filter(
+                group_id__in=set(group_of.values()), created_at__gte=open_since).values_list('id', 'group_id'):
+            homework[group_id].append(homework_id)
+        submitted = set(HomeworkSubmission.objects.filter(student_id__in=self.students)
+                        .values_list('student_id', 'homework_id'))
+
+        self.homework = {s: homework[group_of[s]] for s in self.students if homework.get(group_of.get(s))}
+        self.unsubmitted = {
+            s: deque(h for h in ids if (s, h) not in submitted) for s, ids in self.homework.items()
+        }
+        self.groups = {t: list(Group.objects.filter(teacher_id=t).values_list('id', flat=True))
+                       for t in self.teachers}
+        self.submissions = {
+            t: list(HomeworkSubmission.objects.filter(homework__group__teacher_id=t)
+                    .order_by('-id').values_list('id', flat=True)[:500])
+            for t in self.teachers
+        }
+        self.lock = threading.Lock()
+
+    def factories(self):
+        return {
+            'homework_list': self.homework_list,
+            'homework_detail': self.homework_detail,
+            'submit_homework': self.submit_homework,
+            'grade_homework': self.grade_homework,
+            'my_schedule': self.my_schedule,
+            'my_ratings': self.my_ratings,
+            'export_ratings': self.export_ratings,
+        }
+
+    def mix(self):
+        factories = self.factories()
+        unknown = set(self.weights) - set(factories)
+        if unknown:
+            raise ValueError('Unknown endpoints: %s' % ', '.join(sorted(unknown)))
+        return [(name, weight, factories[name]) for name, weight in self.weights.items() if weight > 0]
+
+    def get(self, name, user_id, path):
+        return Call(name, 'GET', path, self.headers[user_id], None)
+
+    def homework_list(self, rng):
+        if self.students:
+            return self.get('homework_list', rng.choice(self.students), reverse('homework_list'))
+
+    def homework_detail(self, rng):
+        if self.homework:
+            student = rng.choice(list(self.homework))
+            return self.get('homework_detail', student,
+                            reverse('homework_detail', args=[rng.choice(self.homework[student])]))
+
+    def submit_homework(self, rng):
+        with self.lock:
+            pending = [s for s, ids in self.unsubmitted.items() if ids]
+            if not pending:
+                return None
+            student = rng.choice(pending)
+            homework_id = self.unsubmitted[student].popleft()
+        body, content_type = multipart({}, {'file': ('load.pdf', SUBMISSION_BODY)})
+        return Call('submit_homework', 'POST', reverse('submit_homework', args=[homework_id]),
+                    {**self.headers[student], 'Content-Type': content_type}, body)
+
+    def grade_homework(self, rng):
+        teachers = [t for t in self.teachers if self.submissions[t]]
+        if teachers:
+            teacher = rng.choice(teachers)
+            body = json.dumps({'score': rng.randint(50, 100), 'feedback': 'Load test'}).encode()
+            return Call('grade_homework', 'POST',
+                        reverse('grade_homework', args=[rng.choice(self.submissions[teacher])]),
+                        {**self.headers[teacher], 'Content-Type': 'application/json'}, body)
+
+    def my_schedule(self, rng):
+        if self.students:
+            return self.get('my_schedule', rng.choice(self.students), reverse('my_schedule'))
+
+    def my_ratings(self, rng):
+        if self.students:
+            return self.get('my_ratings', rng.choice(self.students), reverse('my_ratings'))
+
+    def export_ratings(self, rng):
+        groups = [g for ids in self.groups.values() for g in ids]
+        if self.admins and groups:
+            return self.get('export_ratings', rng.choice(self.admins),
+                            '%s?output=csv&group=%d' % (reverse('export_ratings'), rng.choice(groups)))
@@ -0,0 +1,324 @@
+import json
+import random
+from datetime import date, datetime, time, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import F, Max
+
+from accounts.models import User
+from apicache.cache import invalidate_users
+from courses.models import Course
+from groups.models import Group
+from homework.models import Blob, Homework, HomeworkSubmission
+from homework.storage import content_digest, submission_storage
+from ratings.models import Rating
+from schedules.models import ScheduleRule
+from stats.counters import rebuild
+from stats.models import GroupCounters, StudentCounters, TeacherCounters
+
+# Seed hisoblari: 99896 + rol raqami + 6 xonali tartib raqami
+PHONE_PREFIX = '99896'
+ROLE_DIGITS = {'STUDENT': '1', 'TEACHER': '2', 'ADMIN': '3'}
+PASSWORD = 'seed-pass'
+EPOCH = date(2026, 9, 1)
+SUBMISSION_BODY = b'%PDF-1.4\n% seeded submission\n'
+COPY_CHUNK = 1 << 16
+
+FIRST_NAMES = (
+    ('Aziz', 'Bekzod', 'Dilshod', 'Jasur', 'Sardor', 'Shohruh', 'Otabek', 'Javohir', 'Umid', 'Sherzod'),
+    ('Madina', 'Malika', 'Nilufar', 'Dilnoza', 'Gulnora', 'Sevara', 'Zarina', 'Kamola', 'Laylo', 'Shahnoza'),
+)
+LAST_NAMES = ('Karimov', 'Rahimov', 'Tursunov', 'Yusupov', 'Aliyev', 'Abdullayev', 'Ismoilov', 'Ergashev',
+              'Qodirov', 'Saidov', 'Nazarov', 'Xolmatov')
+COURSE_NAMES = ('Python', 'Frontend', 'Backend', 'Ingliz tili', 'Matematika', 'Fizika', 'Kimyo', 'Biologiya',
+                'Grafik dizayn', 'Mobil dasturlash', 'Data Science', 'Rus tili', 'Ona tili', 'Tarix', 'IELTS',
+                'SAT', 'Robototexnika', 'Scratch', 'Kompyuter savodxonligi', 'Buxgalteriya')
+TOPICS = ('Kirish', 'Takrorlash', 'Amaliyot', 'Loyiha', 'Test', 'Mustaqil ish', 'Nazorat', 'Esse')
+
+# Guruh kunlari va ularning ulushi: toq/juft kunlar ko'p, har kunlik kam
+DAYS = (
+    (['Mon', 'Wed', 'Fri'], 45),
+    (['Tue', 'Thu', 'Sat'], 45),
+    (['Mon', 'Tue', 'Wed', 'Thu', 'Fri'], 7),
+    (['Sat'], 3),
+)
+RATING_SCORES = ((1, 5), (2, 10), (3, 25), (4, 35), (5, 25))
+
+Membership = Group.students.through
+
+
+def phone(role, n):
+    return '%s%s%06d' % (PHONE_PREFIX, ROLE_DIGITS[role], n)
+
+
+COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def copy_value(value):
+    """One field in COPY text format."""
+    # Eng ko'p uchraydigan turlar birinchi: bu funksiya har maydon uchun chaqiriladi
+    kind = type(value)
+    if kind is int:
+        return str(value)
+    if kind is str:
+        return value.translate(COPY_ESCAPES)
+    if value is None:
+        return '\\N'
+    if kind is bool:
+        return 't' if value else 'f'
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value).translate(COPY_ESCAPES)
+    return str(value).translate(COPY_ESCAPES)
+
+
+class RowReader:
+    """File-like view of an iterator of rows, read by copy_expert() in chunks."""
+
+    def __init__(self, rows):
+        self.rows = iter(rows)
+        self.buffer = b''
+
+    def read(self, size=-1):
+        chunks, length = [self.buffer], len(self.buffer)
+        while size < 0 or length < size:
+            row = next(self.rows, None)
+            if row is None:
+                break
+            line = ('\t'.join(map(copy_value, row)) + '\n').encode()
+            chunks.append(line)
+            length += len(line)
+        data = b''.join(chunks)
+        if size < 0:
+            size = len(data)
+        self.buffer = data[size:]
+        return data[:size]
+
+    readline = read
+
+
+def copy_rows(cursor, model, fields, rows):
+    """Stream `rows` (tuples in `fields` order) into the model's table; returns the row count."""
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    cursor.copy_expert('COPY %s (%s) FROM STDIN' % (quote(model._meta.db_table), columns), RowReader(rows), COPY_CHUNK)
+    return cursor.rowcount
+
+
+def restore_sequences(cursor, models):
+    """Move each id sequence past the ids COPY wrote explicitly."""
+    for statement in connection.ops.sequence_reset_sql(no_style(), models):
+        cursor.execute(statement)
+
+
+class Ids:
+    """Explicit ids after the current MAX(id) of a table, so rows can refer to each other before COPY."""
+
+    def __init__(self, model):
+        self.next = (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+
+    def __call__(self):
+        self.next += 1
+        return self.next - 1
+
+
+class Dataset:
+    """
+    A deterministic synthetic school: everything is drawn from one
+    random.Random(seed) relative to a fixed `epoch` day, so the same
+    options always produce the same rows (ids continue from what the
+    tables already hold). The means below are tunable; counts vary
+    around them per teacher, student, group and homework.
+    """
+
+    def __init__(self, seed=1, students=2000, teachers=50, admins=3, courses=12, groups_per_teacher=3,
+                 groups_per_student=1.3, homework_per_group=30, submission_rate=0.8, graded_rate=0.75,
+                 ratings_per_student=12, attendance_rate=0.9, days=120, epoch=EPOCH, password=PASSWORD):
+        self.rng = random.Random(seed)
+        self.counts = {'STUDENT': students, 'TEACHER': teachers, 'ADMIN': admins}
+        self.courses = min(courses, len(COURSE_NAMES))
+        self.groups_per_teacher = groups_per_teacher
+        self.groups_per_student = groups_per_student
+        self.homework_per_group = homework_per_group
+        self.submission_rate = submission_rate
+        self.graded_rate = graded_rate
+        self.ratings_per_student = ratings_per_student
+        self.attendance_rate = attendance_rate
+        self.days = days
+        self.now = datetime.combine(epoch, time(20), tzinfo=timezone.utc)
+        self.password = password
+        self.users = {role: [] for role in self.counts}
+        self.groups = []
+        self.members = {}
+        self.homework = []
+
+    def count(self, mean, low=0):
+        """A whole number around `mean` (±40%), at least `low`."""
+        return max(low, round(self.rng.gauss(mean, mean * 0.4)))
+
+    def rate(self, mean):
+        """A per-person rate around `mean`; some are far more diligent than others."""
+        if mean <= 0 or mean >= 1:
+            return min(max(mean, 0), 1)
+        return self.rng.betavariate(mean * 6, (1 - mean) * 6)
+
+    def moment(self, start, end):
+        return start + timedelta(seconds=self.rng.uniform(0, max((end - start).total_seconds(), 0)))
+
+    def user_rows(self):
+        # Hash bir marta, tuz seed'dan: bir xil seed - bir xil qator
+        salt = ''.join(self.rng.choice('abcdefghijklmnopqrstuvwxyz0123456789') for _ in range(22))
+        password = make_password(self.password, salt)
+        next_id = self.ids[User]
+        for role in ('ADMIN', 'TEACHER', 'STUDENT'):
+            for n in range(self.counts[role]):
+                female = self.rng.random() < 0.5
+                last = self.rng.choice(LAST_NAMES) + ('a' if female else '')
+                name = '%s %s' % (self.rng.choice(FIRST_NAMES[female]), last)
+                user_id = next_id()
+                self.users[role].append(user_id)
+                yield (user_id, password, None, False, name, phone(role, n), role, True, role == 'ADMIN')
+
+    def course_rows(self):
+        next_id = self.ids[Course]
+        self.course_ids = []
+        for name in COURSE_NAMES[:self.courses]:
+            self.course_ids.append(next_id())
+            yield (self.course_ids[-1], name, '%s kursi (seed)' % name)
+
+    def group_rows(self):
+        next_id = self.ids[Group]
+        patterns, weights = zip(*DAYS)
+        for teacher in self.users['TEACHER']:
+            # O'qituvchi odatda bir-ikki yo'nalishda dars beradi
+            courses = self.rng.sample(self.course_ids, min(2, len(self.course_ids)))
+            for _ in range(self.count(self.groups_per_teacher, low=1)):
+                group_id = next_id()
+                course = self.rng.choice(courses)
+                days = self.rng.choices(patterns, weights)[0]
+                starts_on = (self.now - timedelta(days=self.rng.randint(14, self.days))).date()
+                self.groups.append((group_id, course, days, starts_on))
+                self.members[group_id] = []
+                yield (group_id, '%s-%d' % (COURSE_NAMES[self.course_ids.index(course)][:3].upper(), group_id),
+                       course, teacher, days)
+
+    def membership_rows(self):
+        if not self.groups:
+            return
+        next_id = self.ids[Membership]
+        # Har qo'shimcha guruh ehtimoli: o'rtacha groups_per_student ta guruh
+        more = 1 - 1 / max(self.groups_per_student, 1)
+        for student in self.users['STUDENT']:
+            groups = {self.rng.choice(self.groups)[0]}
+            while self.rng.random() < more and len(groups) < len(self.groups):
+                groups.add(self.rng.choice(self.groups)[0])
+            for group_id in sorted(groups):
+                self.members[group_id].append(student)
+                yield (next_id(), group_id, student)
+
+    def rule_rows(self):
+        next_id = self.ids[ScheduleRule]
+        for group_id, course, days, starts_on in self.groups:
+            start = self.rng.choice((8, 9, 10, 11, 14, 15, 16, 17, 18))
+            yield (next_id(), group_id, time(start), time(start + 1, 30),
+                   COURSE_NAMES[self.course_ids.index(course)], starts_on, None, self.now)
+
+    def homework_rows(self):
+        next_id = self.ids[Homework]
+        for group_id, course, days, starts_on in self.groups:
+            opened = datetime.combine(starts_on, time(9), tzinfo=timezone.utc)
+            created = sorted(self.moment(opened, self.now) for _ in range(self.count(self.homework_per_group)))
+            for n, created_at in enumerate(created, 1):
+                homework_id = next_id()
+                self.homework.append((homework_id, group_id, created_at))
+                yield (homework_id, group_id, '%d-vazifa: %s' % (n, self.rng.choice(TOPICS)),
+                       '', created_at, created_at)
+
+    def submission_rows(self, file_name):
+        next_id = self.ids[HomeworkSubmission]
+        diligence = {}
+        for homework_id, group_id, created_at in self.homework:
+            for student in self.members[group_id]:
+                if student not in diligence:
+                    diligence[student] = self.rate(self.submission_rate)
+                if self.rng.random() >= diligence[student]:
+                    continue
+                # Ko'pchilik birinchi soatlarda; ba'zilari muddatdan (24 soat) keyin
+                submitted_at = created_at + timedelta(hours=min(self.rng.expovariate(1 / 8), 36))
+                if submitted_at > self.now:
+                    continue
+                score = graded_at = None
+                if self.rng.random() < self.graded_rate:
+                    graded_at = submitted_at + timedelta(hours=self.rng.expovariate(1 / 24))
+                    if graded_at <= self.now:
+                        score = min(100, max(0, round(self.rng.gauss(78, 14))))
+                    else:
+                        graded_at = None
+                yield (next_id(), homework_id, student, file_name, submitted_at, score, '', graded_at,
+                       graded_at or submitted_at)
+
+    def rating_rows(self):
+        next_id = self.ids[Rating]
+        scores, weights = zip(*RATING_SCORES)
+        for group_id, course, days, starts_on in self.groups:
+            opened = datetime.combine(starts_on, time(9), tzinfo=timezone.utc)
+            for student in self.members[group_id]:
+                attendance = self.rate(self.attendance_rate)
+                for _ in range(self.count(self.ratings_per_student)):
+                    yield (next_id(), student, group_id, self.rng.choices(scores, weights)[0],
+                           self.rng.random() < attendance, self.moment(opened, self.now))
+
+    def load(self):
+        """
+        COPY every table in dependency order inside one transaction, then
+        restore the id sequences and rebuild what signals would have kept
+        current (dashboard counters, the submission blob's refcount, the
+        API cache). Returns {table label: rows}.
+        """
+        existing = User.objects.filter(phone__startswith=PHONE_PREFIX).exists()
+        if existing:
+            raise ValueError('Seed users (%s...) already exist' % PHONE_PREFIX)
+
+        models = (User, Course, Group, Membership, ScheduleRule, Homework, HomeworkSubmission, Rating)
+        # Boshlang'ich id'lar oldindan: COPY davomida boshqa so'rov yuborib bo'lmaydi
+        self.ids = {model: Ids(model) for model in models}
+        loaded = {}
+        with transaction.atomic(), connection.cursor() as cursor:
+            tables = (
+                (User, ('id', 'password', 'last_login', 'is_superuser', 'full_name', 'phone', 'role',
+                        'is_active', 'is_staff'), self.user_rows),
+                (Course, ('id', 'name', 'description'), self.course_rows),
+                (Group, ('id', 'name', 'course', 'teacher', 'days'), self.group_rows),
+                (Membership, ('id', 'group', 'user'), self.membership_rows),
+                (ScheduleRule, ('id', 'group', 'start_time', 'end_time', 'subject', 'starts_on', 'ends_on',
+                                'updated_at'), self.rule_rows),
+                (Homework, ('id', 'group', 'title', 'description', 'created_at', 'updated_at'),
+                 self.homework_rows),
+            )
+            for model, fields, rows in tables:
+                loaded[model._meta.label] = copy_rows(cursor, model, fields, rows())
+
+            # Hamma topshiriq bitta blob'ga ishora qiladi: save() bitta havola qo'shadi
+            file_name = submission_storage.save('homeworks/seed.pdf', ContentFile(SUBMISSION_BODY))
+            submissions = copy_rows(cursor, HomeworkSubmission, (
+                'id', 'homework', 'student', 'file', 'submitted_at', 'score', 'feedback', 'graded_at',
+                'updated_at'), self.submission_rows(file_name))
+            Blob.objects.filter(pk=content_digest(file_name)).update(refcount=F('refcount') + submissions - 1)
+            loaded[HomeworkSubmission._meta.label] = submissions
+            loaded[Rating._meta.label] = copy_rows(
+                cursor, Rating, ('id', 'student', 'group', 'score', 'attendance', 'updated_at'), self.rating_rows())
+
+            restore_sequences(cursor, models)
+            # Statistikasiz rejalashtiruvchi hisoblagich so'rovlarini juda sekin bajaradi
+            cursor.execute('ANALYZE %s' % ', '.join(connection.ops.quote_name(model._meta.db_table)
+                                                   for model in models))
+            # COPY signal yubormaydi: hisoblagichlar manbadan qayta hisoblanadi
+            rebuild(GroupCounters, [group[0] for group in self.groups])
+            rebuild(TeacherCounters, self.users['TEACHER'])
+            rebuild(StudentCounters, self.users['STUDENT'])
+            invalidate_users([])
+        return loaded
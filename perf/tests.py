@@ -0,0 +1,186 @@
+import random
+import tempfile
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.apps import apps
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from accounts.serializers import MyTokenSerializer
+from groups.models import Group
+from homework.models import Blob, Homework, HomeworkSubmission
+from homework.storage import content_digest
+from stats.counters import verify
+from stats.models import GroupCounters, StudentCounters, TeacherCounters
+from .loadgen import Call, Mix, compare, percentile, run_load, summarize
+from .scenario import PHONE_PREFIX, Scenario, ensure_dataset
+from .seed import DAYS, PASSWORD as SEED_PASSWORD, PHONE_PREFIX as SEED_PREFIX, Dataset
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        status = 404 if self.path == '/missing/' else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.send_header('X-Query-Count', '3')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class LoadGeneratorTests(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_run_load(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        calls = [Call('ok', 'GET', '/ok/', {}, None), Call('missing', 'GET', '/missing/', {}, None)]
+        samples, elapsed = run_load('127.0.0.1', server.server_port, calls, concurrency=2, duration=0.3)
+
+        ok, missing = summarize(samples['ok'], elapsed), summarize(samples['missing'], elapsed)
+        self.assertGreater(ok['requests'], 0)
+        self.assertEqual(ok['errors'], 0)
+        self.assertEqual(missing['errors'], missing['requests'])
+        self.assertLessEqual(ok['p50'], ok['p99'])
+        self.assertEqual(samples['ok'][0][2]['X-Query-Count'], '3')
+        self.assertEqual((ok['queries'], ok['queries_max']), (3, 3))
+        self.assertIsNone(summarize([(0.1, 200, {})], 1)['queries'])
+
+    def test_mix_follows_weights_and_skips_empty_factories(self):
+        ok, never = Call('ok', 'GET', '/ok/', {}, None), Call('never', 'GET', '/never/', {}, None)
+        mix = Mix([('ok', 3, lambda rng: ok), ('empty', 1, lambda rng: None), ('off', 0, lambda rng: never)])
+        rng = random.Random(1)
+        self.assertEqual({mix(rng).name for _ in range(200)}, {'ok'})
+
+        with self.assertRaises(RuntimeError):
+            Mix([('empty', 1, lambda rng: None)])(rng)
+
+    def test_compare_flags_regressions(self):
+        def row(p95, rps, queries, errors=0, requests=100):
+            return {'requests': requests, 'errors': errors, 'rps': rps, 'p95': p95, 'queries_max': queries}
+
+        baseline = {'list': row(10, 100, 3), 'detail': row(10, 100, 5), 'rare': row(10, 100, 2, requests=5)}
+        current = {'list': row(11, 95, 3), 'detail': row(20, 50, 6, errors=1), 'rare': row(50, 10, 2, requests=5)}
+        problems = compare(baseline, current, tolerance=0.2)
+        self.assertEqual([p.split(':')[0] for p in problems], ['detail'] * 4)
+        self.assertEqual(compare(baseline, baseline, tolerance=0.2), [])
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ScenarioTests(TestCase):
+    def setUp(self):
+        self.dataset = ensure_dataset(students=6, teachers=2, admins=1, homework_per_group=3)
+        users = self.dataset['students'] + self.dataset['teachers'] + self.dataset['admins']
+        self.scenario = Scenario({u.id: str(MyTokenSerializer.get_token(u).access_token) for u in users})
+
+    def test_dataset_is_created_once(self):
+        self.assertEqual(User.objects.filter(phone__startswith=PHONE_PREFIX).count(), 9)
+        self.assertEqual(Homework.objects.count(), 6)
+        # Har bir o'quvchida baholanadigan bitta topshiriq bor
+        self.assertEqual(HomeworkSubmission.objects.count(), 6)
+
+        ensure_dataset(students=6, teachers=2, admins=1, homework_per_group=3)
+        self.assertEqual(User.objects.filter(phone__startswith=PHONE_PREFIX).count(), 9)
+        self.assertEqual(Homework.objects.count(), 6)
+        self.assertEqual(HomeworkSubmission.objects.count(), 6)
+
+    def test_rerun_refreshes_instead_of_adding(self):
+        # Oldingi yuklama: biri topshirilgan, biri baholangan, keyin vazifalar eskirgan
+        call = self.scenario.submit_homework(random.Random(1))
+        response = self.client.post(call.path, call.body, content_type=call.headers['Content-Type'],
+                                    HTTP_AUTHORIZATION=call.headers['Authorization'])
+        self.assertEqual(response.status_code, 201)
+        graded = HomeworkSubmission.objects.order_by('id').first()
+        graded.score = 90
+        graded.save()
+        Homework.objects.update(created_at=timezone.now() - timedelta(days=2))
+
+        ensure_dataset(students=6, teachers=2, admins=1, homework_per_group=3)
+        self.assertEqual(Homework.objects.count(), 6)
+        self.assertFalse(Homework.objects.filter(created_at__lt=timezone.now() - timedelta(hours=1)).exists())
+        # Har bir o'quvchida birinchi vazifa uchun bitta baholanmagan topshiriq
+        self.assertEqual(sorted(HomeworkSubmission.objects.filter(score__isnull=True)
+                                .values_list('student_id', flat=True)),
+                         sorted(u.id for u in self.dataset['students']))
+        self.assertEqual(HomeworkSubmission.objects.count(), 6)
+        for model in (GroupCounters, StudentCounters, TeacherCounters):
+            self.assertEqual(verify(model), [])
+
+    def test_every_call_in_the_mix_succeeds(self):
+        rng = random.Random(1)
+        for name, _, factory in self.scenario.mix():
+            call = factory(rng)
+            response = self.client.generic(
+                call.method, call.path, call.body or b'',
+                content_type=call.headers.get('Content-Type', 'application/octet-stream'),
+                HTTP_AUTHORIZATION=call.headers['Authorization'],
+            )
+            if response.streaming:
+                b''.join(response.streaming_content)
+            self.assertLess(response.status_code, 300, name)
+
+    def test_each_homework_is_submitted_once(self):
+        rng = random.Random(1)
+        calls = iter(lambda: self.scenario.submit_homework(rng), None)
+        submits = [(call.headers['Authorization'], call.path) for call in calls]
+        # 6 o'quvchi x 3 vazifa, bittasi allaqachon topshirilgan
+        self.assertEqual(len(submits), 12)
+        self.assertEqual(len(set(submits)), 12)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class SeedTests(TestCase):
+    OPTIONS = {'students': 40, 'teachers': 4, 'admins': 1, 'homework_per_group': 5, 'ratings_per_student': 3}
+
+    def fingerprint(self, seed):
+        """Checksum of every seeded table, then roll the load back."""
+        with transaction.atomic():
+            loaded = Dataset(seed=seed, **self.OPTIONS).load()
+            sums = []
+            with connection.cursor() as cursor:
+                for label in loaded:
+                    table = apps.get_model(label)._meta.db_table
+                    cursor.execute('SELECT md5(string_agg(t::text, \',\' ORDER BY t.id)) FROM %s t' % table)
+                    sums.append(cursor.fetchone()[0])
+            transaction.set_rollback(True)
+        return loaded, sums
+
+    def test_same_seed_same_dataset(self):
+        loaded, sums = self.fingerprint(7)
+        self.assertEqual(self.fingerprint(7), (loaded, sums))
+        self.assertNotEqual(self.fingerprint(8)[1], sums)
+        self.assertEqual(loaded['accounts.User'], 45)
+        self.assertGreater(loaded['homework.HomeworkSubmission'], 0)
+
+    def test_loaded_data_is_consistent(self):
+        loaded = Dataset(seed=3, **self.OPTIONS).load()
+        student = User.objects.filter(phone__startswith=SEED_PREFIX, role='STUDENT').first()
+        self.assertTrue(student.check_password(SEED_PASSWORD))
+        # Sequence tiklangan: ORM yangi qatorni to'qnashuvsiz qo'shadi
+        self.assertGreater(User.objects.create_user('998900000999', 'pass').id, student.id)
+        for model in (GroupCounters, TeacherCounters, StudentCounters):
+            self.assertEqual(verify(model), [])
+
+        submission = HomeworkSubmission.objects.first()
+        self.assertEqual(Blob.objects.get(pk=content_digest(submission.file.name)).refcount,
+                         loaded['homework.HomeworkSubmission'])
+        self.assertTrue(all(days in [pattern for pattern, weight in DAYS]
+                            for days in Group.objects.values_list('days', flat=True)))
+        with self.assertRaises(ValueError):
+            Dataset(seed=3, **self.OPTIONS).load()
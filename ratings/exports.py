@@ -0,0 +1,82 @@
+import csv
+import json
+
+import openpyxl
+
+from .models import Rating
+
+EXPORT_HEADER = ["Student", "Group", "Score", "Attendance"]
+EXPORT_FIELDS = ('student__phone', 'group__name', 'score', 'attendance')
+
+# Server-side cursor orqali bir martada o'qiladigan qatorlar soni
+EXPORT_CHUNK_SIZE = 2000
+
+FILTERS = {
+    'group': 'group_id',
+    'course': 'group__course_id',
+    'student': 'student_id',
+}
+
+
+class Echo:
+    """File-like object for csv.writer that hands each line straight back."""
+
+    def write(self, value):
+        return value
+
+
+def filter_ratings(params):
+    """
+    Apply the ?group=&course=&student= filters. Raises ValueError on a
+    non-numeric id.
+    """
+    ratings = Rating.objects.all()
+    for param, lookup in FILTERS.items():
+        value = params.get(param)
+        if value:
+            ratings = ratings.filter(**{lookup: int(value)})
+    return ratings
+
+
+def export_rows(ratings):
+    """Joined (phone, group, score, attendance) tuples read in chunks."""
+    return ratings.order_by('id').values_list(*EXPORT_FIELDS).iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    )
+
+
+def _batched(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= EXPORT_CHUNK_SIZE:
+            yield ''.join(batch)
+            batch = []
+    if batch:
+        yield ''.join(batch)
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    lines = (writer.writerow(row) for row in rows)
+    yield writer.writerow(EXPORT_HEADER)
+    yield from _batched(lines)
+
+
+def iter_ndjson(rows):
+    keys = [name.lower() for name in EXPORT_HEADER]
+    lines = (json.dumps(dict(zip(keys, row))) + '\n' for row in rows)
+    yield from _batched(lines)
+
+
+def write_xlsx(rows, fileobj):
+    """
+    Write rows with a write-only workbook: rows are flushed to disk as they
+    are appended instead of being kept as cell objects in memory.
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet()
+    ws.append(EXPORT_HEADER)
+    for row in rows:
+        ws.append(row)
+    wb.save(fileobj)
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:05
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('groups', '0001_initial'),
+        ('ratings', '0002_rating_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rating',
+            name='group',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='groups.group'),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='student',
+            field=models.ForeignKey(db_index=False, limit_choices_to={'role': 'STUDENT'}, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['student', '-id'], name='rating_student_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['group', '-id'], name='rating_group_recent_idx'),
+        ),
+    ]
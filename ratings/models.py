@@ -5,8 +5,15 @@ from accounts.models import User
 from groups.models import Group
 
 class Rating(models.Model):
-    student = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role':'STUDENT'})
-    group = models.ForeignKey(Group, on_delete=models.CASCADE)
+    student = models.ForeignKey(User, on_delete=models.CASCADE, limit_choices_to={'role':'STUDENT'}, db_index=False)
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, db_index=False)
     score = models.IntegerField()
     attendance = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', '-id'], name='rating_student_recent_idx'),
+            models.Index(fields=['group', '-id'], name='rating_group_recent_idx'),
+        ]
 
@@ -1,3 +1,118 @@
+import io
+
+import openpyxl
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from config.testing import QueryBudgetAssertions, QueryPlanAssertions, seed_hot_paths
+from courses.models import Course
+from groups.models import Group
+from . import urls as ratings_urls
+from .models import Rating
+
+
+class ExportRatingsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.alice = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        self.bob = User.objects.create_user('998900000003', 'pass', role='STUDENT')
+
+        python = Course.objects.create(name='Python', description='')
+        english = Course.objects.create(name='English', description='')
+        self.p1 = Group.objects.create(name='P-1', course=python, teacher=teacher)
+        self.e1 = Group.objects.create(name='E-1', course=english, teacher=teacher)
+
+        Rating.objects.create(student=self.alice, group=self.p1, score=5)
+        Rating.objects.create(student=self.bob, group=self.p1, score=4, attendance=False)
+        Rating.objects.create(student=self.alice, group=self.e1, score=3)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get_csv(self, query=''):
+        response = self.client.get('/api/ratings/export/?output=csv' + query)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode().splitlines()
+
+    def test_csv_export(self):
+        lines = self.get_csv()
+        self.assertEqual(lines[0], 'Student,Group,Score,Attendance')
+        self.assertEqual(lines[1:], [
+            '998900000002,P-1,5,True',
+            '998900000003,P-1,4,False',
+            '998900000002,E-1,3,True',
+        ])
+
+    def test_filters(self):
+        self.assertEqual(len(self.get_csv('&group=%d' % self.e1.id)), 2)
+        self.assertEqual(len(self.get_csv('&course=%d' % self.p1.course_id)), 3)
+        self.assertEqual(len(self.get_csv('&student=%d' % self.bob.id)), 2)
+
+        response = self.client.get('/api/ratings/export/?output=csv&group=x')
+        self.assertEqual(response.status_code, 400)
+
+    def test_xlsx_export(self):
+        response = self.client.get('/api/ratings/export/')
+        self.assertEqual(response.status_code, 200)
+
+        wb = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+        rows = list(wb.active.values)
+        self.assertEqual(rows[0], ('Student', 'Group', 'Score', 'Attendance'))
+        self.assertEqual(len(rows), 4)
+
+    def test_forbidden_for_students(self):
+        self.client.force_authenticate(self.alice)
+        response = self.client.get('/api/ratings/export/?output=csv')
+        self.assertEqual(response.status_code, 403)
+
+
+class RatingQueryPlanTests(QueryPlanAssertions, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_hot_paths()
+
+    def test_student_ratings(self):
+        student = self.seed['students'][0]
+        self.assertIndexedPlan(Rating.objects.filter(student=student).order_by('-id')[:21])
+
+    def test_group_ratings(self):
+        group = self.seed['groups'][0]
+        self.assertIndexedPlan(Rating.objects.filter(group=group).order_by('-id')[:21])
+
+
+class RatingQueryBudgetTests(QueryBudgetAssertions, TestCase):
+    BUDGETS = {
+        'my_ratings': 2,
+        'export_ratings': 1,
+    }
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        course = Course.objects.create(name='Python', description='')
+        group = Group.objects.create(name='P-1', course=course, teacher=teacher)
+        for i in range(10):
+            student = User.objects.create_user('99890000010%d' % i, 'pass', role='STUDENT')
+            Rating.objects.create(student=student, group=group, score=5)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlBudgets(ratings_urls, self.BUDGETS)
+
+    def test_my_ratings(self):
+        with self.assertMaxQueries(self.BUDGETS['my_ratings']):
+            self.assertEqual(self.client.get(reverse('my_ratings')).status_code, 200)
 
-# Create your tests here.
+    def test_export(self):
+        with self.assertMaxQueries(self.BUDGETS['export_ratings']):
+            response = self.client.get(reverse('export_ratings') + '?output=csv')
+            lines = b''.join(response.streaming_content).splitlines()
+        self.assertEqual(len(lines), 11)
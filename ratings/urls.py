@@ -2,5 +2,6 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    # vaqtincha bo‘sh bo‘lishi mumkin
+    path('my-ratings/', views.MyRatingsView.as_view(), name='my_ratings'),
+    path('export/', views.ExportRatingsExcel.as_view(), name='export_ratings'),
 ]
@@ -4,44 +4,79 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Rating
 from .serializers import RatingSerializer
-from django.http import HttpResponse
-import openpyxl
+from .exports import filter_ratings, export_rows, iter_csv, iter_ndjson, write_xlsx
+from django.http import FileResponse, StreamingHttpResponse
+import tempfile
+from apicache.cache import cached_response
+from config.asyncviews import AsyncAPIView
+from config.conditional import ConditionalGetMixin
+from config.pagination import KeysetPagination
+from config.routers import read_alias
 
-class MyRatingsView(APIView):
+class MyRatingsView(ConditionalGetMixin, AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
-
+    def get_queryset(self, user):
         if user.role == 'STUDENT':
-            ratings = Rating.objects.filter(student=user)
+            return Rating.objects.filter(student=user)
         elif user.role == 'TEACHER':
-            ratings = Rating.objects.filter(group__teacher=user)
-        else:
-            ratings = Rating.objects.all()
+            return Rating.objects.filter(group__teacher=user)
+        return Rating.objects.all()
+
+    def get_conditional_querysets(self, request):
+        return [self.get_queryset(request.user)]
+
+    @cached_response('ratings')
+    async def get(self, request):
+        ratings = self.get_queryset(request.user)
 
-        serializer = RatingSerializer(ratings, many=True)
-        return Response(serializer.data)
+        # Rating'da yaratilish vaqti yo'q; id o'suvchi va PK indeksida
+        paginator = KeysetPagination(ordering=('-id',))
+        page = await paginator.apaginate_queryset(ratings, request)
+        serializer = RatingSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
 
 
 
 class ExportRatingsExcel(APIView):
     permission_classes = [IsAuthenticated]
 
+    CONTENT_TYPES = {
+        'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'csv': 'text/csv',
+        'ndjson': 'application/x-ndjson',
+    }
+
     def get(self, request):
         if request.user.role != 'ADMIN':
             return Response({"error":"Forbidden"}, status=403)
 
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.append(["Student", "Group", "Score", "Attendance"])
+        # ?format= DRF tomonidan band qilingan, shuning uchun ?output=
+        output = request.query_params.get('output', 'xlsx')
+        if output not in self.CONTENT_TYPES:
+            return Response({"error": "Unknown output"}, status=400)
+
+        try:
+            # Oqim javobdan keyin o'qiladi: baza hozir tanlanadi
+            ratings = filter_ratings(request.query_params).using(read_alias())
+        except ValueError:
+            return Response({"error": "Invalid filter"}, status=400)
+
+        rows = export_rows(ratings)
+        filename = 'ratings.%s' % output
 
-        for r in Rating.objects.all():
-            ws.append([r.student.phone, r.group.name, r.score, r.attendance])
+        if output == 'xlsx':
+            tmp = tempfile.TemporaryFile()
+            write_xlsx(rows, tmp)
+            tmp.seek(0)
+            return FileResponse(
+                tmp,
+                as_attachment=True,
+                filename=filename,
+                content_type=self.CONTENT_TYPES[output]
+            )
 
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename=ratings.xlsx'
-        wb.save(response)
+        stream = iter_csv(rows) if output == 'csv' else iter_ndjson(rows)
+        response = StreamingHttpResponse(stream, content_type=self.CONTENT_TYPES[output])
+        response['Content-Disposition'] = 'attachment; filename=%s' % filename
         return response
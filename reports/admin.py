@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import ReportJob
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'kind', 'status', 'requested_by', 'created_at', 'finished_at')
+    list_filter = ('kind', 'status')
@@ -0,0 +1,154 @@
+import csv
+import io
+import os
+import tempfile
+import threading
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from config.routers import replica_reads
+from groups.models import Group
+from homework.models import HomeworkSubmission
+from ratings.exports import filter_ratings, export_rows, iter_csv, iter_ndjson, write_xlsx
+from schedules.recurrence import lessons
+from schedules.views import parse_range
+from .models import ReportJob
+
+
+def ratings_export(params, fileobj):
+    output = params.get('output', 'xlsx')
+    rows = export_rows(filter_ratings(params))
+
+    if output == 'xlsx':
+        write_xlsx(rows, fileobj)
+    else:
+        stream = iter_csv(rows) if output == 'csv' else iter_ndjson(rows)
+        for chunk in stream:
+            fileobj.write(chunk.encode('utf-8'))
+    return output
+
+
+def group_submissions(params, fileobj):
+    submissions = HomeworkSubmission.objects.filter(
+        homework__group_id=params['group']
+    ).select_related('student', 'homework').order_by('homework_id', 'student__phone')
+
+    with zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for s in submissions.iterator():
+            name = '%s/%s%s' % (
+                s.homework.title,
+                s.student.phone,
+                os.path.splitext(s.file.name)[1],
+            )
+            with s.file.open('rb') as src, archive.open(name, 'w') as dst:
+                for chunk in src.chunks():
+                    dst.write(chunk)
+    return 'zip'
+
+
+def schedule_dump(params, fileobj):
+    """
+    Every lesson between params['from'] and params['to'] (same rules and
+    limits as the schedule API): expanded ScheduleRule rows with their
+    exceptions applied, merged with one-off Schedule rows.
+    """
+    start, end = parse_range(params)
+    groups = [params['group']] if params.get('group') else None
+    named = Group.objects.all() if groups is None else Group.objects.filter(id__in=groups)
+    names = dict(named.values_list('id', 'name'))
+
+    text = io.TextIOWrapper(fileobj, encoding='utf-8', newline='', write_through=True)
+    writer = csv.writer(text)
+    writer.writerow(['Group', 'Date', 'Day', 'Start', 'End', 'Subject'])
+    for o in lessons(start, end, groups):
+        writer.writerow([names[o.group], o.date, o.day, o.start_time, o.end_time, o.subject])
+    text.detach()
+    return 'csv'
+
+
+RUNNERS = {
+    'ratings_export': ratings_export,
+    'group_submissions': group_submissions,
+    'schedule_dump': schedule_dump,
+}
+
+
+def claim_jobs(limit):
+    """
+    Atomically move up to `limit` jobs to RUNNING: PENDING ones, and
+    RUNNING ones whose worker stopped sending heartbeats (it died
+    mid-job). A job that has already been claimed REPORT_MAX_ATTEMPTS
+    times is marked FAILED instead of being retried again.
+
+    SKIP LOCKED lets several worker processes poll the same table without
+    blocking on, or double-claiming, each other's rows.
+    """
+    now = timezone.now()
+    stale = Q(status='RUNNING', heartbeat_at__lt=now - timedelta(seconds=settings.REPORT_STALE_AFTER))
+    with transaction.atomic():
+        ReportJob.objects.filter(stale, attempts__gte=settings.REPORT_MAX_ATTEMPTS).update(
+            status='FAILED', error='Worker stopped responding', finished_at=now
+        )
+        ids = list(
+            ReportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status='PENDING') | stale)
+            .order_by('created_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        ReportJob.objects.filter(id__in=ids).update(
+            status='RUNNING', started_at=now, heartbeat_at=now, attempts=F('attempts') + 1
+        )
+    return ids
+
+
+class Heartbeat(threading.Thread):
+    """Touches the job's heartbeat_at every REPORT_HEARTBEAT_INTERVAL seconds while it runs."""
+
+    def __init__(self, job_id):
+        super().__init__(daemon=True)
+        self.job_id = job_id
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(settings.REPORT_HEARTBEAT_INTERVAL):
+                ReportJob.objects.filter(id=self.job_id, status='RUNNING').update(heartbeat_at=timezone.now())
+        finally:
+            # Thread o'z ulanishini ochgan bo'lsa, pulga qaytaradi
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def run_job(job_id):
+    job = ReportJob.objects.get(id=job_id)
+    heartbeat = Heartbeat(job.id)
+    heartbeat.start()
+
+    try:
+        with tempfile.TemporaryFile() as tmp:
+            with replica_reads(job.requested_by_id):
+                extension = RUNNERS[job.kind](job.params, tmp)
+            tmp.seek(0)
+            # Nom taxmin qilinmasin: natija faqat ReportDownload orqali beriladi
+            name = '%s-%d-%s.%s' % (job.kind, job.id, get_random_string(16), extension)
+            job.result.save(name, File(tmp), save=False)
+        job.status = 'DONE'
+    except Exception as e:
+        job.status = 'FAILED'
+        job.error = str(e)
+    finally:
+        heartbeat.stop()
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at'])
+    return job.status
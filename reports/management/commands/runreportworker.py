@@ -0,0 +1,61 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from reports.jobs import claim_jobs, run_job
+
+
+def init_worker():
+    # spawn rejimida ham child process Django'ni o'zi sozlaydi
+    django.setup()
+
+
+class Command(BaseCommand):
+    help = 'Claim queued report jobs and run them in a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Pool size; 0 runs jobs inline in this process')
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when the queue is empty')
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        poll = options['poll_interval']
+
+        if workers == 0:
+            return self.run_inline(poll, options['once'])
+
+        running = set()
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+            while True:
+                claimed = claim_jobs(workers - len(running)) if len(running) < workers else []
+                if claimed:
+                    # Fork qilingan processlar parent connection'ini ulashmasligi kerak
+                    connections.close_all()
+                    for job_id in claimed:
+                        running.add(pool.submit(run_job, job_id))
+                        self.stdout.write('Started report job %d' % job_id)
+
+                if running:
+                    done, running = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.stdout.write('Finished report job: %s' % future.result())
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(poll)
+
+    def run_inline(self, poll, once):
+        while True:
+            claimed = claim_jobs(1)
+            for job_id in claimed:
+                self.stdout.write('Report job %d: %s' % (job_id, run_job(job_id)))
+            if not claimed:
+                if once:
+                    break
+                time.sleep(poll)
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='reportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reportjob',
+            index=models.Index(condition=models.Q(('status', 'RUNNING')), fields=['heartbeat_at'], name='reportjob_running_idx'),
+        ),
+    ]
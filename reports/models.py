@@ -0,0 +1,51 @@
+from django.db import models
+from accounts.models import User
+
+
+class ReportJob(models.Model):
+    KINDS = (
+        ('ratings_export', 'Ratings export'),
+        ('group_submissions', 'Group submissions archive'),
+        ('schedule_dump', 'Schedule dump'),
+    )
+    STATUSES = (
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    )
+
+    kind = models.CharField(max_length=30, choices=KINDS)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUSES, default='PENDING')
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_jobs')
+
+    result = models.FileField(upload_to='reports/', blank=True)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Ishlayotgan worker buni davriy yangilaydi; eskirsa job qayta olinadi
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Worker faqat navbatdagi PENDING joblarni qidiradi
+            models.Index(
+                fields=['created_at'],
+                name='reportjob_pending_idx',
+                condition=models.Q(status='PENDING'),
+            ),
+            # To'xtab qolgan RUNNING joblarni qidirish uchun
+            models.Index(
+                fields=['heartbeat_at'],
+                name='reportjob_running_idx',
+                condition=models.Q(status='RUNNING'),
+            ),
+        ]
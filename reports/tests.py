@@ -0,0 +1,142 @@
+import io
+import shutil
+import tempfile
+from datetime import date, time, timedelta
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from groups.models import Group
+from ratings.models import Rating
+from schedules.models import Schedule, ScheduleException, ScheduleRule
+from .jobs import claim_jobs
+from .models import ReportJob
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReportJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(
+            name='P-1', course=course, teacher=self.teacher, days=['Mon', 'Wed', 'Fri']
+        )
+        Rating.objects.create(student=student, group=self.group, score=5)
+
+        self.client = APIClient()
+
+    def enqueue(self, user, kind, params=None):
+        self.client.force_authenticate(user)
+        return self.client.post('/api/reports/', {'kind': kind, 'params': params or {}}, format='json')
+
+    def test_enqueue_and_run(self):
+        response = self.enqueue(self.admin, 'ratings_export', {'output': 'csv'})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['id']
+
+        call_command('runreportworker', workers=0, once=True, stdout=io.StringIO())
+
+        status = self.client.get('/api/reports/%d/' % job_id).data
+        self.assertEqual(status['status'], 'DONE')
+        self.assertEqual(status['download_url'], '/api/reports/%d/download/' % job_id)
+
+        response = self.client.get(status['download_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("filename*=UTF-8''ratings_export-%d.csv" % job_id, response['Content-Disposition'])
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines()[1], '998900000002,P-1,5,True')
+
+        # Natija nomi taxmin qilinmaydi va boshqalarga berilmaydi
+        self.assertNotIn('ratings_export-%d.csv' % job_id, ReportJob.objects.get(id=job_id).result.name)
+        self.client.force_authenticate(self.teacher)
+        self.assertEqual(self.client.get(status['download_url']).status_code, 403)
+
+    def test_download_before_done(self):
+        job = ReportJob.objects.create(kind='schedule_dump', requested_by=self.teacher)
+        self.client.force_authenticate(self.teacher)
+        self.assertEqual(self.client.get('/api/reports/%d/download/' % job.id).status_code, 404)
+
+    def test_failed_job_records_error(self):
+        job = ReportJob.objects.create(kind='group_submissions', params={}, requested_by=self.admin)
+        call_command('runreportworker', workers=0, once=True, stdout=io.StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+        self.assertIn('group', job.error)
+
+    def test_claim_is_exclusive(self):
+        ReportJob.objects.create(kind='schedule_dump', requested_by=self.admin)
+        self.assertEqual(len(claim_jobs(5)), 1)
+        self.assertEqual(claim_jobs(5), [])
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = ReportJob.objects.create(kind='schedule_dump', requested_by=self.admin)
+        self.assertEqual(claim_jobs(5), [job.id])
+        self.assertEqual(claim_jobs(5), [])
+
+        # Worker o'ldi: heartbeat to'xtadi
+        stale = timezone.now() - timedelta(hours=1)
+        ReportJob.objects.filter(id=job.id).update(heartbeat_at=stale)
+        self.assertEqual(claim_jobs(5), [job.id])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('RUNNING', 2))
+
+        with self.settings(REPORT_MAX_ATTEMPTS=2):
+            ReportJob.objects.filter(id=job.id).update(heartbeat_at=stale)
+            self.assertEqual(claim_jobs(5), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'FAILED')
+
+    def test_teacher_permissions(self):
+        self.assertEqual(self.enqueue(self.teacher, 'ratings_export').status_code, 403)
+        self.assertEqual(self.enqueue(self.teacher, 'schedule_dump').status_code, 403)
+        response = self.enqueue(self.teacher, 'schedule_dump', {'group': self.group.id})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.enqueue(self.teacher, 'schedule_dump', {'group': 'abc'}).status_code, 400)
+
+    def test_schedule_dump_includes_recurring_lessons(self):
+        # 2024-03-04 dushanba: Mon/Wed/Fri qoidasi, chorshanba bekor, juma ko'chirilgan
+        rule = ScheduleRule.objects.create(
+            group=self.group, start_time=time(9), end_time=time(10), subject='Python',
+            starts_on=date(2024, 1, 1)
+        )
+        ScheduleException.objects.create(rule=rule, date=date(2024, 3, 6), cancelled=True)
+        ScheduleException.objects.create(
+            rule=rule, date=date(2024, 3, 8), start_time=time(14), end_time=time(15), subject='Exam'
+        )
+        Schedule.objects.create(
+            group=self.group, date=date(2024, 3, 5), day='Tue',
+            start_time=time(11), end_time=time(12), subject='Extra'
+        )
+
+        response = self.enqueue(self.teacher, 'schedule_dump', {'group': self.group.id, 'from': '2024-03-04'})
+        self.assertEqual(response.status_code, 202)
+        job = ReportJob.objects.get(id=response.data['id'])
+        self.assertEqual((job.params['from'], job.params['to']), ('2024-03-04', '2024-03-10'))
+
+        call_command('runreportworker', workers=0, once=True, stdout=io.StringIO())
+        response = self.client.get('/api/reports/%d/download/' % job.id)
+        self.assertEqual(b''.join(response.streaming_content).decode().splitlines(), [
+            'Group,Date,Day,Start,End,Subject',
+            'P-1,2024-03-04,Mon,09:00:00,10:00:00,Python',
+            'P-1,2024-03-05,Tue,11:00:00,12:00:00,Extra',
+            'P-1,2024-03-08,Fri,14:00:00,15:00:00,Exam',
+        ])
+
+    def test_schedule_dump_range_is_validated(self):
+        for params in ({'from': 'soon'}, {'from': '2024-03-10', 'to': '2024-03-01'},
+                       {'from': '2024-01-01', 'to': '2024-06-01'}):
+            self.assertEqual(self.enqueue(self.admin, 'schedule_dump', params).status_code, 400)
+        self.assertFalse(ReportJob.objects.exists())
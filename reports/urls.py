@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import EnqueueReport, ReportDownload, ReportStatus
+
+urlpatterns = [
+    path('', EnqueueReport.as_view(), name='enqueue_report'),
+    path('<int:pk>/', ReportStatus.as_view(), name='report_status'),
+    path('<int:pk>/download/', ReportDownload.as_view(), name='report_download'),
+]
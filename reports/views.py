@@ -0,0 +1,104 @@
+import os
+
+from django.urls import reverse
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from groups.models import Group
+from homework.media import serve_file
+from schedules.views import parse_range
+from .models import ReportJob
+
+
+def visible_job(request, pk):
+    """(job, None) if the user requested the job or is an admin, else (None, error response)."""
+    try:
+        job = ReportJob.objects.get(id=pk)
+    except ReportJob.DoesNotExist:
+        return None, Response({"error": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    if job.requested_by_id != request.user.id and request.user.role != 'ADMIN':
+        return None, Response({"error": "Access denied"}, status=status.HTTP_403_FORBIDDEN)
+    return job, None
+
+
+class EnqueueReport(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        kind = request.data.get('kind')
+        params = request.data.get('params') or {}
+
+        if kind not in dict(ReportJob.KINDS):
+            return Response({"error": "Unknown report"}, status=status.HTTP_400_BAD_REQUEST)
+        if not isinstance(params, dict):
+            return Response({"error": "params must be an object"}, status=status.HTTP_400_BAD_REQUEST)
+        if params.get('group') is not None:
+            try:
+                params['group'] = int(params['group'])
+            except (TypeError, ValueError):
+                return Response({"error": "group must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if kind == 'schedule_dump':
+            # Oraliq navbatga qo'yilganda aniqlanadi: job kechroq ishlasa ham o'sha hafta chiqadi
+            try:
+                start, end = parse_range(params)
+            except ValidationError as e:
+                return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
+            params['from'], params['to'] = start.isoformat(), end.isoformat()
+
+        if not self.can_request(request.user, kind, params):
+            return Response({"error": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+        job = ReportJob.objects.create(kind=kind, params=params, requested_by=request.user)
+        return Response({
+            "id": job.id,
+            "status": job.status
+        }, status=status.HTTP_202_ACCEPTED)
+
+    def can_request(self, user, kind, params):
+        if user.role == 'ADMIN':
+            return True
+        if user.role != 'TEACHER' or kind == 'ratings_export':
+            return False
+
+        # O'qituvchi faqat o'z guruhi bo'yicha hisobot oladi
+        group_id = params.get('group')
+        if group_id is None:
+            return False
+        return Group.objects.filter(id=group_id, teacher=user).exists()
+
+
+class ReportStatus(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job, error = visible_job(request, pk)
+        if error:
+            return error
+
+        return Response({
+            "id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "error": job.error or None,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+            "download_url": reverse('report_download', args=[job.id]) if job.result else None
+        })
+
+
+class ReportDownload(APIView):
+    """Natija fayli: faqat so'ragan foydalanuvchi yoki admin uchun, serve_file orqali."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job, error = visible_job(request, pk)
+        if error:
+            return error
+        if job.status != 'DONE' or not job.result:
+            return Response({"error": "Report is not ready"}, status=status.HTTP_404_NOT_FOUND)
+
+        extension = os.path.splitext(job.result.name)[1]
+        return serve_file(request, job.result, '%s-%d%s' % (job.kind, job.id, extension))
@@ -1,4 +1,16 @@
 from django.contrib import admin
-from .models import Schedule
+from .models import Schedule, ScheduleException, ScheduleRule
 
 admin.site.register(Schedule)
+
+
+class ScheduleExceptionInline(admin.TabularInline):
+    model = ScheduleException
+    extra = 0
+
+
+@admin.register(ScheduleRule)
+class ScheduleRuleAdmin(admin.ModelAdmin):
+    list_display = ('group', 'start_time', 'end_time', 'subject', 'starts_on', 'ends_on')
+    list_filter = ('group',)
+    inlines = [ScheduleExceptionInline]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-18 18:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0001_initial'),
+        ('schedules', '0002_schedule_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='schedule',
+            name='group',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='groups.group'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['group', 'date', 'start_time'], name='schedule_group_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['date', 'start_time', 'id'], name='schedule_date_idx'),
+        ),
+    ]
@@ -13,12 +13,13 @@ class Schedule(models.Model):
         ('Sat','Saturday'),
     )
 
-    group = models.ForeignKey(Group, on_delete=models.CASCADE)
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, db_index=False)
     date = models.DateField()
     day = models.CharField(max_length=10, choices=DAYS, editable=False)
     start_time = models.TimeField()
     end_time = models.TimeField()
     subject = models.CharField(max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def save(self, *args, **kwargs):
         self.day = self.date.strftime('%a')
@@ -26,3 +27,45 @@ class Schedule(models.Model):
 
     def __str__(self):
         return f"{self.group} {self.date}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['group', 'date', 'start_time'], name='schedule_group_date_idx'),
+            models.Index(fields=['date', 'start_time', 'id'], name='schedule_date_idx'),
+        ]
+
+
+class ScheduleRule(models.Model):
+    """
+    Takrorlanuvchi dars: guruhning Group.days kunlarida starts_on dan
+    ends_on gacha har hafta. Bitta sana uchun o'zgarishlar ScheduleException da.
+    """
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name='schedule_rules')
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    subject = models.CharField(max_length=100)
+    starts_on = models.DateField()
+    ends_on = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.group} {self.start_time}-{self.end_time}"
+
+
+class ScheduleException(models.Model):
+    """Bitta sanadagi dars bekor qilingan yoki boshqa vaqtga/mavzuga ko'chirilgan."""
+    rule = models.ForeignKey(ScheduleRule, on_delete=models.CASCADE, related_name='exceptions')
+    date = models.DateField()
+    cancelled = models.BooleanField(default=False)
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+    subject = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.rule} {self.date}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['rule', 'date'], name='schedule_exception_rule_date_uniq'),
+        ]
@@ -0,0 +1,118 @@
+import heapq
+from collections import namedtuple
+from datetime import timedelta
+
+from django.db.models import Prefetch, Q
+
+from .models import Schedule, ScheduleException, ScheduleRule
+
+# date.weekday() -> Group.days kodi (strftime('%a') lokalga bog'liq)
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MAX_RANGE_DAYS = 62
+
+Occurrence = namedtuple(
+    'Occurrence', 'id rule group date day start_time end_time subject'
+)
+
+
+def week_of(day):
+    """Monday..Sunday of the week containing `day`."""
+    start = day - timedelta(days=day.weekday())
+    return start, start + timedelta(days=6)
+
+
+def rules_in_range(start, end, groups=None):
+    """Rules active somewhere in [start, end], with that range's exceptions."""
+    rules = ScheduleRule.objects.filter(
+        Q(ends_on__isnull=True) | Q(ends_on__gte=start),
+        starts_on__lte=end,
+    )
+    if groups is not None:
+        rules = rules.filter(group__in=groups)
+    return rules.select_related('group').prefetch_related(Prefetch(
+        'exceptions',
+        queryset=ScheduleException.objects.filter(date__range=(start, end)),
+        to_attr='range_exceptions'
+    ))
+
+
+def exceptions_in_range(start, end, groups=None):
+    exceptions = ScheduleException.objects.filter(date__range=(start, end))
+    if groups is not None:
+        exceptions = exceptions.filter(rule__group__in=groups)
+    return exceptions
+
+
+def one_off_in_range(start, end, groups=None):
+    schedules = Schedule.objects.filter(date__range=(start, end))
+    if groups is not None:
+        schedules = schedules.filter(group__in=groups)
+    return schedules.order_by('date', 'start_time', 'id')
+
+
+def expand(rules, start, end):
+    """
+    Yield rule occurrences in [start, end] ordered by (date, start_time),
+    one day at a time; nothing is materialised beyond the current day.
+    """
+    by_weekday = {code: [] for code in WEEKDAYS}
+    for rule in rules:
+        overrides = {e.date: e for e in getattr(rule, 'range_exceptions', rule.exceptions.all())}
+        for code in rule.group.days:
+            if code in by_weekday:
+                by_weekday[code].append((rule, overrides))
+
+    day = start
+    while day <= end:
+        code = WEEKDAYS[day.weekday()]
+        todays = []
+        for rule, overrides in by_weekday[code]:
+            if day < rule.starts_on or (rule.ends_on and day > rule.ends_on):
+                continue
+            override = overrides.get(day)
+            if override and override.cancelled:
+                continue
+            todays.append(Occurrence(
+                id=None,
+                rule=rule.id,
+                group=rule.group_id,
+                date=day,
+                day=code,
+                start_time=override and override.start_time or rule.start_time,
+                end_time=override and override.end_time or rule.end_time,
+                subject=override and override.subject or rule.subject,
+            ))
+        todays.sort(key=lambda o: (o.start_time, o.rule))
+        yield from todays
+        day += timedelta(days=1)
+
+
+def one_off_occurrences(schedules):
+    for s in schedules:
+        yield Occurrence(
+            id=s.id, rule=None, group=s.group_id, date=s.date, day=s.day,
+            start_time=s.start_time, end_time=s.end_time, subject=s.subject
+        )
+
+
+def merge_lessons(rules, schedules, start, end):
+    return heapq.merge(
+        expand(rules, start, end),
+        one_off_occurrences(schedules),
+        key=lambda o: (o.date, o.start_time)
+    )
+
+
+def lessons(start, end, groups=None):
+    """
+    Every lesson of `groups` (ids or a Group queryset; None = all) between
+    start and end: expanded rules merged with one-off Schedule rows.
+    """
+    return merge_lessons(rules_in_range(start, end, groups), one_off_in_range(start, end, groups), start, end)
+
+
+async def alessons(start, end, groups=None):
+    """lessons() for async views: both querysets are read with the async ORM."""
+    rules = [rule async for rule in rules_in_range(start, end, groups)]
+    schedules = [s async for s in one_off_in_range(start, end, groups)]
+    return list(merge_lessons(rules, schedules, start, end))
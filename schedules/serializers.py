@@ -5,3 +5,15 @@ class ScheduleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Schedule
         fields = '__all__'
+
+
+class OccurrenceSerializer(serializers.Serializer):
+    """Rule'dan yoyilgan yoki bir martalik (Schedule) dars."""
+    id = serializers.IntegerField(allow_null=True)
+    rule = serializers.IntegerField(allow_null=True)
+    group = serializers.IntegerField()
+    date = serializers.DateField()
+    day = serializers.CharField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    subject = serializers.CharField()
@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from groups.models import Group
+from .models import ScheduleRule
+
+
+@receiver(post_save, sender=Group)
+def group_days_changed(sender, instance, created, **kwargs):
+    # Rule kunlarni Group.days dan oladi: ETag o'zgarishi uchun updated_at yangilanadi
+    if not created:
+        ScheduleRule.objects.filter(group=instance).update(updated_at=timezone.now())
@@ -1,3 +1,173 @@
-from django.test import TestCase
+from datetime import date, time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from config.testing import QueryBudgetAssertions, QueryPlanAssertions, seed_hot_paths
+from courses.models import Course
+from groups.models import Group
+from . import urls as schedules_urls
+from .models import Schedule, ScheduleException, ScheduleRule
+from .recurrence import week_of
+
+
+class MyScheduleViewTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('998900000000', 'pass', role='ADMIN')
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(
+            name='P-1', course=course, teacher=teacher, days=['Mon', 'Wed', 'Fri']
+        )
+        self.group.students.add(self.student)
+        self.rule = ScheduleRule.objects.create(
+            group=self.group, start_time=time(9), end_time=time(10), subject='Python',
+            starts_on=date(2026, 9, 1), ends_on=date(2026, 12, 31)
+        )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def get(self, query):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/schedules/my-schedule/' + query)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(ctx.captured_queries)
+
+    def test_rule_follows_group_days(self):
+        data, _ = self.get('?from=2026-09-07&to=2026-09-13')
+        self.assertEqual(
+            [(row['date'], row['day']) for row in data['results']],
+            [('2026-09-07', 'Mon'), ('2026-09-09', 'Wed'), ('2026-09-11', 'Fri')]
+        )
+        self.assertTrue(all(row['rule'] == self.rule.id for row in data['results']))
+
+    def test_rule_bounds(self):
+        data, _ = self.get('?from=2026-08-24&to=2026-09-06')
+        self.assertEqual([row['date'] for row in data['results']], ['2026-09-02', '2026-09-04'])
+        data, _ = self.get('?from=2027-01-01&to=2027-01-31')
+        self.assertEqual(data['results'], [])
+
+    def test_exceptions_and_one_off_lessons(self):
+        ScheduleException.objects.create(rule=self.rule, date=date(2026, 9, 7), cancelled=True)
+        ScheduleException.objects.create(
+            rule=self.rule, date=date(2026, 9, 9), start_time=time(14), end_time=time(15)
+        )
+        extra = Schedule.objects.create(
+            group=self.group, date=date(2026, 9, 11), start_time=time(8),
+            end_time=time(9), subject='Extra'
+        )
+
+        data, _ = self.get('?from=2026-09-07&to=2026-09-13')
+        self.assertEqual(
+            [(row['date'], row['start_time'], row['subject'], row['id']) for row in data['results']],
+            [
+                ('2026-09-09', '14:00:00', 'Python', None),
+                ('2026-09-11', '08:00:00', 'Extra', extra.id),
+                ('2026-09-11', '09:00:00', 'Python', None),
+            ]
+        )
+
+    def test_query_count_does_not_grow_with_range(self):
+        _, week = self.get('?from=2026-09-07&to=2026-09-13')
+        _, term = self.get('?from=2026-09-01&to=2026-10-31')
+        self.assertEqual(week, term)
+
+    def test_default_range_and_links(self):
+        data, _ = self.get('')
+        start, end = week_of(timezone.localdate())
+        self.assertEqual((data['from'], data['to']), (start, end))
+
+        data, _ = self.get('?from=2026-09-07')
+        self.assertEqual(data['to'], date(2026, 9, 13))
+        self.assertIn('from=2026-09-14&to=2026-09-20', data['next'])
+        self.assertIn('from=2026-08-31&to=2026-09-06', data['previous'])
+
+    def test_invalid_ranges(self):
+        for query in ('?from=bogus', '?from=2026-02-30', '?from=2026-09-10&to=2026-09-01',
+                      '?from=2026-01-01&to=2026-12-31'):
+            response = self.client.get('/api/schedules/my-schedule/' + query)
+            self.assertEqual(response.status_code, 400, query)
+
+    def test_group_days_change_is_visible(self):
+        url = '/api/schedules/my-schedule/?from=2026-09-07&to=2026-09-13'
+        etag = self.client.get(url)['ETag']
+
+        self.group.days = ['Tue']
+        self.group.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['day'] for row in response.data['results']], ['Tue'])
+
+    @override_settings(API_CACHE_TIMEOUT=300)
+    def test_default_week_rolls_over(self):
+        cache.clear()
+        url = '/api/schedules/my-schedule/'
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 9, 13)):
+            response = self.client.get(url)
+        self.assertEqual(response.data['from'], date(2026, 9, 7))
+        etag = response['ETag']
+
+        # Qoidalar o'zgarmagan, lekin yangi hafta: na 304, na keshdagi eski hafta
+        with mock.patch('django.utils.timezone.localdate', return_value=date(2026, 9, 14)):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['from'], date(2026, 9, 14))
+        self.assertEqual(response.data['results'][0]['date'], '2026-09-14')
+
+
+class ScheduleQueryPlanTests(QueryPlanAssertions, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seed = seed_hot_paths()
+
+    def test_group_week(self):
+        group = self.seed['groups'][0]
+        self.assertIndexedPlan(
+            Schedule.objects.filter(
+                group=group, date__range=(date(2026, 9, 7), date(2026, 9, 13))
+            ).order_by('date', 'start_time')
+        )
+
+    def test_admin_listing(self):
+        self.assertIndexedPlan(Schedule.objects.order_by('date', 'start_time', 'id')[:21])
+
+
+class ScheduleQueryBudgetTests(QueryBudgetAssertions, TestCase):
+    BUDGETS = {
+        'my_schedule': 6,
+    }
+
+    def setUp(self):
+        cache.clear()
+        teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.student = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        for g in range(3):
+            group = Group.objects.create(name='P-%d' % g, course=course, teacher=teacher)
+            group.students.add(self.student)
+            for day in range(5):
+                Schedule.objects.create(
+                    group=group, date=date(2026, 9, 1 + day), start_time=time(9 + g),
+                    end_time=time(10 + g), subject='Python'
+                )
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def test_every_url_has_a_budget(self):
+        self.assertUrlBudgets(schedules_urls, self.BUDGETS)
+
+    def test_my_schedule(self):
+        with self.assertMaxQueries(self.BUDGETS['my_schedule']):
+            response = self.client.get(reverse('my_schedule') + '?from=2026-09-01')
+        self.assertEqual(len(response.data['results']), 15)
@@ -2,5 +2,5 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    # vaqtincha bo‘sh bo‘lishi mumkin
+    path('my-schedule/', views.MyScheduleView.as_view(), name='my_schedule'),
 ]
@@ -1,23 +1,95 @@
+from datetime import timedelta
+
 from django.shortcuts import render
-from rest_framework.views import APIView
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Schedule
-from .serializers import ScheduleSerializer
+from rest_framework.exceptions import ValidationError
+from groups.models import Group
+from .recurrence import (
+    MAX_RANGE_DAYS,
+    alessons,
+    exceptions_in_range,
+    one_off_in_range,
+    rules_in_range,
+    week_of
+)
+from .serializers import OccurrenceSerializer
+from apicache.cache import cached_response
+from config.asyncviews import AsyncAPIView
+from config.conditional import ConditionalGetMixin
+
+
+def parse_range(params):
+    """?from=&to= (YYYY-MM-DD); default is the current week."""
+    bounds = []
+    for name in ('from', 'to'):
+        value = params.get(name)
+        try:
+            bounds.append(parse_date(value) if value else None)
+        except ValueError:
+            bounds.append(None)
+        if value and bounds[-1] is None:
+            raise ValidationError({name: 'Expected a YYYY-MM-DD date'})
+    start, end = bounds
+
+    if start is None and end is None:
+        start, end = week_of(timezone.localdate())
+    elif start is None:
+        start = end - timedelta(days=6)
+    elif end is None:
+        end = start + timedelta(days=6)
+
+    if end < start:
+        raise ValidationError({'detail': '"to" is before "from"'})
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValidationError({'detail': 'Range is limited to %d days' % MAX_RANGE_DAYS})
+    return start, end
 
-class MyScheduleView(APIView):
-    permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        user = request.user
+def resolved_range(request):
+    return '%s..%s' % parse_range(request.query_params)
 
+
+class MyScheduleView(ConditionalGetMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_groups(self, user):
         if user.role == 'STUDENT':
-            schedules = Schedule.objects.filter(group__students=user)
+            return user.student_groups.all()
         elif user.role == 'TEACHER':
-            schedules = Schedule.objects.filter(group__teacher=user)
-        else:
-            schedules = Schedule.objects.all()
+            return Group.objects.filter(teacher=user)
+        return None
+
+    def get_fingerprint_parts(self, request):
+        # Standart oraliq (joriy hafta) URL da yo'q: hafta almashsa ETag ham almashadi
+        return super().get_fingerprint_parts(request) + [resolved_range(request)]
+
+    def get_conditional_querysets(self, request):
+        start, end = parse_range(request.query_params)
+        groups = self.get_groups(request.user)
+        return [
+            rules_in_range(start, end, groups),
+            exceptions_in_range(start, end, groups),
+            one_off_in_range(start, end, groups),
+        ]
+
+    def range_url(self, request, start, end):
+        query = request.query_params.copy()
+        query['from'], query['to'] = start.isoformat(), end.isoformat()
+        return request.build_absolute_uri('?' + query.urlencode())
 
-        serializer = ScheduleSerializer(schedules, many=True)
-        return Response(serializer.data)
+    @cached_response('schedules', vary=resolved_range)
+    async def get(self, request):
+        start, end = parse_range(request.query_params)
+        occurrences = await alessons(start, end, self.get_groups(request.user))
 
+        span = end - start + timedelta(days=1)
+        return Response({
+            'from': start,
+            'to': end,
+            'previous': self.range_url(request, start - span, start - timedelta(days=1)),
+            'next': self.range_url(request, end + timedelta(days=1), end + span),
+            'results': OccurrenceSerializer(occurrences, many=True).data,
+        })
@@ -81,6 +81,10 @@ async function authenticatedRequest(url, options = {}) {
             const refreshed = await refreshAccessToken();
             
             if (refreshed) {
+                // Oqim eski token bilan ochilgan: yangisi bilan qayta ulanamiz
+                if (eventSource) {
+                    startEventStream();
+                }
                 // Retry original request with new token
                 config.headers.Authorization = `Bearer ${localStorage.getItem('access_token')}`;
                 return await fetch(url, config);
@@ -120,6 +124,10 @@ async function refreshAccessToken() {
         if (response.ok) {
             const data = await response.json();
             localStorage.setItem('access_token', data.access);
+            // Refresh token har safar almashadi (ROTATE_REFRESH_TOKENS)
+            if (data.refresh) {
+                localStorage.setItem('refresh_token', data.refresh);
+            }
             return true;
         }
         
@@ -132,6 +140,21 @@ async function refreshAccessToken() {
 
 // Handle logout
 function handleLogout() {
+    // Refresh tokenni serverda bekor qilamiz (javobni kutmaymiz)
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) {
+        fetch('/api/auth/token/blacklist/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                refresh: refreshToken
+            }),
+            keepalive: true
+        }).catch(() => {});
+    }
+
     // Clear all stored data
     localStorage.removeItem('access_token');
     localStorage.removeItem('refresh_token');
@@ -146,7 +169,7 @@ function handleLogout() {
 // Login function
 async function login(phone, password) {
     try {
-        const response = await fetch('/login/', {
+        const response = await fetch('/api/auth/login/', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -159,7 +182,7 @@ async function login(phone, password) {
         
         if (!response.ok) {
             const error = await response.json();
-            throw new Error(error.error || 'Login failed');
+            throw new Error(error.detail || 'Login failed');
         }
         
         const data = await response.json();
@@ -204,10 +227,72 @@ function isValidPassword(password) {
     return password.length >= 6;
 }
 
-// Auto-logout on token expiration
+// Server events (SSE): token holati va yangi ma'lumotlar
+// Oqim faqat config.asgi ostida bor; bo'lmasa eski davriy tekshiruvga o'tamiz
+const SERVER_EVENTS = ['homework', 'submission', 'grade', 'resync'];
+let eventSource;
 let tokenCheckInterval;
 
+async function startEventStream() {
+    stopEventStream();
+    // Access token URL'ga tushmaydi: oqim uchun qisqa muddatli chipta olinadi
+    const response = await authenticatedRequest('/api/events/ticket/', {method: 'POST'}).catch(() => null);
+    if (!response || !response.ok) {
+        startTokenCheck();
+        return;
+    }
+    const {ticket} = await response.json();
+    const source = eventSource = new EventSource(`/api/events/?ticket=${encodeURIComponent(ticket)}`);
+    let connected = false;
+
+    source.addEventListener('ready', () => {
+        connected = true;
+        stopTokenCheck();
+    });
+
+    // Dashboardlar document'dagi 'server:<event>' hodisalarini tinglaydi
+    SERVER_EVENTS.forEach(name => {
+        source.addEventListener(name, (e) => {
+            document.dispatchEvent(new CustomEvent(`server:${name}`, {detail: JSON.parse(e.data)}));
+        });
+    });
+
+    source.addEventListener('token', async (e) => {
+        const data = JSON.parse(e.data);
+        stopEventStream();
+        if (data.state === 'expired' && await refreshAccessToken()) {
+            startEventStream();
+        } else {
+            handleLogout();
+        }
+    });
+
+    source.onerror = () => {
+        // CLOSED: server oqimni rad etdi. Oldin ulangan bo'lsa chipta eskirgan
+        // (brauzer qayta ulanishda eskisini yuboradi) - yangisi bilan ulanamiz;
+        // aks holda oqim yo'q (ASGI emas): eski davriy tekshiruvga o'tamiz
+        if (source.readyState === EventSource.CLOSED && source === eventSource) {
+            stopEventStream();
+            if (connected) {
+                startEventStream();
+            } else {
+                startTokenCheck();
+            }
+        }
+    };
+}
+
+function stopEventStream() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
+}
+
 function startTokenCheck() {
+    if (tokenCheckInterval) {
+        return;
+    }
     // Check token validity every 5 minutes
     tokenCheckInterval = setInterval(async () => {
         if (isAuthenticated()) {
@@ -231,16 +316,18 @@ async function checkTokenValidity() {
 function stopTokenCheck() {
     if (tokenCheckInterval) {
         clearInterval(tokenCheckInterval);
+        tokenCheckInterval = null;
     }
 }
 
 // Initialize authentication checking
 if (isAuthenticated()) {
-    startTokenCheck();
+    startEventStream();
 }
 
 // Clean up on page unload
 window.addEventListener('beforeunload', () => {
+    stopEventStream();
     stopTokenCheck();
 });
 
@@ -297,7 +384,7 @@ document.addEventListener('DOMContentLoaded', function() {
 //     const errorText = document.getElementById('errorText');
 
 //     try {
-//         const response = await fetch('/login/', {
+//         const response = await fetch('/api/auth/login/', {
 //             method: 'POST',
 //             headers: {
 //                 'Content-Type': 'application/json',
@@ -49,17 +49,22 @@ async function loadStudentData() {
         document.getElementById('studentName').textContent = userName;
     }
     
-    // Load all data
-    await loadStats();
-    await loadRecentHomework();
-    await loadSchedule();
-    await loadAllHomework();
-    await loadGrades();
+    // Barcha bo'limlar bitta so'rovda keladi
+    const data = await apiRequest('/api/dashboard/student/');
+    if (!data) return;
+
+    loadStats(data.stats);
+    loadRecentHomework(data.recent_homework);
+    loadSchedule(data.schedule);
+    loadAllHomework(data.homework);
+    loadGrades(data.grades);
 }
 
 // Load statistics
-async function loadStats() {
-    const data = await apiRequest('/api/homework/stats/');
+async function loadStats(data) {
+    if (data === undefined) {
+        data = await apiRequest('/api/homework/stats/');
+    }
     
     if (data) {
         document.getElementById('totalHomework').textContent = data.total || 0;
@@ -70,8 +75,10 @@ async function loadStats() {
 }
 
 // Load recent homework
-async function loadRecentHomework() {
-    const data = await apiRequest('/api/homework/recent/');
+async function loadRecentHomework(data) {
+    if (data === undefined) {
+        data = await apiRequest('/api/homework/recent/');
+    }
     const container = document.getElementById('recentHomeworkList');
     
     if (!data || data.length === 0) {
@@ -127,8 +134,11 @@ async function loadRecentHomework() {
 }
 
 // Load schedule
-async function loadSchedule() {
-    const data = await apiRequest('/api/schedules/my-schedule/');
+async function loadSchedule(data) {
+    if (data === undefined) {
+        const page = await apiRequest('/api/schedules/my-schedule/');
+        data = page ? page.results : null;
+    }
     const container = document.getElementById('scheduleList');
     
     if (!data || data.length === 0) {
@@ -182,8 +192,11 @@ async function loadSchedule() {
 }
 
 // Load all homework
-async function loadAllHomework() {
-    const data = await apiRequest('/api/homework/');
+async function loadAllHomework(data) {
+    if (data === undefined) {
+        const page = await apiRequest('/api/homework/');
+        data = page ? page.results : null;
+    }
     const container = document.getElementById('allHomeworkList');
     
     if (!data || data.length === 0) {
@@ -242,8 +255,10 @@ async function loadAllHomework() {
 }
 
 // Load grades
-async function loadGrades() {
-    const data = await apiRequest('/api/ratings/my-grades/');
+async function loadGrades(data) {
+    if (data === undefined) {
+        data = await apiRequest('/api/ratings/my-grades/');
+    }
     const container = document.getElementById('gradesList');
     
     if (!data || data.length === 0) {
@@ -318,4 +333,10 @@ function showSection(section) {
 // Initialize
 if (checkAuth()) {
     document.addEventListener('DOMContentLoaded', loadStudentData);
-}
\ No newline at end of file
+}
+// Server events: yangi vazifa yoki baho kelganda panel qayta yuklanadi
+// (ketma-ket kelgan hodisalar bitta so'rovga birlashadi)
+const reloadStudentData = debounce(loadStudentData, 500);
+['homework', 'grade', 'resync'].forEach(name => {
+    document.addEventListener(`server:${name}`, reloadStudentData);
+});
@@ -8,7 +8,6 @@ if (!auth.requireAuth('TEACHER')) {
 // Load teacher data on page load
 document.addEventListener('DOMContentLoaded', function() {
     loadTeacherData();
-    loadGroups();
 });
 
 // Load all teacher data
@@ -16,17 +15,29 @@ async function loadTeacherData() {
     const user = auth.getCurrentUser();
     document.getElementById('teacherName').textContent = user.name || 'Ustoz';
     
-    await loadStats();
-    await loadRecentSubmissions();
-    await loadHomeworkList();
-    await loadAllSubmissions();
+    // Barcha bo'limlar bitta so'rovda keladi
+    let data = {};
+    try {
+        const response = await auth.authenticatedRequest('/api/dashboard/teacher/');
+        data = await response.json();
+    } catch (error) {
+        console.error('Error loading dashboard:', error);
+    }
+
+    loadStats(data.stats);
+    loadRecentSubmissions(data.recent_submissions);
+    loadGroups(data.groups);
+    loadHomeworkList(data.homework);
+    loadAllSubmissions(data.submissions);
 }
 
 // Load statistics
-async function loadStats() {
+async function loadStats(data) {
     try {
-        const response = await auth.authenticatedRequest('/api/homework/teacher-stats/');
-        const data = await response.json();
+        if (data === undefined) {
+            const response = await auth.authenticatedRequest('/api/homework/teacher-stats/');
+            data = await response.json();
+        }
         
         document.getElementById('totalGroups').textContent = data.total_groups || 0;
         document.getElementById('totalStudents').textContent = data.total_students || 0;
@@ -38,12 +49,14 @@ async function loadStats() {
 }
 
 // Load recent submissions
-async function loadRecentSubmissions() {
+async function loadRecentSubmissions(data) {
     const container = document.getElementById('recentSubmissions');
     
     try {
-        const response = await auth.authenticatedRequest('/api/homework/recent-submissions/');
-        const data = await response.json();
+        if (data === undefined) {
+            const response = await auth.authenticatedRequest('/api/homework/recent-submissions/');
+            data = await response.json();
+        }
         
         if (!data || data.length === 0) {
             container.innerHTML = `
@@ -103,13 +116,15 @@ async function loadRecentSubmissions() {
 }
 
 // Load groups
-async function loadGroups() {
+async function loadGroups(data) {
     const container = document.getElementById('groupsList');
     const select = document.getElementById('homeworkGroup');
     
     try {
-        const response = await auth.authenticatedRequest('/api/groups/my-groups/');
-        const data = await response.json();
+        if (data === undefined) {
+            const response = await auth.authenticatedRequest('/api/groups/my-groups/');
+            data = await response.json();
+        }
         
         if (!data || data.length === 0) {
             if (container) {
@@ -163,12 +178,14 @@ async function loadGroups() {
 }
 
 // Load homework list
-async function loadHomeworkList() {
+async function loadHomeworkList(data) {
     const container = document.getElementById('homeworkList');
     
     try {
-        const response = await auth.authenticatedRequest('/api/homework/');
-        const data = await response.json();
+        if (data === undefined) {
+            const response = await auth.authenticatedRequest('/api/homework/');
+            data = await response.json();
+        }
         
         if (!data || data.length === 0) {
             container.innerHTML = `
@@ -212,12 +229,14 @@ async function loadHomeworkList() {
 }
 
 // Load all submissions
-async function loadAllSubmissions() {
+async function loadAllSubmissions(data) {
     const container = document.getElementById('allSubmissions');
     
     try {
-        const response = await auth.authenticatedRequest('/api/homework/all-submissions/');
-        const data = await response.json();
+        if (data === undefined) {
+            const response = await auth.authenticatedRequest('/api/homework/all-submissions/');
+            data = await response.json();
+        }
         
         if (!data || data.length === 0) {
             container.innerHTML = `
@@ -382,4 +401,10 @@ window.addEventListener('click', function(e) {
     if (e.target.classList.contains('modal')) {
         e.target.classList.remove('active');
     }
-});
\ No newline at end of file
+});
+// Server events: yangi topshiriq kelganda panel qayta yuklanadi
+// (ketma-ket kelgan hodisalar bitta so'rovga birlashadi)
+const reloadTeacherData = debounce(loadTeacherData, 500);
+['submission', 'resync'].forEach(name => {
+    document.addEventListener(`server:${name}`, reloadTeacherData);
+});
@@ -0,0 +1,6 @@
+from django.contrib import admin
+from .models import GroupCounters, StudentCounters, TeacherCounters
+
+admin.site.register(GroupCounters)
+admin.site.register(TeacherCounters)
+admin.site.register(StudentCounters)
@@ -0,0 +1,148 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from accounts.models import User
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from .models import GroupCounters, StudentCounters, TeacherCounters
+
+Membership = Group.students.through
+
+
+def _aggregate(queryset, key, expression=Count('pk')):
+    """Correlated subquery returning one aggregate per outer row (0 if none)."""
+    return Coalesce(Subquery(
+        queryset.filter(**{key: OuterRef('pk')})
+        .order_by()
+        .values(key)
+        .annotate(value=expression)
+        .values('value')
+    ), 0)
+
+
+def _submission_spec(key):
+    ungraded = HomeworkSubmission.objects.filter(score__isnull=True)
+    graded = HomeworkSubmission.objects.filter(score__isnull=False)
+    return {
+        'submitted': _aggregate(HomeworkSubmission.objects.all(), key),
+        'pending_grades': _aggregate(ungraded, key),
+        'graded': _aggregate(graded, key),
+        'score_sum': _aggregate(graded, key, Sum('score')),
+    }
+
+
+def group_spec():
+    return {
+        'total_students': _aggregate(Membership.objects.all(), 'group'),
+        'total_homework': _aggregate(Homework.objects.all(), 'group'),
+        **_submission_spec('homework__group'),
+    }
+
+
+def teacher_spec():
+    return {
+        'total_groups': _aggregate(Group.objects.all(), 'teacher'),
+        'total_students': _aggregate(Membership.objects.all(), 'group__teacher'),
+        'total_homework': _aggregate(Homework.objects.all(), 'group__teacher'),
+        **_submission_spec('homework__group__teacher'),
+    }
+
+
+def student_spec():
+    return {
+        'total_homework': _aggregate(Homework.objects.all(), 'group__students'),
+        **_submission_spec('student'),
+    }
+
+
+# model -> (source queryset, counter spec)
+SOURCES = {
+    GroupCounters: (lambda: Group.objects.all(), group_spec),
+    TeacherCounters: (lambda: User.objects.filter(role='TEACHER'), teacher_spec),
+    StudentCounters: (lambda: User.objects.filter(role='STUDENT'), student_spec),
+}
+
+
+def compute(model, ids=None):
+    """Return {pk: {field: value}} computed from the source tables."""
+    source, spec = SOURCES[model]
+    queryset = source()
+    if ids is not None:
+        queryset = queryset.filter(pk__in=ids)
+
+    fields = model.COUNTER_FIELDS
+    rows = queryset.annotate(**spec()).values('pk', *fields)
+    return {row['pk']: {f: row[f] for f in fields} for row in rows}
+
+
+def rebuild(model, ids=None):
+    """Recompute and upsert counter rows; returns the saved instances."""
+    pk_name = model._meta.pk.attname
+    objs = [
+        model(**{pk_name: pk}, **values)
+        for pk, values in compute(model, ids).items()
+    ]
+    model.objects.bulk_create(
+        objs,
+        update_conflicts=True,
+        unique_fields=[model._meta.pk.name],
+        update_fields=list(model.COUNTER_FIELDS),
+    )
+    return objs
+
+
+def verify(model):
+    """Return a list of (pk, field, stored, expected) mismatches."""
+    expected = compute(model)
+    stored = {
+        row.pop('pk'): row
+        for row in model.objects.values('pk', *model.COUNTER_FIELDS)
+    }
+
+    mismatches = []
+    for pk, values in expected.items():
+        current = stored.get(pk)
+        for field, value in values.items():
+            if current is None or current[field] != value:
+                mismatches.append((pk, field, current and current[field], value))
+    return mismatches
+
+
+def get_or_rebuild(model, pk):
+    """Single primary-key read; the row is computed once if it is missing."""
+    counters = model.objects.filter(pk=pk).first()
+    if counters is None:
+        built = rebuild(model, [pk])
+        counters = built[0] if built else model(pk=pk)
+    return counters
+
+
+async def aget_or_rebuild(model, pk):
+    """get_or_rebuild() for async views; a missing row is rebuilt in a thread."""
+    counters = await model.objects.filter(pk=pk).afirst()
+    if counters is None:
+        counters = await sync_to_async(get_or_rebuild)(model, pk)
+    return counters
+
+
+def bump(model, deltas, **lookup):
+    """Apply F()-based increments to the counter rows matching `lookup`."""
+    changes = {field: F(field) + delta for field, delta in deltas.items() if delta}
+    if changes:
+        model.objects.filter(**lookup).update(**changes)
+
+
+def bump_many(model, deltas_by_pk):
+    """Apply a different set of increments to each row in a single UPDATE."""
+    fields = {f for deltas in deltas_by_pk.values() for f, delta in deltas.items() if delta}
+    changes = {
+        field: F(field) + Case(
+            *[When(pk=pk, then=Value(deltas[field]))
+              for pk, deltas in deltas_by_pk.items() if deltas.get(field)],
+            default=Value(0)
+        )
+        for field in fields
+    }
+    if changes:
+        model.objects.filter(pk__in=list(deltas_by_pk)).update(**changes)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from stats.counters import rebuild, verify
+from stats.models import GroupCounters, StudentCounters, TeacherCounters
+
+MODELS = (GroupCounters, TeacherCounters, StudentCounters)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the dashboard counters from source tables, or verify them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare stored counters with the source tables')
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            return self.verify()
+
+        with transaction.atomic():
+            for model in MODELS:
+                rows = rebuild(model)
+                self.stdout.write('%s: %d rows rebuilt' % (model.__name__, len(rows)))
+
+    def verify(self):
+        failed = 0
+        for model in MODELS:
+            mismatches = verify(model)
+            failed += len(mismatches)
+            for pk, field, stored, expected in mismatches[:20]:
+                self.stdout.write('%s pk=%s %s: stored=%s expected=%s' % (
+                    model.__name__, pk, field, stored, expected))
+            self.stdout.write('%s: %d mismatches' % (model.__name__, len(mismatches)))
+
+        if failed:
+            raise CommandError('%d counter mismatches; run rebuildcounters' % failed)
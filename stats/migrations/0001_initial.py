@@ -0,0 +1,63 @@
+# Generated by Django 4.2.7 on 2026-10-18 17:55
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('groups', '0001_initial'),
+        ('accounts', '0002_alter_user_phone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupCounters',
+            fields=[
+                ('total_homework', models.IntegerField(default=0)),
+                ('submitted', models.IntegerField(default=0)),
+                ('pending_grades', models.IntegerField(default=0)),
+                ('graded', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counters', serialize=False, to='groups.group')),
+                ('total_students', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentCounters',
+            fields=[
+                ('total_homework', models.IntegerField(default=0)),
+                ('submitted', models.IntegerField(default=0)),
+                ('pending_grades', models.IntegerField(default=0)),
+                ('graded', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='student_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TeacherCounters',
+            fields=[
+                ('total_homework', models.IntegerField(default=0)),
+                ('submitted', models.IntegerField(default=0)),
+                ('pending_grades', models.IntegerField(default=0)),
+                ('graded', models.IntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('teacher', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='teacher_counters', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_groups', models.IntegerField(default=0)),
+                ('total_students', models.IntegerField(default=0)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
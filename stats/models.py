@@ -0,0 +1,43 @@
+from django.db import models
+from accounts.models import User
+from groups.models import Group
+
+
+class Counters(models.Model):
+    """
+    Denormalized dashboard numbers, kept current by stats.signals and
+    rebuilt from scratch by `manage.py rebuildcounters`.
+    """
+    total_homework = models.IntegerField(default=0)
+    submitted = models.IntegerField(default=0)
+    pending_grades = models.IntegerField(default=0)
+    graded = models.IntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+
+    COUNTER_FIELDS = ('total_homework', 'submitted', 'pending_grades', 'graded', 'score_sum')
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.graded if self.graded else 0
+
+    class Meta:
+        abstract = True
+
+
+class GroupCounters(Counters):
+    group = models.OneToOneField(Group, on_delete=models.CASCADE, primary_key=True, related_name='counters')
+    total_students = models.IntegerField(default=0)
+
+    COUNTER_FIELDS = Counters.COUNTER_FIELDS + ('total_students',)
+
+
+class TeacherCounters(Counters):
+    teacher = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='teacher_counters')
+    total_groups = models.IntegerField(default=0)
+    total_students = models.IntegerField(default=0)
+
+    COUNTER_FIELDS = Counters.COUNTER_FIELDS + ('total_groups', 'total_students')
+
+
+class StudentCounters(Counters):
+    student = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='student_counters')
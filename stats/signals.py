@@ -0,0 +1,174 @@
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from .counters import Membership, bump, rebuild
+from .models import GroupCounters, StudentCounters, TeacherCounters
+
+
+def rebuild_groups(group_ids):
+    """Fallback for rare structural changes: recompute everything they touch."""
+    group_ids = [g for g in group_ids if g is not None]
+    rebuild(GroupCounters, group_ids)
+    rebuild(TeacherCounters, Group.objects.filter(id__in=group_ids).values('teacher_id'))
+    rebuild(StudentCounters, Membership.objects.filter(group_id__in=group_ids).values('user_id'))
+
+
+def bump_homework_audience(group_id, deltas, student_deltas=None):
+    """Apply deltas to a group, its teacher and (optionally) its students."""
+    bump(GroupCounters, deltas, pk=group_id)
+    bump(TeacherCounters, deltas, pk__in=Group.objects.filter(id=group_id).values('teacher_id'))
+    if student_deltas:
+        members = Membership.objects.filter(group_id=group_id).values('user_id')
+        bump(StudentCounters, student_deltas, pk__in=members)
+
+
+# --- Users ---------------------------------------------------------------
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    # Yangi foydalanuvchida hech narsa yo'q, nol qator to'g'ri qiymat
+    if instance.role == 'STUDENT':
+        StudentCounters.objects.get_or_create(student=instance)
+    elif instance.role == 'TEACHER':
+        TeacherCounters.objects.get_or_create(teacher=instance)
+
+
+# --- Groups --------------------------------------------------------------
+
+@receiver(post_init, sender=Group)
+def group_loaded(sender, instance, **kwargs):
+    instance._counted_teacher_id = instance.__dict__.get('teacher_id')
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        GroupCounters.objects.get_or_create(group=instance)
+        bump(TeacherCounters, {'total_groups': 1}, pk=instance.teacher_id)
+    elif instance._counted_teacher_id != instance.teacher_id:
+        rebuild(TeacherCounters, [instance._counted_teacher_id, instance.teacher_id])
+    instance._counted_teacher_id = instance.teacher_id
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    instance._counted_students = list(instance.students.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    rebuild(TeacherCounters, [instance.teacher_id])
+    rebuild(StudentCounters, getattr(instance, '_counted_students', []))
+
+
+@receiver(m2m_changed, sender=Membership)
+def membership_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        related = instance.student_groups if reverse else instance.students
+        instance._counted_cleared = set(related.values_list('id', flat=True))
+        return
+
+    if action == 'post_clear':
+        pk_set, sign = getattr(instance, '_counted_cleared', set()), -1
+    elif action == 'post_add':
+        sign = 1
+    elif action == 'post_remove':
+        sign = -1
+    else:
+        return
+
+    if not pk_set:
+        return
+
+    # {group_id: [student_id, ...]} ko'rinishiga keltiramiz
+    if reverse:
+        changes = {group_id: [instance.pk] for group_id in pk_set}
+    else:
+        changes = {instance.pk: list(pk_set)}
+
+    for group_id, student_ids in changes.items():
+        n = sign * len(student_ids)
+        bump(GroupCounters, {'total_students': n}, pk=group_id)
+        bump(TeacherCounters, {'total_students': n},
+             pk__in=Group.objects.filter(id=group_id).values('teacher_id'))
+        homework_count = Homework.objects.filter(group_id=group_id).count()
+        bump(StudentCounters, {'total_homework': sign * homework_count}, pk__in=student_ids)
+
+
+# --- Homework ------------------------------------------------------------
+
+@receiver(post_init, sender=Homework)
+def homework_loaded(sender, instance, **kwargs):
+    instance._counted_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Homework)
+def homework_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        delta = {'total_homework': 1}
+        bump_homework_audience(instance.group_id, delta, delta)
+    elif instance._counted_group_id != instance.group_id:
+        rebuild_groups([instance._counted_group_id, instance.group_id])
+    instance._counted_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Homework)
+def homework_deleted(sender, instance, **kwargs):
+    delta = {'total_homework': -1}
+    bump_homework_audience(instance.group_id, delta, delta)
+
+
+# --- Submissions ---------------------------------------------------------
+
+def submission_deltas(score, sign=1):
+    if score is None:
+        deltas = {'submitted': 1, 'pending_grades': 1}
+    else:
+        deltas = {'submitted': 1, 'graded': 1, 'score_sum': int(score)}
+    return {field: sign * value for field, value in deltas.items()}
+
+
+def score_change_deltas(old_score, new_score):
+    """Deltas for re-grading an existing submission."""
+    old = submission_deltas(old_score, -1)
+    new = submission_deltas(new_score)
+    return {f: old.get(f, 0) + new.get(f, 0) for f in set(old) | set(new)}
+
+
+def bump_submission(homework_id, student_id, deltas):
+    bump(StudentCounters, deltas, pk=student_id)
+    group = Homework.objects.filter(id=homework_id).values('group_id')
+    bump(GroupCounters, deltas, pk__in=group)
+    bump(TeacherCounters, deltas, pk__in=Group.objects.filter(id__in=group).values('teacher_id'))
+
+
+@receiver(post_init, sender=HomeworkSubmission)
+def submission_loaded(sender, instance, **kwargs):
+    instance._counted_score = instance.__dict__.get('score')
+
+
+@receiver(post_save, sender=HomeworkSubmission)
+def submission_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        deltas = submission_deltas(instance.score)
+    else:
+        deltas = score_change_deltas(instance._counted_score, instance.score)
+    bump_submission(instance.homework_id, instance.student_id, deltas)
+    instance._counted_score = instance.score
+
+
+@receiver(post_delete, sender=HomeworkSubmission)
+def submission_deleted(sender, instance, **kwargs):
+    deltas = submission_deltas(instance._counted_score, -1)
+    bump_submission(instance.homework_id, instance.student_id, deltas)
@@ -0,0 +1,86 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from courses.models import Course
+from groups.models import Group
+from homework.models import Homework, HomeworkSubmission
+from .counters import verify
+from .models import GroupCounters, StudentCounters, TeacherCounters
+
+
+class CounterSignalTests(TestCase):
+    def setUp(self):
+        self.teacher = User.objects.create_user('998900000001', 'pass', role='TEACHER')
+        self.alice = User.objects.create_user('998900000002', 'pass', role='STUDENT')
+        self.bob = User.objects.create_user('998900000003', 'pass', role='STUDENT')
+        course = Course.objects.create(name='Python', description='')
+        self.group = Group.objects.create(name='P-1', course=course, teacher=self.teacher)
+        self.other = Group.objects.create(name='P-2', course=course, teacher=self.teacher)
+
+    def assertConsistent(self):
+        for model in (GroupCounters, TeacherCounters, StudentCounters):
+            self.assertEqual(verify(model), [], model.__name__)
+
+    def test_lifecycle(self):
+        self.group.students.add(self.alice, self.bob)
+        hw1 = Homework.objects.create(group=self.group, title='HW 1')
+        hw2 = Homework.objects.create(group=self.group, title='HW 2')
+        Homework.objects.create(group=self.other, title='HW 3')
+        self.other.students.add(self.alice)
+        self.assertConsistent()
+
+        s1 = HomeworkSubmission.objects.create(homework=hw1, student=self.alice, file='a.pdf')
+        s2 = HomeworkSubmission.objects.create(homework=hw2, student=self.alice, file='b.pdf')
+        HomeworkSubmission.objects.create(homework=hw1, student=self.bob, file='c.pdf')
+        self.assertConsistent()
+
+        s1.score = 80
+        s1.save()
+        s2.score = '90'
+        s2.save()
+        s1 = HomeworkSubmission.objects.get(id=s1.id)
+        s1.score = 60
+        s1.save()
+        self.assertConsistent()
+
+        counters = StudentCounters.objects.get(pk=self.alice.id)
+        self.assertEqual(counters.total_homework, 3)
+        self.assertEqual(counters.average_score, 75)
+
+        s2.delete()
+        self.group.students.remove(self.bob)
+        self.alice.student_groups.clear()
+        hw1.delete()
+        self.assertConsistent()
+
+        self.other.delete()
+        self.assertConsistent()
+
+    def test_stats_endpoints_read_one_row(self):
+        self.group.students.add(self.alice)
+        hw = Homework.objects.create(group=self.group, title='HW 1')
+        HomeworkSubmission.objects.create(homework=hw, student=self.alice, file='a.pdf', score=70)
+
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        with self.assertNumQueries(1):
+            response = client.get('/api/homework/stats/')
+        self.assertEqual(response.data, {'total': 1, 'pending': 0, 'submitted': 1, 'average_grade': 70.0})
+
+        client.force_authenticate(self.teacher)
+        with self.assertNumQueries(1):
+            response = client.get('/api/homework/teacher-stats/')
+        self.assertEqual(response.data['total_students'], 1)
+        self.assertEqual(response.data['total_groups'], 2)
+        self.assertEqual(response.data['pending_grades'], 0)
+
+    def test_missing_row_is_rebuilt(self):
+        self.group.students.add(self.alice)
+        Homework.objects.create(group=self.group, title='HW 1')
+        StudentCounters.objects.all().delete()
+
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        self.assertEqual(client.get('/api/homework/stats/').data['total'], 1)
+        self.assertTrue(StudentCounters.objects.filter(pk=self.alice.id).exists())